@@ -1,29 +1,26 @@
 from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import ExpiredSignatureError, JWTError, jwt
+from jose import ExpiredSignatureError, JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import cache_principal, get_cached_principal
 from app.core.config import settings
-from app.core.security import ALGORITHM
-from app.db.session import get_db
-from app.models.user import User
-from app.repositories.user_repository import UserRepository
+from app.core.pagination import TotalMode
+from app.core.security import decode_access_token
+from app.db.routing import SESSION_USER_KEY, replica_sessionmaker
+from app.db.session import get_async_db, get_db
+from app.models.user import Role, User
+from app.repositories.user_repository import AsyncUserRepository, UserRepository
 
 # Esquema OAuth2 para extraer el token Bearer del encabezado Authorization
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+async_user_repository = AsyncUserRepository()
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-    request: Request = None,
-) -> User:
-    """Obtiene el usuario actual a partir del JWT.
 
-    - Decodifica el token para extraer el email (sub)
-    - Maneja tokens inválidos o expirados
-    - Busca y retorna el usuario completo de la base de datos
-    """
+def _get_token_claims(token: str) -> dict:
+    """Verifica el JWT y devuelve sus claims, o lanza 401 si es inválido, ha expirado o no tiene `sub`."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
@@ -31,11 +28,10 @@ def get_current_user(
     )
 
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        subject = payload.get("sub")
-        if subject is None:
+        claims = decode_access_token(token)
+        if claims.get("sub") is None:
             raise credentials_exception
-        email: str = str(subject)
+        return claims
     except ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -45,11 +41,19 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user_repo = UserRepository()
-    user = user_repo.get_by_email(db, email=email)
+
+def _claims_user(claims: dict) -> User | None:
+    """`User` transitorio con `uid`, `sub` y `role` del token, o None si el token no los lleva
+    (emitidos antes de incluirlos). Valen lo que el token: un cambio de rol se aplica al renovarlo."""
+    try:
+        return User(id=int(claims["uid"]), email=str(claims["sub"]), role=Role(claims["role"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _remember_user(request: Request | None, user: User | None) -> User:
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
-
     # Guardamos el usuario en request.state para key-builder de caché
     try:
         if request is not None:
@@ -59,8 +63,81 @@ def get_current_user(
     return user
 
 
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    request: Request = None,
+) -> User:
+    """Obtiene el usuario actual a partir del JWT.
+
+    - Verifica el token (con la caché de tokens verificados) y maneja tokens inválidos o expirados
+    - Con `uid` y `role` en el token no consulta la base de datos
+    - Si no, busca y retorna el usuario completo por email (sub)
+    """
+    claims = _get_token_claims(token)
+    user = _claims_user(claims) or UserRepository().get_by_email(db, email=str(claims["sub"]))
+    return _remember_user(request, user)
+
+
+async def _load_principal(db: AsyncSession, email: str) -> User | None:
+    """Usuario del token desde la caché de principales o, si no está, desde la BD.
+
+    Un acierto devuelve un `User` transitorio (fuera de la sesión) con solo `id`, `email` y
+    `role`, lo único que usan los endpoints; las escrituras de usuarios lo invalidan.
+    """
+    if settings.PRINCIPAL_CACHE_SECONDS <= 0:
+        return await async_user_repository.get_by_email(db, email=email)
+    principal = await get_cached_principal(email)
+    if principal is not None:
+        return User(id=principal["id"], email=principal["email"], role=Role(principal["role"]))
+    user = await async_user_repository.get_by_email(db, email=email)
+    if user is not None:
+        await cache_principal(email, {"id": user.id, "email": user.email, "role": user.role.value})
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+    request: Request = None,
+) -> User:
+    """Variante de `get_current_user` sobre `AsyncSession` para los routers async.
+
+    Un token ya verificado con `uid` y `role` se resuelve sin E/S; los que no los llevan pasan
+    por la caché de principales (ver `_load_principal`).
+    """
+    claims = _get_token_claims(token)
+    user = _claims_user(claims) or await _load_principal(db, str(claims["sub"]))
+    user = _remember_user(request, user)
+    # Las escrituras confirmadas en esta sesión fijan las lecturas del usuario al primario
+    db.info[SESSION_USER_KEY] = user.id
+    return user
+
+
+async def get_async_read_db(
+    current_user: User = Depends(get_current_user_async),
+    primary_db: AsyncSession = Depends(get_async_db),
+):
+    """Sesión para endpoints de lectura: réplica, salvo que el usuario acabe de escribir.
+
+    Sin réplica se reutiliza la sesión del primario de la petición (la del usuario actual).
+    """
+    session_factory = await replica_sessionmaker(current_user.id)
+    if session_factory is None:
+        yield primary_db
+        return
+    async with session_factory() as db:
+        yield db
+
+
 def get_pagination_params(
     skip: int = Query(0, ge=0, description="Número de elementos a saltar (offset)"),
     limit: int = Query(100, ge=1, le=1000, description="Tamaño de página (límite de elementos)"),
+    cursor: str | None = Query(None, description="Cursor opaco devuelto en next_cursor; si se indica, se ignora skip"),
+    total: TotalMode = Query(
+        TotalMode.EXACT,
+        description="Cálculo del total: exact (cuenta todo el conjunto filtrado en cada página), "
+        "estimate (estimación del planificador en PostgreSQL) o none",
+    ),
 ):
-    return {"skip": skip, "limit": limit}
+    return {"skip": skip, "limit": limit, "cursor": cursor, "total_mode": total}
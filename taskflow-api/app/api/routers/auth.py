@@ -1,23 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.rate_limit import limiter
-from app.core.security import create_access_token, verify_password
-from app.db.session import get_db
-from app.repositories.user_repository import UserRepository
+from app.core.security import (
+    PasswordHashingBusyError,
+    create_access_token,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from app.db.session import get_async_db
+from app.repositories.user_repository import AsyncUserRepository
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserRead
 from app.services.user_service import create_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+user_repository = AsyncUserRepository()
+
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 @limiter.limit("5/minute")
-def register(request: Request, user_in: UserCreate, db: Session = Depends(get_db)):
+async def register(request: Request, user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # Un email repetido no debe gastar un hash ni un hueco del pool de bcrypt
+    if await user_repository.get_by_email(db, email=user_in.email) is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email ya registrado")
+    # bcrypt es CPU intensivo: en su pool de procesos (503 si la cola está llena)
+    password_hash = await get_password_hash_async(user_in.password)
     try:
-        user = create_user(db, user_in=user_in)
+        user = await db.run_sync(create_user, user_in=user_in, password_hash=password_hash)
         return user
     except ValueError as e:
         # Email duplicado u otras validaciones del dominio
@@ -26,19 +39,28 @@ def register(request: Request, user_in: UserCreate, db: Session = Depends(get_db
 
 @router.post("/login")
 @limiter.limit("5/minute")
-def login(
+async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Token:
     # username vendrá como email
-    user_repo = UserRepository()
-    user = user_repo.get_by_email(db, email=form_data.username)
+    user = await user_repository.get_by_email(db, email=form_data.username)
     if user is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Credenciales inválidas")
 
-    if not verify_password(form_data.password, user.password_hash):
+    if not await verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Credenciales inválidas")
 
-    access_token = create_access_token({"sub": user.email})
+    # Hash con otro coste (BCRYPT_ROUNDS cambió): se recalcula ahora que tenemos la contraseña.
+    # Si el pool está saturado se deja para el siguiente login.
+    if password_needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await get_password_hash_async(form_data.password)
+            await db.commit()
+        except PasswordHashingBusyError:
+            pass
+
+    # uid y role permiten resolver el usuario de cada petición sin consultar la BD
+    access_token = create_access_token({"sub": user.email, "uid": user.id, "role": user.role.value})
     return Token(access_token=access_token, token_type="bearer")
@@ -1,20 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from fastapi_cache.decorator import cache
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_user, get_pagination_params
-from app.core.cache import default_key_builder
+from app.api.dependencies import get_async_read_db, get_current_user_async, get_pagination_params
+from app.core.cache import cache
+from app.core.pagination import next_cursor
 from app.core.rate_limit import limiter
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
+from app.repositories.board_repository import BoardRepository
+from app.repositories.column_repository import ColumnRepository
 from app.schemas.board import BoardCreate, BoardRead, BoardUpdate
 from app.schemas.column import ColumnRead
 from app.schemas.pagination import Page
+from app.schemas.snapshot import BoardSnapshot
 from app.services.board_service import (
     create_board,
     delete_board,
     get_all_boards_by_user,
     get_board,
+    get_board_snapshot,
     update_board,
 )
 from app.services.column_service import get_columns_by_board
@@ -24,38 +28,49 @@ router = APIRouter(prefix="/boards", tags=["boards"])
 
 @router.post("/", response_model=BoardRead, status_code=status.HTTP_201_CREATED)
 @limiter.limit("30/minute")
-def create_board_endpoint(
+async def create_board_endpoint(
     request: Request,
     board_in: BoardCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    return create_board(db, current_user=current_user, board_in=board_in)
+    return await db.run_sync(create_board, current_user=current_user, board_in=board_in)
 
 
 @router.get("/", response_model=Page[BoardRead])
-@cache(expire=60, namespace="boards:list", key_builder=default_key_builder)
+@cache(expire=60, namespace="boards:list")
 @limiter.limit("60/minute")
-def list_boards_endpoint(
+async def list_boards_endpoint(
     request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
     pagination: dict = Depends(get_pagination_params),
 ):
-    items, total = get_all_boards_by_user(
-        db, current_user=current_user, skip=pagination["skip"], limit=pagination["limit"]
+    items, total = await db.run_sync(
+        get_all_boards_by_user,
+        current_user=current_user,
+        skip=pagination["skip"],
+        limit=pagination["limit"],
+        cursor=pagination["cursor"],
+        total_mode=pagination["total_mode"],
     )
     page = (pagination["skip"] // pagination["limit"]) + 1 if pagination["limit"] > 0 else 1
-    return Page[BoardRead](items=list(items), total=total, page=page, size=pagination["limit"])
+    return Page[BoardRead](
+        items=list(items),
+        total=total,
+        page=page,
+        size=pagination["limit"],
+        next_cursor=next_cursor(items, pagination["limit"], BoardRepository.keyset),
+    )
 
 
 @router.get("/{board_id}", response_model=BoardRead)
-def get_board_endpoint(
+async def get_board_endpoint(
     board_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    board = get_board(db, board_id=board_id, current_user=current_user)
+    board = await db.run_sync(get_board, board_id=board_id, current_user=current_user)
     if board is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado")
     return board
@@ -63,14 +78,14 @@ def get_board_endpoint(
 
 @router.patch("/{board_id}", response_model=BoardRead)
 @limiter.limit("30/minute")
-def update_board_endpoint(
+async def update_board_endpoint(
     request: Request,
     board_id: int,
     board_in: BoardUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    board = update_board(db, board_id=board_id, board_in=board_in, current_user=current_user)
+    board = await db.run_sync(update_board, board_id=board_id, board_in=board_in, current_user=current_user)
     if board is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado o sin permisos")
     return board
@@ -78,36 +93,67 @@ def update_board_endpoint(
 
 @router.delete("/{board_id}", response_model=BoardRead)
 @limiter.limit("30/minute")
-def delete_board_endpoint(
+async def delete_board_endpoint(
     request: Request,
     board_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    board = delete_board(db, board_id=board_id, current_user=current_user)
+    board = await db.run_sync(delete_board, board_id=board_id, current_user=current_user)
     if board is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado o sin permisos")
     return board
 
 
 @router.get("/{board_id}/columns", response_model=Page[ColumnRead])
-@cache(expire=60, namespace="boards:columns", key_builder=default_key_builder)
+@cache(expire=60, namespace="boards:columns")
 @limiter.limit("60/minute")
-def list_board_columns_endpoint(
+async def list_board_columns_endpoint(
     request: Request,
     board_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
     pagination: dict = Depends(get_pagination_params),
 ):
     # La función de servicio valida ownership internamente
-    items, total = get_columns_by_board(
-        db, board_id=board_id, current_user=current_user, skip=pagination["skip"], limit=pagination["limit"]
+    items, total = await db.run_sync(
+        get_columns_by_board,
+        board_id=board_id,
+        current_user=current_user,
+        skip=pagination["skip"],
+        limit=pagination["limit"],
+        cursor=pagination["cursor"],
+        total_mode=pagination["total_mode"],
     )
-    if items == [] and total == 0:
+    if not items and not total:
         # Puede ser tablero inexistente o sin permisos; devolvemos 404 para no filtrar información
-        board = get_board(db, board_id=board_id, current_user=current_user)
+        board = await db.run_sync(get_board, board_id=board_id, current_user=current_user)
         if board is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado o sin permisos")
     page = (pagination["skip"] // pagination["limit"]) + 1 if pagination["limit"] > 0 else 1
-    return Page[ColumnRead](items=list(items), total=total, page=page, size=pagination["limit"])
+    return Page[ColumnRead](
+        items=list(items),
+        total=total,
+        page=page,
+        size=pagination["limit"],
+        next_cursor=next_cursor(items, pagination["limit"], ColumnRepository.keyset),
+    )
+
+
+@router.get("/{board_id}/snapshot", response_model=BoardSnapshot)
+@cache(expire=60, namespace="boards:snapshot")
+@limiter.limit("60/minute")
+async def get_board_snapshot_endpoint(
+    request: Request,
+    board_id: int,
+    tasks_per_column: int = Query(100, ge=1, le=500, description="Máximo de tareas devueltas por columna"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    # Tablero, columnas y tareas en una sola petición (en lugar de 1 + N llamadas)
+    snapshot = await db.run_sync(
+        get_board_snapshot, board_id=board_id, current_user=current_user, tasks_per_column=tasks_per_column
+    )
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado o sin permisos")
+    return snapshot
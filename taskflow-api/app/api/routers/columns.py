@@ -1,18 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_user, get_pagination_params
+from app.api.dependencies import get_async_read_db, get_current_user_async, get_pagination_params
+from app.core.pagination import next_cursor
+from app.core.ranking import needs_rebalance
 from app.core.rate_limit import limiter
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.task import TaskPriority
 from app.models.user import User
-from app.schemas.column import ColumnCreate, ColumnRead, ColumnUpdate
+from app.repositories.task_repository import TaskRepository
+from app.schemas.column import ColumnCreate, ColumnMove, ColumnRead, ColumnUpdate
 from app.schemas.pagination import Page
 from app.schemas.task import TaskRead
 from app.services.column_service import (
     create_column,
     delete_column,
     get_column,
+    move_column,
+    rebalance_column_ranks,
     update_column,
 )
 from app.services.task_service import get_tasks_by_column
@@ -22,25 +27,25 @@ router = APIRouter(prefix="/columns", tags=["columns"])
 
 @router.post("/", response_model=ColumnRead, status_code=status.HTTP_201_CREATED)
 @limiter.limit("30/minute")
-def create_column_endpoint(
+async def create_column_endpoint(
     request: Request,
     column_in: ColumnCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    column = create_column(db, current_user=current_user, column_in=column_in)
+    column = await db.run_sync(create_column, current_user=current_user, column_in=column_in)
     if column is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado o sin permisos")
     return column
 
 
 @router.get("/{column_id}", response_model=ColumnRead)
-def get_column_endpoint(
+async def get_column_endpoint(
     column_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    column = get_column(db, column_id=column_id, current_user=current_user)
+    column = await db.run_sync(get_column, column_id=column_id, current_user=current_user)
     if column is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Columna no encontrada o sin permisos")
     return column
@@ -48,28 +53,48 @@ def get_column_endpoint(
 
 @router.patch("/{column_id}", response_model=ColumnRead)
 @limiter.limit("30/minute")
-def update_column_endpoint(
+async def update_column_endpoint(
     request: Request,
     column_id: int,
     column_in: ColumnUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    column = update_column(db, column_id=column_id, column_in=column_in, current_user=current_user)
+    column = await db.run_sync(update_column, column_id=column_id, column_in=column_in, current_user=current_user)
     if column is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Columna no encontrada o sin permisos")
     return column
 
 
+@router.post("/{column_id}/move", response_model=ColumnRead)
+@limiter.limit("60/minute")
+async def move_column_endpoint(
+    request: Request,
+    column_id: int,
+    move_in: ColumnMove,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    column = await db.run_sync(move_column, column_id=column_id, move_in=move_in, current_user=current_user)
+    if column is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Columna no encontrada o sin permisos")
+    if needs_rebalance(column.rank):
+        background_tasks.add_task(
+            db.run_sync, rebalance_column_ranks, board_id=column.board_id, current_user=current_user
+        )
+    return column
+
+
 @router.delete("/{column_id}", response_model=ColumnRead)
 @limiter.limit("30/minute")
-def delete_column_endpoint(
+async def delete_column_endpoint(
     request: Request,
     column_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    column = delete_column(db, column_id=column_id, current_user=current_user)
+    column = await db.run_sync(delete_column, column_id=column_id, current_user=current_user)
     if column is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Columna no encontrada o sin permisos")
     return column
@@ -77,28 +102,36 @@ def delete_column_endpoint(
 
 @router.get("/{column_id}/tasks", response_model=Page[TaskRead])
 @limiter.limit("60/minute")
-def list_column_tasks_endpoint(
+async def list_column_tasks_endpoint(
     request: Request,
     column_id: int,
     priority: TaskPriority | None = None,
     assignee_id: int | None = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
     pagination: dict = Depends(get_pagination_params),
 ):
-    items, total = get_tasks_by_column(
-        db,
+    items, total = await db.run_sync(
+        get_tasks_by_column,
         column_id=column_id,
         current_user=current_user,
         skip=pagination["skip"],
         limit=pagination["limit"],
+        cursor=pagination["cursor"],
+        total_mode=pagination["total_mode"],
         priority=priority,
         assignee_id=assignee_id,
     )
-    if items == [] and total == 0:
+    if not items and not total:
         # Puede ser columna inexistente o sin permisos
-        column = get_column(db, column_id=column_id, current_user=current_user)
+        column = await db.run_sync(get_column, column_id=column_id, current_user=current_user)
         if column is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Columna no encontrada o sin permisos")
     page = (pagination["skip"] // pagination["limit"]) + 1 if pagination["limit"] > 0 else 1
-    return Page[TaskRead](items=list(items), total=total, page=page, size=pagination["limit"])
+    return Page[TaskRead](
+        items=list(items),
+        total=total,
+        page=page,
+        size=pagination["limit"],
+        next_cursor=next_cursor(items, pagination["limit"], TaskRepository.column_keyset),
+    )
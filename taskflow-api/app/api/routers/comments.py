@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_async_read_db, get_current_user_async
 from app.core.rate_limit import limiter
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
 from app.schemas.comment import CommentCreate, CommentRead, CommentUpdate
 from app.services.comment_service import (
@@ -18,25 +18,25 @@ router = APIRouter(prefix="/comments", tags=["comments"])
 
 @router.post("/", response_model=CommentRead, status_code=status.HTTP_201_CREATED)
 @limiter.limit("60/minute")
-def create_comment_endpoint(
+async def create_comment_endpoint(
     request: Request,
     comment_in: CommentCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    comment = create_comment(db, current_user=current_user, comment_in=comment_in)
+    comment = await db.run_sync(create_comment, current_user=current_user, comment_in=comment_in)
     if comment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada o sin permisos")
     return comment
 
 
 @router.get("/{comment_id}", response_model=CommentRead)
-def get_comment_endpoint(
+async def get_comment_endpoint(
     comment_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    comment = get_comment(db, comment_id=comment_id, current_user=current_user)
+    comment = await db.run_sync(get_comment, comment_id=comment_id, current_user=current_user)
     if comment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comentario no encontrado o sin permisos")
     return comment
@@ -44,14 +44,16 @@ def get_comment_endpoint(
 
 @router.patch("/{comment_id}", response_model=CommentRead)
 @limiter.limit("60/minute")
-def update_comment_endpoint(
+async def update_comment_endpoint(
     request: Request,
     comment_id: int,
     comment_in: CommentUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    comment = update_comment(db, comment_id=comment_id, comment_in=comment_in, current_user=current_user)
+    comment = await db.run_sync(
+        update_comment, comment_id=comment_id, comment_in=comment_in, current_user=current_user
+    )
     if comment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comentario no encontrado o sin permisos")
     return comment
@@ -59,13 +61,13 @@ def update_comment_endpoint(
 
 @router.delete("/{comment_id}", response_model=CommentRead)
 @limiter.limit("60/minute")
-def delete_comment_endpoint(
+async def delete_comment_endpoint(
     request: Request,
     comment_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    comment = delete_comment(db, comment_id=comment_id, current_user=current_user)
+    comment = await db.run_sync(delete_comment, comment_id=comment_id, current_user=current_user)
     if comment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comentario no encontrado o sin permisos")
     return comment
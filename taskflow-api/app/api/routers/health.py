@@ -4,5 +4,5 @@ router = APIRouter()
 
 
 @router.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
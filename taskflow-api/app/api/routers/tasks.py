@@ -1,62 +1,167 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from fastapi_cache.decorator import cache
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_user, get_pagination_params
-from app.core.cache import default_key_builder
+from app.api.dependencies import get_async_read_db, get_current_user_async, get_pagination_params
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.pagination import next_cursor
+from app.core.ranking import needs_rebalance
 from app.core.rate_limit import limiter
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.models.task import TaskPriority
 from app.models.user import User
-from app.schemas.pagination import Page
-from app.schemas.task import TaskCreate, TaskRead, TaskUpdate
-from app.services.task_service import create_task, delete_task, get_task, search_tasks, update_task
+from app.repositories.task_repository import TaskRepository
+from app.schemas.task import (
+    TaskBatchCreate,
+    TaskBatchDelete,
+    TaskBatchResult,
+    TaskBatchUpdate,
+    TaskCreate,
+    TaskMove,
+    TaskRead,
+    TaskSearchPage,
+    TaskSuggestion,
+    TaskUpdate,
+)
+from app.services.task_service import (
+    create_task,
+    create_tasks_batch,
+    delete_task,
+    delete_tasks_batch,
+    get_task,
+    move_task,
+    rebalance_task_ranks,
+    search_task_facets,
+    search_tasks,
+    suggest_task_titles,
+    update_task,
+    update_tasks_batch,
+)
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
-@router.get("/", response_model=Page[TaskRead])
-@cache(expire=60, namespace="tasks:search", key_builder=default_key_builder)
+@router.get("/", response_model=TaskSearchPage)
+@cache(expire=60, namespace="tasks:search")
 @limiter.limit("60/minute")
-def search_tasks_endpoint(
+async def search_tasks_endpoint(
     request: Request,
-    q: str = Query(..., min_length=1, description="Término de búsqueda"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    q: str = Query(..., min_length=1, description='Búsqueda: palabras, "frase exacta", or, -excluir'),
+    prefix: bool = Query(False, description="Casar también palabras que empiezan por los términos"),
+    fuzzy: bool = Query(False, description="Añadir coincidencias por trigramas: subcadenas y errores tipográficos"),
+    similarity: float | None = Query(
+        None, ge=0, le=1, description="Umbral de similitud para fuzzy (por defecto SEARCH_TRIGRAM_THRESHOLD)"
+    ),
+    include_comments: bool = Query(False, description="Buscar también en los comentarios de las tareas"),
+    priority: list[TaskPriority] | None = Query(None, description="Filtrar por prioridad (repetible)"),
+    assignee_id: int | None = Query(None),
+    board_id: int | None = Query(None),
+    facets: bool = Query(False, description="Incluir recuentos por tablero, columna, prioridad y responsable"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
     pagination: dict = Depends(get_pagination_params),
 ):
-    items, total = search_tasks(
-        db,
+    search = {
+        "q": q,
+        "prefix": prefix,
+        "fuzzy": fuzzy,
+        "similarity": similarity,
+        "include_comments": include_comments,
+        "priorities": priority,
+        "assignee_id": assignee_id,
+        "board_id": board_id,
+    }
+    items, total = await db.run_sync(
+        search_tasks,
         current_user=current_user,
-        q=q,
         skip=pagination["skip"],
         limit=pagination["limit"],
+        cursor=pagination["cursor"],
+        total_mode=pagination["total_mode"],
+        **search,
     )
+    facet_counts = await db.run_sync(search_task_facets, current_user=current_user, **search) if facets else None
     page = (pagination["skip"] // pagination["limit"]) + 1 if pagination["limit"] > 0 else 1
-    return Page[TaskRead](items=list(items), total=total, page=page, size=pagination["limit"])
+    return TaskSearchPage(
+        items=list(items),
+        total=total,
+        page=page,
+        size=pagination["limit"],
+        next_cursor=next_cursor(items, pagination["limit"], TaskRepository.search_keyset),
+        facets=facet_counts,
+    )
+
+
+# Búsqueda mientras se escribe: ligera (solo títulos, sin total) y con caché corta por usuario
+@router.get("/suggest", response_model=list[TaskSuggestion])
+@cache(expire=settings.SUGGEST_CACHE_SECONDS, namespace="tasks:suggest")
+@limiter.limit("300/minute")
+async def suggest_tasks_endpoint(
+    request: Request,
+    prefix: str = Query(..., min_length=1, max_length=100, description="Comienzo de las palabras del título"),
+    limit: int = Query(10, ge=1, le=20),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await db.run_sync(suggest_task_titles, current_user=current_user, prefix=prefix, limit=limit)
 
 
 @router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
 @limiter.limit("30/minute")
-def create_task_endpoint(
+async def create_task_endpoint(
     request: Request,
     task_in: TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    task = create_task(db, current_user=current_user, column_id=task_in.column_id, task_in=task_in)
+    task = await db.run_sync(create_task, current_user=current_user, column_id=task_in.column_id, task_in=task_in)
     if task is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Columna no encontrada o sin permisos")
     return task
 
 
+# Las rutas /batch se declaran antes de /{task_id} para que no las capture el path param
+@router.post("/batch", response_model=TaskBatchResult)
+@limiter.limit("30/minute")
+async def create_tasks_batch_endpoint(
+    request: Request,
+    batch_in: TaskBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await db.run_sync(create_tasks_batch, current_user=current_user, batch_in=batch_in)
+
+
+@router.patch("/batch", response_model=TaskBatchResult)
+@limiter.limit("30/minute")
+async def update_tasks_batch_endpoint(
+    request: Request,
+    batch_in: TaskBatchUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await db.run_sync(update_tasks_batch, current_user=current_user, batch_in=batch_in)
+
+
+@router.post("/batch/delete", response_model=TaskBatchResult)
+@limiter.limit("30/minute")
+async def delete_tasks_batch_endpoint(
+    request: Request,
+    batch_in: TaskBatchDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    return await db.run_sync(delete_tasks_batch, current_user=current_user, batch_in=batch_in)
+
+
 @router.get("/{task_id}", response_model=TaskRead)
-@cache(expire=60, namespace="tasks:get", key_builder=default_key_builder)
-def get_task_endpoint(
+@cache(expire=60, namespace="tasks:get")
+async def get_task_endpoint(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    task = get_task(db, task_id=task_id, current_user=current_user)
+    task = await db.run_sync(get_task, task_id=task_id, current_user=current_user)
     if task is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada o sin permisos")
     return task
@@ -64,28 +169,53 @@ def get_task_endpoint(
 
 @router.patch("/{task_id}", response_model=TaskRead)
 @limiter.limit("30/minute")
-def update_task_endpoint(
+async def update_task_endpoint(
     request: Request,
     task_id: int,
     task_in: TaskUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    task = await db.run_sync(update_task, task_id=task_id, task_in=task_in, current_user=current_user)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada o sin permisos")
+    return task
+
+
+@router.post("/{task_id}/move", response_model=TaskRead)
+@limiter.limit("60/minute")
+async def move_task_endpoint(
+    request: Request,
+    task_id: int,
+    move_in: TaskMove,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    task = update_task(db, task_id=task_id, task_in=task_in, current_user=current_user)
+    task = await db.run_sync(move_task, task_id=task_id, move_in=move_in, current_user=current_user)
     if task is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada o sin permisos")
+    if needs_rebalance(task.rank):
+        # Los ranks largos se compactan tras responder
+        background_tasks.add_task(
+            db.run_sync,
+            rebalance_task_ranks,
+            column_id=task.column_id,
+            board_id=task.board_id,
+            current_user=current_user,
+        )
     return task
 
 
 @router.delete("/{task_id}", response_model=TaskRead)
 @limiter.limit("30/minute")
-def delete_task_endpoint(
+async def delete_task_endpoint(
     request: Request,
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    task = delete_task(db, task_id=task_id, current_user=current_user)
+    task = await db.run_sync(delete_task, task_id=task_id, current_user=current_user)
     if task is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada o sin permisos")
     return task
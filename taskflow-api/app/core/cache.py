@@ -1,74 +1,710 @@
-from typing import Callable
+import asyncio
+import functools
+import inspect
+import json
+import secrets
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterable
 
 import anyio
 import redis.asyncio as redis
+import structlog
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
 from fastapi_cache.backends.redis import RedisBackend
 from fastapi_cache.coder import JsonCoder
+from fastapi_cache.decorator import cache as _cache
+from fastapi_cache.types import Backend
+from sqlalchemy import event
+from sqlalchemy.orm import Session, attributes, object_session
+from sqlalchemy.util.concurrency import await_only, in_greenlet
 
 from app.core.config import settings
+from app.core.instrumentation import (
+    CACHE_LOOKUPS,
+    CACHE_REFRESHES,
+    CACHE_SINGLE_FLIGHT,
+    PRINCIPAL_CACHE_LOOKUPS,
+    instrument_cache,
+)
+from app.models.user import User
+
+logger = structlog.get_logger(__name__)
+
+_PREFIX = "taskflow-cache:"
+
+# Clave de Session.info con los emails cuyos principales cacheados hay que descartar al confirmar
+_STALE_PRINCIPALS_KEY = "stale_principals"
+
+# Libera el lock de cálculo solo si sigue siendo nuestro (puede haber caducado y tenerlo otro)
+_RELEASE_LOCK = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+# Claves cuyos aciertos se cuentan en cada worker para decidir el refresh-ahead
+_HOT_KEYS = 10_000
+
+# Claves que cada worker sabe recalcular en segundo plano; retienen los argumentos del endpoint
+_REFRESHABLE_KEYS = 1_000
+
+# TTL de cada namespace de `cache`, con el que guardan los recálculos en segundo plano
+_NAMESPACE_EXPIRE: dict[str, int] = {}
+
+# Clave de stale-while-revalidate o refresh-ahead que `default_key_builder` deja al cálculo que
+# sigue, para que `cache` guarde cómo recalcularla
+_refresh_target: ContextVar[str | None] = ContextVar("cache_refresh_target", default=None)
+
+
+def _namespace_of(key: str) -> str:
+    # Las claves de `@cache` empiezan por "<prefijo>:<namespace>/<path>"
+    return key.removeprefix(f"{_PREFIX}:").split("/", 1)[0]
+
+
+class _LocalCache:
+    """LRU en memoria del proceso acotada por bytes (clave + valor).
+
+    Cada entrada guarda cuándo deja de valer la copia local y cuándo caduca en L2 (None si no
+    caduca), para devolver el TTL real a fastapi-cache.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[bytes, float, float | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> tuple[bytes, float | None] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, local_deadline, deadline = entry
+        now = time.monotonic()
+        if local_deadline <= now:
+            self.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value, None if deadline is None else deadline - now
+
+    def set(self, key: str, value: bytes, *, ttl: float | None, max_ttl: float) -> None:
+        self.pop(key)
+        cost = len(key) + len(value)
+        if cost > self.max_bytes or (ttl is not None and ttl <= 0):
+            return
+        now = time.monotonic()
+        deadline = None if ttl is None else now + ttl
+        self._entries[key] = (value, now + min(max_ttl, ttl if ttl is not None else max_ttl), deadline)
+        self.size += cost
+        while self.size > self.max_bytes:
+            old_key, (old_value, _, _) = self._entries.popitem(last=False)
+            self.size -= len(old_key) + len(old_value)
+
+    def pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(key) + len(entry[0])
+
+    def pop_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            self.pop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+class TieredBackend(Backend):
+    """L1 en memoria de cada worker delante del backend compartido (L2, Redis en producción).
+
+    Cada escritura o borrado se publica en `channel` y el resto de workers descarta su copia.
+    `max_ttl` acota lo que puede durar una copia local si se pierde un aviso.
+
+    Los fallos de `get_with_ttl` (la lectura del decorador `@cache`) se coalescen por clave
+    (single-flight): en el worker, el primero calcula y el resto espera a su `set`. Entre
+    workers, un lock corto en Redis hace que los demás esperen a que el valor aparezca en L2.
+    Si el cálculo falla, al terminar la tarea del líder se libera todo y quien esperaba
+    vuelve a intentarlo.
+
+    Los namespaces con stale-while-revalidate (CACHE_STALE_SECONDS) se guardan con su TTL más la
+    gracia y, pasado el TTL, se sirven caducados mientras una tarea en segundo plano los
+    recalcula; los de refresh-ahead (CACHE_REFRESH_AHEAD) se recalculan antes de caducar si la
+    clave se lee a menudo. Solo puede recalcular una clave el worker que la ha calculado alguna
+    vez (ver `remember`). Cada clave tiene como mucho un recálculo en curso: por worker, y entre
+    workers con el mismo lock de Redis que el single-flight.
+    """
+
+    def __init__(self, l2: Backend, *, max_bytes: int, max_ttl: float, channel: str) -> None:
+        self.l1 = _LocalCache(max_bytes)
+        self.l2 = l2
+        self.max_ttl = max_ttl
+        self.channel = channel
+        self.redis = l2.redis if isinstance(l2, RedisBackend) else None
+        self.hits = {"l1": 0, "l2": 0}
+        self.lookups = {"l1": 0, "l2": 0}
+        self._origin = secrets.token_hex(8)
+        # Avisos recibidos de otros workers: una lectura de L2 solo se copia en L1 si no ha
+        # llegado ninguno mientras se esperaba la respuesta
+        self._epoch = 0
+        # Cálculos en curso en este worker (clave -> futuro con (ttl, valor), o None si se abandona)
+        # y token del lock de Redis de los que lidera este worker
+        self._flights: dict[str, asyncio.Future] = {}
+        self._locks: dict[str, str] = {}
+        # Recálculos en segundo plano en curso, cómo recalcular cada clave y aciertos por clave
+        # para el refresh-ahead (ambos LRU)
+        self._refreshes: dict[str, asyncio.Task] = {}
+        self._recompute: OrderedDict[str, Callable[[], Awaitable]] = OrderedDict()
+        self._hot: OrderedDict[str, int] = OrderedDict()
+
+    def hit_ratio(self, tier: str) -> float:
+        return self.hits[tier] / self.lookups[tier] if self.lookups[tier] else 0.0
+
+    def _count(self, tier: str, hit: bool) -> None:
+        self.lookups[tier] += 1
+        self.hits[tier] += hit
+        CACHE_LOOKUPS.labels(tier=tier, result="hit" if hit else "miss").inc()
+
+    def _from_l1(self, key: str) -> tuple[bytes, float | None] | None:
+        local = self.l1.get(key)
+        self._count("l1", local is not None)
+        return local
+
+    def _fill(self, key: str, ttl: int, value: bytes | None, epoch: int) -> None:
+        self._count("l2", value is not None)
+        # Redis devuelve -1 para claves sin caducidad
+        if value is not None and epoch == self._epoch:
+            self.l1.set(key, value, ttl=None if ttl == -1 else ttl, max_ttl=self.max_ttl)
+
+    async def _lookup(self, key: str) -> tuple[int, bytes | None]:
+        local = self._from_l1(key)
+        if local is not None:
+            value, ttl = local
+            return (-1 if ttl is None else max(int(ttl), 0)), value
+        epoch = self._epoch
+        ttl, value = await self.l2.get_with_ttl(key)
+        self._fill(key, ttl, value, epoch)
+        return ttl, value
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        """Lectura con single-flight: un fallo devuelto convierte al llamante en el líder, que
+        debe calcular el valor y guardarlo con `set` (o terminar su tarea si falla).
+
+        El TTL devuelto descuenta la gracia de stale-while-revalidate; un valor caducado se
+        devuelve con TTL 0 tras lanzar su recálculo.
+        """
+        ttl, value = await self._get_coalesced(key)
+        namespace = _namespace_of(key)
+        stale = settings.CACHE_STALE_SECONDS.get(namespace, 0)
+        ahead = settings.CACHE_REFRESH_AHEAD.get(namespace, 0.0)
+        if value is None or ttl < 0 or not (stale or ahead):
+            return ttl, value
+        ttl -= stale
+        if ttl <= 0:
+            self._start_refresh(key, namespace, "stale")
+            return 0, value
+        if ahead:
+            hits = self._hit(key)
+            if ttl <= ahead * _NAMESPACE_EXPIRE.get(namespace, 0) and hits >= settings.CACHE_REFRESH_AHEAD_MIN_HITS:
+                self._start_refresh(key, namespace, "ahead")
+        return ttl, value
+
+    async def _get_coalesced(self, key: str) -> tuple[int, bytes | None]:
+        # Un segundo intento tras un líder fallido; después se calcula sin coalescer
+        for _ in range(2):
+            flight = self._flights.get(key)
+            if flight is None:
+                ttl, value = await self._lookup(key)
+                if value is not None:
+                    return ttl, value
+                flight = self._flights.get(key)
+                if flight is None:
+                    return await self._lead(key)
+            try:
+                result = await asyncio.wait_for(asyncio.shield(flight), timeout=settings.CACHE_LOCK_SECONDS)
+            except asyncio.TimeoutError:
+                result = None
+            if result is not None:
+                CACHE_SINGLE_FLIGHT.labels(result="coalesced").inc()
+                return result
+        CACHE_SINGLE_FLIGHT.labels(result="abandoned").inc()
+        return 0, None
+
+    async def _lead(self, key: str) -> tuple[int, bytes | None]:
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        if self.redis is not None:
+            result = await self._wait_for_other_worker(key)
+            if result is not None:
+                CACHE_SINGLE_FLIGHT.labels(result="remote").inc()
+                self._land(key, flight, result)
+                return result
+        # Si el endpoint falla no habrá `set`: se libera al terminar la tarea de la petición
+        task = asyncio.current_task()
+        if task is not None:
+            task.add_done_callback(lambda _: self._land(key, flight, None))
+        CACHE_SINGLE_FLIGHT.labels(result="leader").inc()
+        return 0, None
+
+    def _hit(self, key: str) -> int:
+        hits = self._hot.pop(key, 0) + 1
+        self._hot[key] = hits
+        if len(self._hot) > _HOT_KEYS:
+            self._hot.popitem(last=False)
+        return hits
+
+    def remember(self, key: str, recompute: Callable[[], Awaitable]) -> None:
+        """Guarda cómo recalcular `key` (el endpoint con sus argumentos) para los recálculos en segundo plano."""
+        self._recompute.pop(key, None)
+        self._recompute[key] = recompute
+        if len(self._recompute) > _REFRESHABLE_KEYS:
+            self._recompute.popitem(last=False)
+
+    def _start_refresh(self, key: str, namespace: str, trigger: str) -> None:
+        recompute = self._recompute.get(key)
+        expire = _NAMESPACE_EXPIRE.get(namespace)
+        if recompute is None or expire is None or key in self._refreshes:
+            return
+        task = asyncio.create_task(self._refresh(key, expire, trigger, recompute))
+        self._refreshes[key] = task
+        task.add_done_callback(lambda _: self._refreshes.pop(key, None))
+
+    async def _refresh(self, key: str, expire: int, trigger: str, recompute: Callable[[], Awaitable]) -> None:
+        token = None
+        try:
+            if self.redis is not None:
+                token = secrets.token_hex(8)
+                if not await self._try_lock(key, token):
+                    # Ya lo recalcula otro worker
+                    token = None
+                    CACHE_REFRESHES.labels(trigger=trigger, result="skipped").inc()
+                    return
+            value = FastAPICache.get_coder().encode(await recompute())
+            await self.set(key, value, expire)
+            CACHE_REFRESHES.labels(trigger=trigger, result="ok").inc()
+        except Exception:
+            # Se sigue sirviendo el valor anterior hasta que termine la gracia
+            CACHE_REFRESHES.labels(trigger=trigger, result="error").inc()
+            logger.warning("cache_refresh_failed", key=key, trigger=trigger, exc_info=True)
+        finally:
+            if token is not None:
+                await self._release_lock(key, token)
+
+    def _try_lock(self, key: str, token: str) -> Awaitable:
+        return self.redis.set(
+            f"{FastAPICache.get_prefix()}lock:{key}", token, nx=True, px=int(settings.CACHE_LOCK_SECONDS * 1000)
+        )
+
+    async def _wait_for_other_worker(self, key: str) -> tuple[int, bytes] | None:
+        """Toma el lock de cálculo de `key`; si lo tiene otro worker espera a que deje el valor en L2.
+
+        Devuelve el valor calculado por el otro worker, o None si este debe calcularlo.
+        """
+        token = secrets.token_hex(8)
+        deadline = time.monotonic() + settings.CACHE_LOCK_SECONDS
+        try:
+            while not await self._try_lock(key, token):
+                if time.monotonic() >= deadline:
+                    return None
+                await asyncio.sleep(settings.CACHE_LOCK_POLL_SECONDS)
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    ttl, value = await pipe.ttl(key).get(key).execute()
+                if value is not None:
+                    self._fill(key, ttl, value, self._epoch)
+                    return ttl, value
+                # Sin valor todavía: se vuelve a intentar el lock, libre si el otro worker falló
+            self._locks[key] = token
+        except Exception:
+            # Sin Redis no hay coordinación entre workers, pero sí dentro del worker
+            logger.warning("cache_single_flight_lock_failed", exc_info=True)
+        return None
+
+    def _land(self, key: str, flight: asyncio.Future, result: tuple[int, bytes] | None) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+            token = self._locks.pop(key, None)
+            if token is not None:
+                asyncio.ensure_future(self._release_lock(key, token))
+        if not flight.done():
+            flight.set_result(result)
+
+    async def _release_lock(self, key: str, token: str) -> None:
+        try:
+            await self.redis.eval(_RELEASE_LOCK, 1, f"{FastAPICache.get_prefix()}lock:{key}", token)
+        except Exception:
+            # Caduca solo en CACHE_LOCK_SECONDS
+            pass
+
+    async def get(self, key: str) -> bytes | None:
+        """Lectura sin single-flight (generaciones, principales, marcas de réplica): un fallo es
+        un resultado normal que nadie va a rellenar."""
+        return (await self._lookup(key))[1]
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        """Varias claves con un solo viaje a L2 para las que no están en L1."""
+        values: dict[str, bytes | None] = {}
+        missing = []
+        for key in keys:
+            local = self._from_l1(key)
+            if local is not None:
+                values[key] = local[0]
+            else:
+                missing.append(key)
+        if missing:
+            epoch = self._epoch
+            if self.redis is not None:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key in missing:
+                        pipe.ttl(key).get(key)
+                    replies = await pipe.execute()
+                fetched = list(zip(replies[::2], replies[1::2]))
+            else:
+                fetched = [await self.l2.get_with_ttl(key) for key in missing]
+            for key, (ttl, value) in zip(missing, fetched):
+                self._fill(key, ttl, value, epoch)
+                values[key] = value
+        return [values[key] for key in keys]
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        if expire:
+            # La entrada sobrevive a su TTL para poder servirse mientras se recalcula
+            expire += settings.CACHE_STALE_SECONDS.get(_namespace_of(key), 0)
+        self._hot.pop(key, None)
+        await self.l2.set(key, value, expire)
+        self.l1.set(key, value, ttl=expire or None, max_ttl=self.max_ttl)
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._land(key, flight, (expire or -1, value))
+        await self._publish("k", key)
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        try:
+            return await self.l2.clear(namespace, key)
+        finally:
+            # También si L2 falla (p. ej. InMemoryBackend con una clave que ya no existe)
+            if namespace:
+                self.l1.pop_prefix(namespace)
+                await self._publish("n", namespace)
+            elif key:
+                self.l1.pop(key)
+                await self._publish("k", key)
+
+    async def _publish(self, kind: str, target: str) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.publish(self.channel, f"{self._origin} {kind} {target}")
+        except Exception:
+            # El TTL de L1 acota la copia desactualizada del resto de workers
+            logger.warning("cache_invalidation_publish_failed", target=target, exc_info=True)
+
+    def handle_message(self, data: bytes | str) -> None:
+        """Aplica un aviso de invalidación (`<origen> <k|n> <clave o namespace>`)."""
+        if isinstance(data, bytes):
+            data = data.decode()
+        origin, kind, target = data.split(" ", 2)
+        if origin == self._origin:
+            return
+        self._epoch += 1
+        if kind == "n":
+            self.l1.pop_prefix(target)
+        else:
+            self.l1.pop(target)
+
+    async def listen(self) -> None:
+        """Aplica los avisos del resto de workers hasta que se cancela; se reconecta si Redis cae."""
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Los avisos perdidos mientras no había suscripción invalidan toda la L1
+                    self._epoch += 1
+                    self.l1.clear()
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self.handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("cache_invalidation_listener_failed", exc_info=True)
+                await asyncio.sleep(1)
 
 
 def init_cache() -> None:
     """Inicializa FastAPICache con backend de Redis.
 
-    Usa la URL definida en settings.REDIS_URL.
+    Usa la URL definida en settings.REDIS_URL. Delante de Redis va una L1 en memoria de cada
+    worker con single-flight (`TieredBackend`).
     """
     # En pruebas usamos backend en memoria para no depender de Redis
     if settings.ENV.lower().startswith("test"):
-        FastAPICache.init(InMemoryBackend(), prefix="taskflow-cache:", coder=JsonCoder())
+        backend: Backend = InMemoryBackend()
     else:
         # Importante: no usar decode_responses=True porque fastapi-cache
         # espera bytes y realiza value.decode() durante la deserialización.
         # Si Redis devuelve str se produce: 'str' object has no attribute 'decode'.
-        redis_client = redis.from_url(settings.REDIS_URL)
-        FastAPICache.init(RedisBackend(redis_client), prefix="taskflow-cache:", coder=JsonCoder())
+        redis_client = redis.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            socket_keepalive=True,
+        )
+        backend = RedisBackend(redis_client)
+    # Con CACHE_L1_MAX_BYTES=0 la L1 no guarda nada, pero se mantiene el single-flight
+    backend = TieredBackend(
+        backend,
+        max_bytes=settings.CACHE_L1_MAX_BYTES,
+        max_ttl=settings.CACHE_L1_TTL_SECONDS,
+        channel=f"{_PREFIX}invalidate",
+    )
+    instrument_cache(backend)
+    FastAPICache.init(backend, prefix=_PREFIX, coder=JsonCoder())
 
 
-def default_key_builder(func: Callable, namespace: str = "", request=None, response=None, *args, **kwargs) -> str:
+async def close_cache() -> None:
+    """Cierra el cliente de Redis de la caché; debe llamarse en el loop en que se ha usado."""
+    backend = FastAPICache.get_backend()
+    if isinstance(backend, TieredBackend) and backend.redis is not None:
+        await backend.redis.aclose()
+
+
+def start_invalidation_listener() -> asyncio.Task | None:
+    """Arranca la escucha de avisos de invalidación de L1 si la caché tiene L1 sobre Redis."""
+    backend = FastAPICache.get_backend()
+    if isinstance(backend, TieredBackend) and backend.redis is not None and backend.l1.max_bytes > 0:
+        return asyncio.create_task(backend.listen())
+    return None
+
+
+# Etiquetas de invalidación de cada namespace: `user` es la del usuario autenticado y `board` la
+# del tablero de la ruta. Cada etiqueta tiene una generación en el backend que forma parte de la
+# clave; invalidar es cambiar la generación (un SET), y las entradas viejas caducan por su TTL.
+_NAMESPACE_TAGS: dict[str, tuple[str, ...]] = {
+    "tasks:get": ("user:tasks",),
+    "tasks:search": ("user:tasks", "user:search"),
+    "tasks:suggest": ("user:tasks",),
+    "boards:list": ("user:boards",),
+    "boards:columns": ("board",),
+    "boards:snapshot": ("board",),
+}
+
+
+def _user_tag(user_id: int, scope: str) -> str:
+    return f"u:{user_id}:{scope}"
+
+
+def _board_tag(board_id: int) -> str:
+    return f"b:{board_id}"
+
+
+def _generation_key(tag: str) -> str:
+    return f"{FastAPICache.get_prefix()}gen:{tag}"
+
+
+def _request_tags(namespace: str, request, user_id: int | None) -> list[str]:
+    tags: list[str] = []
+    for tag in _NAMESPACE_TAGS.get(namespace.removeprefix(f"{FastAPICache.get_prefix()}:"), ()):
+        if tag == "board":
+            board_id = request.path_params.get("board_id")
+            if board_id is not None:
+                tags.append(_board_tag(board_id))
+        elif user_id is not None:
+            tags.append(_user_tag(user_id, tag.removeprefix("user:")))
+    return tags
+
+
+async def _generations(tags: list[str]) -> list[str]:
+    backend = FastAPICache.get_backend()
+    keys = [_generation_key(tag) for tag in tags]
+    try:
+        if isinstance(backend, TieredBackend):
+            values = await backend.get_many(keys)
+        elif isinstance(backend, RedisBackend):
+            # Un solo viaje a Redis para todas las etiquetas
+            values = await backend.redis.mget(keys)
+        else:
+            values = [await backend.get(key) for key in keys]
+    except Exception:
+        # Sin generación conocida la clave no debe coincidir con ninguna entrada guardada
+        return [secrets.token_hex(4)]
+    return [value.decode() if value else "0" for value in values]
+
+
+async def default_key_builder(
+    func: Callable, namespace: str = "", request=None, response=None, *args, **kwargs
+) -> str:
     """Creador de claves por defecto que incluye usuario autenticado cuando existe.
 
-    Así evitamos mezclar respuestas entre usuarios.
+    Así evitamos mezclar respuestas entre usuarios. La clave termina con las generaciones
+    de las etiquetas del namespace (usuario y tablero), que cambian al invalidar.
     """
     parts: list[str] = [namespace or func.__module__ + ":" + func.__name__]
-    if request is not None:
-        # Incluir path y query
-        parts.append(request.url.path)
-        if request.url.query:
-            parts.append("?" + request.url.query)
-        # Incluir user id si está disponible
+    if request is None:
+        return "".join(parts)
+    # Incluir path y query
+    parts.append(request.url.path)
+    if request.url.query:
+        parts.append("?" + request.url.query)
+    # Incluir user id si está disponible
+    user_id = None
+    try:
+        user = request.state.user if hasattr(request.state, "user") else None
+        if user and getattr(user, "id", None) is not None:
+            user_id = user.id
+            parts.append(f"|u:{user_id}")
+    except Exception:
+        pass
+    tags = _request_tags(namespace, request, user_id)
+    if tags:
+        parts.append("|g:" + ".".join(await _generations(tags)))
+    key = "".join(parts)
+    bare = namespace.removeprefix(f"{_PREFIX}:")
+    refreshable = bare in settings.CACHE_STALE_SECONDS or bare in settings.CACHE_REFRESH_AHEAD
+    _refresh_target.set(key if refreshable else None)
+    return key
+
+
+def cache(*, expire: int, namespace: str) -> Callable:
+    """`@cache` de fastapi-cache con `default_key_builder`.
+
+    Registra el TTL del namespace, con el que se guardan sus recálculos de stale-while-revalidate
+    y refresh-ahead. Al calcular una entrada de esos namespaces deja en el backend cómo
+    recalcularla: el endpoint sin envoltorios (sin `@cache` ni rate limit) con los argumentos de
+    esta llamada, que incluyen las dependencias que resolvió la ruta. La sesión de BD, ya
+    cerrada, abre otra conexión contra el mismo motor (réplica o primario) al reutilizarse.
+    """
+    _NAMESPACE_EXPIRE[namespace] = expire
+    decorator = _cache(expire=expire, namespace=namespace, key_builder=default_key_builder)
+
+    def wrapper(func: Callable) -> Callable:
+        endpoint = inspect.unwrap(func)
+
+        @functools.wraps(func)
+        async def remembering(*args, **kwargs):
+            result = await func(*args, **kwargs)
+            key = _refresh_target.get()
+            backend = FastAPICache.get_backend()
+            if key is not None and isinstance(backend, TieredBackend):
+                backend.remember(key, functools.partial(endpoint, *args, **kwargs))
+            return result
+
+        return decorator(remembering)
+
+    return wrapper
+
+
+async def _bump_generations(tags: list[str]) -> None:
+    backend = FastAPICache.get_backend()
+    # Basta con un valor distinto del anterior; debe sobrevivir a las entradas que lo usan
+    generation = secrets.token_hex(4).encode()
+    for tag in tags:
+        await backend.set(_generation_key(tag), generation, expire=settings.CACHE_GENERATION_TTL_SECONDS)
+
+
+def run_async(func: Callable[..., Awaitable], *args) -> None:
+    """Ejecuta una corrutina de caché desde código síncrono sin propagar sus errores.
+
+    - Dentro de `AsyncSession.run_sync` estamos en el hilo del event loop, en el greenlet
+      de SQLAlchemy, y podemos esperar la corrutina directamente.
+    - En un hilo del threadpool se delega en el loop con anyio.
+    - Sin loop (tests síncronos) se crea uno.
+    """
+    if in_greenlet():
         try:
-            user = request.state.user if hasattr(request.state, "user") else None
-            if user and getattr(user, "id", None) is not None:
-                parts.append(f"|u:{user.id}")
+            await_only(func(*args))
         except Exception:
             pass
-    return "".join(parts)
-
-
-async def _clear_namespaces(namespaces: list[str]) -> None:
-    for ns in namespaces:
+        return
+    try:
+        anyio.from_thread.run(func, *args)
+    except Exception:
         try:
-            await FastAPICache.clear(namespace=ns)
+            asyncio.run(func(*args))
         except Exception:
-            # Evitar que la invalidación rompa la petición principal
             pass
 
 
-def invalidate_tasks_cache_for_user(_: int) -> None:
-    """Invalidación gruesa por espacios de nombres para tareas.
+def _invalidate_tags(tags: list[str]) -> None:
+    run_async(_bump_generations, tags)
+
+
+def invalidate_tasks_cache_for_user(user_id: int, board_ids: Iterable[int] = ()) -> None:
+    """Invalida las tareas del usuario (detalle, búsquedas y sugerencias).
 
-    Por simplicidad y robustez (y TTL corto), limpiamos los espacios
-    de nombres de tareas en cambios (create/update/delete).
+    También los snapshots de `board_ids`, los tableros cuyas tareas han cambiado. El resto
+    de usuarios y tableros conserva su caché.
     """
+    _invalidate_tags([_user_tag(user_id, "tasks"), *map(_board_tag, set(board_ids))])
+
+
+def invalidate_search_cache_for_user(user_id: int) -> None:
+    """Búsquedas de tareas: los comentarios forman parte del índice de búsqueda."""
+    _invalidate_tags([_user_tag(user_id, "search")])
+
+
+def invalidate_boards_cache_for_user(user_id: int, board_ids: Iterable[int] = ()) -> None:
+    """Invalida el listado de tableros del usuario y las columnas y snapshots de `board_ids`."""
+    _invalidate_tags([_user_tag(user_id, "boards"), *map(_board_tag, set(board_ids))])
+
+
+def _principal_key(subject: str) -> str:
+    return f"{FastAPICache.get_prefix()}principal:{subject}"
+
+
+async def get_cached_principal(subject: str) -> dict | None:
+    """Campos del usuario autenticado (`id`, `email`, `role`) guardados para el `sub` del token."""
     try:
-        anyio.from_thread.run(_clear_namespaces, ["tasks:get", "tasks:search"])
+        value = await FastAPICache.get_backend().get(_principal_key(subject))
     except Exception:
-        # Si no hay loop (tests sync), intentamos crear uno
-        try:
-            import asyncio
+        return None
+    # Cada acierto es una consulta a `users` menos en la petición
+    PRINCIPAL_CACHE_LOOKUPS.labels(result="hit" if value else "miss").inc()
+    return json.loads(value) if value else None
+
+
+async def cache_principal(subject: str, principal: dict) -> None:
+    try:
+        await FastAPICache.get_backend().set(
+            _principal_key(subject), json.dumps(principal).encode(), expire=settings.PRINCIPAL_CACHE_SECONDS
+        )
+    except Exception:
+        pass
+
 
-            asyncio.run(_clear_namespaces(["tasks:get", "tasks:search"]))
+async def _clear_principals(subjects: list[str]) -> None:
+    backend = FastAPICache.get_backend()
+    for subject in subjects:
+        try:
+            await backend.clear(key=_principal_key(subject))
         except Exception:
             pass
+
+
+def invalidate_principals(subjects: Iterable[str]) -> None:
+    """Descarta los principales cacheados de esos `sub` (en Redis y en la L1 de todos los workers)."""
+    run_async(_clear_principals, list(subjects))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_stale_principal(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        # El email anterior también, si ha cambiado: es el `sub` de los tokens ya emitidos
+        stale = session.info.setdefault(_STALE_PRINCIPALS_KEY, set())
+        stale.add(target.email)
+        stale.update(attributes.get_history(target, "email").deleted)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale_principals(session: Session) -> None:
+    stale = session.info.pop(_STALE_PRINCIPALS_KEY, None)
+    if stale:
+        invalidate_principals(stale)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_principals(session: Session) -> None:
+    session.info.pop(_STALE_PRINCIPALS_KEY, None)
@@ -7,6 +7,17 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     SECRET_KEY: str = "change_me"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # `kid` de los tokens firmados con SECRET_KEY y claves anteriores (kid -> clave) que solo se
+    # aceptan para verificar tokens aún vigentes durante una rotación
+    JWT_KEY_ID: str = "k1"
+    JWT_PREVIOUS_KEYS: dict[str, str] = {}
+    # Tokens ya verificados que se recuerdan (por worker) hasta su `exp`; 0 lo desactiva
+    VERIFIED_TOKEN_CACHE_SIZE: int = 10000
+    # Coste de bcrypt (log2 de las iteraciones); los hashes con otro coste se recalculan en el login
+    BCRYPT_ROUNDS: int = 12
+    # Procesos dedicados a bcrypt por worker y hashes que pueden esperar turno antes de responder 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16
 
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
@@ -14,7 +25,71 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "taskflow"
     POSTGRES_PASSWORD: str = "taskflow"
 
+    # Pool de conexiones por worker (se aplica al motor síncrono y al asíncrono)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    # Segundos antes de reciclar una conexión (-1 = nunca)
+    DB_POOL_RECYCLE: int = 1800
+    # Ping en cada checkout; sin él, una conexión caída se detecta al fallar la consulta
+    DB_POOL_PRE_PING: bool = True
+    # LIFO reutiliza las conexiones calientes y deja que las ociosas expiren en el servidor
+    DB_POOL_USE_LIFO: bool = True
+
+    # Réplicas de lectura (URLs SQLAlchemy completas, p. ej. postgresql+psycopg://...).
+    # En .env como lista JSON: DB_REPLICA_URLS=["postgresql+psycopg://u:p@replica1/taskflow"]
+    DB_REPLICA_URLS: list[str] = []
+    # Tras escribir, las lecturas del usuario van al primario durante esta ventana (segundos)
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    # Archivado de filas soft-deleted (python -m app.db.maintenance o tarea periódica)
+    ARCHIVE_AFTER_DAYS: int = 30
+    # "archive" mueve a las tablas *_archive; "purge" borra físicamente
+    ARCHIVE_MODE: str = "archive"
+    ARCHIVE_BATCH_SIZE: int = 1000
+    # Pausa entre lotes para dejar pasar al resto de escrituras
+    ARCHIVE_BATCH_PAUSE_SECONDS: float = 0.0
+    ARCHIVE_LOCK_TIMEOUT_MS: int = 2000
+    # Cada cuántos segundos se ejecuta dentro de la API (0 = desactivado; usar cron con el comando)
+    ARCHIVE_INTERVAL_SECONDS: int = 0
+
+    # Candidatos (los más recientes que casan) sobre los que se calcula la relevancia de una búsqueda
+    SEARCH_CANDIDATE_LIMIT: int = 1000
+    # Umbral por defecto de word_similarity (0-1) en la búsqueda difusa con trigramas (fuzzy=true)
+    SEARCH_TRIGRAM_THRESHOLD: float = 0.5
+    # Sugerencias de títulos (GET /tasks/suggest): candidatos ordenados y TTL de su caché por usuario
+    SUGGEST_CANDIDATE_LIMIT: int = 200
+    SUGGEST_CACHE_SECONDS: int = 10
+    # Vida de las generaciones de invalidación de la caché; mayor que cualquier TTL de `@cache`
+    CACHE_GENERATION_TTL_SECONDS: int = 86400
+    # L1 en memoria de cada worker delante de Redis (0 la desactiva) y vida máxima de sus copias,
+    # que acota la desactualización si se pierde un aviso de invalidación por pub/sub
+    CACHE_L1_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_L1_TTL_SECONDS: float = 10.0
+    # Single-flight: espera máxima (y vida del lock de cálculo en Redis) y sondeo entre workers
+    CACHE_LOCK_SECONDS: float = 5.0
+    CACHE_LOCK_POLL_SECONDS: float = 0.05
+    # Stale-while-revalidate por namespace de `@cache`: segundos tras caducar en los que se sirve
+    # el valor anterior mientras una sola tarea en segundo plano lo recalcula
+    CACHE_STALE_SECONDS: dict[str, int] = {
+        "boards:list": 30,
+        "boards:columns": 30,
+        "boards:snapshot": 30,
+        "tasks:get": 30,
+        "tasks:search": 30,
+    }
+    # Refresh-ahead por namespace: fracción final del TTL en la que un acierto sobre una clave con
+    # al menos CACHE_REFRESH_AHEAD_MIN_HITS aciertos en el worker la recalcula antes de que caduque
+    CACHE_REFRESH_AHEAD: dict[str, float] = {"boards:columns": 0.2, "boards:snapshot": 0.2}
+    CACHE_REFRESH_AHEAD_MIN_HITS: int = 5
+    # Vida del usuario autenticado (id, email, role) cacheado por `sub` del token; 0 lo desactiva
+    PRINCIPAL_CACHE_SECONDS: int = 30
+
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 2.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
 
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
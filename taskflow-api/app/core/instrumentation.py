@@ -0,0 +1,101 @@
+"""Métricas propias de Prometheus; se exponen en /metrics junto a las del Instrumentator."""
+
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tiempo de espera para obtener una conexión del pool",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Tamaño configurado del pool", ["engine"])
+DB_POOL_IN_USE = Gauge("db_pool_connections_in_use", "Conexiones prestadas en este momento", ["engine"])
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Conexiones abiertas por encima de pool_size", ["engine"])
+
+ARCHIVE_ROWS = Counter("archive_rows_total", "Filas soft-deleted archivadas o purgadas", ["table", "mode"])
+ARCHIVE_BATCH_SECONDS = Histogram(
+    "archive_batch_seconds",
+    "Duración de cada lote de archivado (tiempo con bloqueos tomados)",
+    ["table", "mode"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Lecturas de la caché por nivel (l1: memoria del worker, l2: Redis)", ["tier", "result"]
+)
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio", "Aciertos sobre lecturas de cada nivel de la caché desde el arranque", ["tier"]
+)
+CACHE_L1_BYTES = Gauge("cache_l1_bytes", "Bytes ocupados por la L1 de la caché en este worker")
+CACHE_L1_ENTRIES = Gauge("cache_l1_entries", "Entradas en la L1 de la caché en este worker")
+CACHE_SINGLE_FLIGHT = Counter(
+    "cache_single_flight_total",
+    "Fallos de caché por cómo se resolvieron: leader (calcula), coalesced (espera a otro en el worker), "
+    "remote (valor calculado por otro worker) y abandoned (el líder falló y se calcula sin coalescer)",
+    ["result"],
+)
+CACHE_REFRESHES = Counter(
+    "cache_refreshes_total",
+    "Recálculos de caché en segundo plano por motivo (stale: servido caducado, ahead: refresh-ahead) "
+    "y resultado (ok, error o skipped si ya lo hacía otro worker)",
+    ["trigger", "result"],
+)
+PASSWORD_HASH_QUEUE_DEPTH = Gauge("password_hash_queue_depth", "Hashes bcrypt esperando un proceso libre")
+PASSWORD_HASH_IN_FLIGHT = Gauge("password_hash_in_flight", "Hashes bcrypt en ejecución o en cola")
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Peticiones rechazadas (503) por la cola de bcrypt llena"
+)
+PRINCIPAL_CACHE_LOOKUPS = Counter(
+    "principal_cache_lookups_total",
+    "Resoluciones del usuario autenticado desde la caché de principales (hit: consulta a users evitada)",
+    ["result"],
+)
+
+
+class _TimedCheckoutMixin:
+    """Mide cuánto tarda cada checkout (espera en la cola o apertura de conexión de overflow).
+
+    La etiqueta es el `pool_logging_name` del motor, que se conserva al recrear el pool.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            label = getattr(self, "_orig_logging_name", None) or "default"
+            DB_POOL_CHECKOUT_WAIT.labels(engine=label).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Publica los gauges del pool de `engine` (para AsyncEngine, su `sync_engine`).
+
+    Los valores se leen en cada scrape a través de `engine.pool`, de modo que siguen
+    siendo correctos tras `engine.dispose()`.
+    """
+    if not isinstance(engine.pool, QueuePool):
+        return
+    DB_POOL_SIZE.labels(engine=name).set_function(lambda: engine.pool.size())
+    DB_POOL_IN_USE.labels(engine=name).set_function(lambda: engine.pool.checkedout())
+    # overflow() es negativo mientras no se han abierto todas las conexiones base
+    DB_POOL_OVERFLOW.labels(engine=name).set_function(lambda: max(engine.pool.overflow(), 0))
+
+
+def instrument_cache(backend) -> None:
+    """Publica el ratio de aciertos por nivel y la ocupación de la L1 de un `TieredBackend`."""
+    for tier in ("l1", "l2"):
+        CACHE_HIT_RATIO.labels(tier=tier).set_function(lambda tier=tier: backend.hit_ratio(tier))
+    CACHE_L1_BYTES.set_function(lambda: backend.l1.size)
+    CACHE_L1_ENTRIES.set_function(lambda: len(backend.l1))
@@ -0,0 +1,85 @@
+import base64
+import enum
+import json
+from typing import Any, Sequence
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+
+class TotalMode(str, enum.Enum):
+    """Cómo se calcula `Page.total` en los listados."""
+
+    EXACT = "exact"  # conteo exacto en la misma sentencia que la página
+    ESTIMATE = "estimate"  # estimación del planificador (PostgreSQL)
+    NONE = "none"  # sin conteo
+
+
+class InvalidCursorError(ValueError):
+    """El cursor recibido no se pudo decodificar."""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Codifica los valores de la clave de ordenación en un cursor opaco (base64 url-safe)."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _accepts(column, value: Any) -> bool:
+    """Si `value` puede compararse con `column` (un bool de JSON no cuenta como número)."""
+    if isinstance(value, bool):
+        return False
+    try:
+        expected = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        # Expresiones sin tipo conocido: solo números, que se comparan con cualquier puntuación
+        return isinstance(value, (int, float))
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: str, keyset: Sequence[Any]) -> list[Any]:
+    """Decodifica un cursor y valida que tenga un valor del tipo de cada columna de la clave."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Cursor inválido") from exc
+    if not isinstance(values, list) or len(values) != len(keyset):
+        raise InvalidCursorError("Cursor inválido")
+    # Un valor de otro tipo llegaría hasta el bind de la consulta (500 en PostgreSQL)
+    if not all(_accepts(column, value) for column, value in zip(keyset, values)):
+        raise InvalidCursorError("Cursor inválido")
+    return values
+
+
+def apply_keyset(
+    query: Query,
+    keyset: Sequence[InstrumentedAttribute],
+    cursor: str | None,
+    *,
+    descending: bool = False,
+) -> Query:
+    """Ordena por la clave `keyset` y, si hay cursor, filtra los elementos posteriores a él.
+
+    La comparación por tupla `(a, b) > (x, y)` permite que el motor busque directamente
+    en el índice, de modo que el coste de una página no depende de su profundidad.
+    """
+    order = [col.desc() for col in keyset] if descending else list(keyset)
+    query = query.order_by(*order)
+    if cursor is None:
+        return query
+
+    values = decode_cursor(cursor, keyset)
+    left = keyset[0] if len(keyset) == 1 else tuple_(*keyset)
+    right = values[0] if len(keyset) == 1 else tuple_(*values)
+    return query.filter(left < right if descending else left > right)
+
+
+def next_cursor(items: Sequence[Any], limit: int, keyset: Sequence[InstrumentedAttribute]) -> str | None:
+    """Cursor de la página siguiente, o None si la página actual no está completa."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, col.key) for col in keyset])
@@ -0,0 +1,125 @@
+"""Ranks lexicográficos para ordenar tareas y columnas.
+
+Un rank es una cadena base62 que se compara byte a byte (collation "C" en PostgreSQL).
+Los primeros `HEAD_DIGITS` dígitos forman una "cabeza" entera que comparte escala con las
+posiciones enteras heredadas; entre dos ranks siempre existe otro, así que mover un
+elemento solo reescribe su propia fila. Ningún rank termina en "0" para que siempre
+quepa uno por delante.
+"""
+
+from sqlalchemy import String
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(ALPHABET)
+HEAD_DIGITS = 6
+MAX_HEAD = BASE**HEAD_DIGITS - 1
+
+# Longitud máxima de la columna en BD y umbral a partir del cual conviene rebalancear
+RANK_MAX_LENGTH = 64
+REBALANCE_LENGTH = 16
+
+# Los ranks se comparan byte a byte: collation "C" en PostgreSQL
+RankType = String(RANK_MAX_LENGTH).with_variant(String(RANK_MAX_LENGTH, collation="C"), "postgresql")
+
+_DIGITS = {char: value for value, char in enumerate(ALPHABET)}
+_MID = ALPHABET[BASE // 2]
+
+
+def _encode_head(value: int) -> str:
+    chars = []
+    for _ in range(HEAD_DIGITS):
+        value, digit = divmod(value, BASE)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars)) + _MID
+
+
+def _head(rank: str) -> int:
+    value = 0
+    for char in rank[:HEAD_DIGITS].ljust(HEAD_DIGITS, "0"):
+        value = value * BASE + _DIGITS[char]
+    return value
+
+
+def rank_for_position(position: int) -> str:
+    """Rank equivalente a una posición entera (compatibilidad con `position`)."""
+    return _encode_head(min(max(position, 0), MAX_HEAD))
+
+
+def rank_default(context) -> str:
+    """Default de columna: deriva el rank de la posición de la fila insertada."""
+    return rank_for_position(context.get_current_parameters().get("position") or 0)
+
+
+def _bisect(before: str, after: str | None) -> str:
+    # Punto medio dígito a dígito; `after` None equivale a una cota superior abierta
+    result = []
+    i = 0
+    while True:
+        low = _DIGITS[before[i]] if i < len(before) else 0
+        high = _DIGITS[after[i]] if after is not None and i < len(after) else BASE
+        if low == high:
+            result.append(ALPHABET[low])
+        else:
+            mid = (low + high) // 2
+            if mid > low:
+                result.append(ALPHABET[mid])
+                return "".join(result)
+            # Dígitos consecutivos: fijar el inferior y seguir sin cota superior
+            result.append(ALPHABET[low])
+            after = None
+        i += 1
+
+
+def rank_between(before: str | None, after: str | None) -> str:
+    """Rank estrictamente entre `before` y `after` (None = principio/final).
+
+    Mientras haya hueco entre las cabezas se usa su punto medio (ranks cortos); solo
+    cuando las cabezas son contiguas se bisecta dígito a dígito y el rank crece.
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError("before debe ser menor que after")
+    if before is None and after is None:
+        return rank_for_position(0)
+    if after is None:
+        head = _head(before)
+        if head < MAX_HEAD:
+            return _encode_head(head + 1)
+        return _bisect(before, None)
+    if before is None:
+        head = _head(after)
+        if head > 0:
+            return _encode_head(head - 1)
+        return _bisect("", after)
+    low, high = _head(before), _head(after)
+    if high - low >= 2:
+        return _encode_head((low + high) // 2)
+    return _bisect(before, after)
+
+
+def ranks_between(before: str | None, after: str | None, count: int) -> list[str]:
+    """`count` ranks crecientes estrictamente entre `before` y `after` (None = principio/final).
+
+    Al final se encadenan con `rank_between`; con cota superior se bisecta el hueco de forma
+    recursiva para que la longitud crezca con el logaritmo de `count` y no con `count`.
+    """
+    if count <= 0:
+        return []
+    if after is None:
+        ranks = []
+        for _ in range(count):
+            before = rank_between(before, None)
+            ranks.append(before)
+        return ranks
+    middle = rank_between(before, after)
+    half = count // 2
+    return ranks_between(before, middle, half) + [middle] + ranks_between(middle, after, count - half - 1)
+
+
+def spread_ranks(count: int) -> list[str]:
+    """`count` ranks cortos y equiespaciados para rebalancear un contenedor."""
+    step = max(1, min(BASE**4, MAX_HEAD // (count + 1)))
+    return [_encode_head(step * (i + 1)) for i in range(count)]
+
+
+def needs_rebalance(rank: str) -> bool:
+    return len(rank) > REBALANCE_LENGTH
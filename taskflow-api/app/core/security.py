@@ -1,23 +1,108 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Callable, Dict
 
-from jose import jwt
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.instrumentation import PASSWORD_HASH_IN_FLIGHT, PASSWORD_HASH_QUEUE_DEPTH, PASSWORD_HASH_REJECTED
 
-# Configuración de passlib para hashing de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache
+def _pwd_context(rounds: int) -> CryptContext:
+    """Configuración de passlib para hashing de contraseñas con `rounds` de coste.
+
+    min/max iguales al coste hacen que `needs_update` marque los hashes con cualquier otro.
+    """
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica que el hash corresponda a la contraseña en texto plano."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context(settings.BCRYPT_ROUNDS).verify(plain_password, hashed_password)
+
+
+def get_password_hash(password: str, rounds: int | None = None) -> str:
+    """Genera el hash de una contraseña (con settings.BCRYPT_ROUNDS si no se indica el coste)."""
+    return _pwd_context(rounds or settings.BCRYPT_ROUNDS).hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True si el hash no usa el coste actual (settings.BCRYPT_ROUNDS)."""
+    return _pwd_context(settings.BCRYPT_ROUNDS).needs_update(hashed_password)
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """La cola de bcrypt está llena: se responde 503 en vez de hacer esperar la petición."""
+
+
+# bcrypt se ejecuta en procesos propios para no ocupar el threadpool ni el GIL del worker.
+# Se crea en el primer uso; `_hash_pending` (solo se toca desde el event loop) cuenta los
+# trabajos en ejecución o en cola.
+_hash_executor: ProcessPoolExecutor | None = None
+_hash_pending = 0
+
+
+def _hash_pool() -> ProcessPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        # spawn: el worker tiene hilos (threadpool, réplicas) que fork copiaría a medias
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _hash_executor
+
+
+def password_hash_queue_depth() -> int:
+    return max(_hash_pending - settings.PASSWORD_HASH_WORKERS, 0)
+
+
+PASSWORD_HASH_QUEUE_DEPTH.set_function(password_hash_queue_depth)
+PASSWORD_HASH_IN_FLIGHT.set_function(lambda: _hash_pending)
 
 
-def get_password_hash(password: str) -> str:
-    """Genera el hash de una contraseña."""
-    return pwd_context.hash(password)
+async def _run_hashing(func: Callable, *args):
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT:
+        PASSWORD_HASH_REJECTED.inc()
+        raise PasswordHashingBusyError("Demasiadas operaciones de contraseña en curso; reintenta en unos segundos")
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool(), func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """`verify_password` en el pool de bcrypt; lanza PasswordHashingBusyError si la cola está llena."""
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """`get_password_hash` en el pool de bcrypt; lanza PasswordHashingBusyError si la cola está llena."""
+    # El coste viaja con la llamada: el proceso hijo no ve cambios de settings en caliente
+    return await _run_hashing(get_password_hash, password, settings.BCRYPT_ROUNDS)
+
+
+def shutdown_password_hashing() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
 
 
 # Algoritmo JWT
@@ -27,8 +112,10 @@ ALGORITHM = "HS256"
 def create_access_token(data: Dict[str, Any], expires_delta: timedelta | None = None) -> str:
     """Crea un JWT firmado con fecha de expiración.
 
-    data: payload a incluir en el token (por ejemplo, {"sub": email}).
+    data: payload a incluir en el token (por ejemplo, {"sub": email, "uid": id, "role": role}).
     expires_delta: delta de expiración; si no se provee, usa settings.ACCESS_TOKEN_EXPIRE_MINUTES.
+
+    La cabecera lleva `kid` (settings.JWT_KEY_ID) para poder rotar SECRET_KEY.
     """
     to_encode = data.copy()
     if expires_delta is None:
@@ -37,5 +124,45 @@ def create_access_token(data: Dict[str, Any], expires_delta: timedelta | None =
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode.update({"exp": expire})
 
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM, headers={"kid": settings.JWT_KEY_ID})
     return encoded_jwt
+
+
+def _verification_key(token: str) -> str:
+    kid = jwt.get_unverified_header(token).get("kid")
+    # Tokens emitidos antes de incluir `kid`
+    if kid is None or kid == settings.JWT_KEY_ID:
+        return settings.SECRET_KEY
+    if kid in settings.JWT_PREVIOUS_KEYS:
+        return settings.JWT_PREVIOUS_KEYS[kid]
+    raise JWTError("kid desconocido")
+
+
+# Claims de los tokens ya verificados por digest SHA-256 del token, en orden LRU: un acierto
+# evita la verificación HMAC y la decodificación. Se usa desde el event loop y desde el threadpool.
+_verified_tokens: OrderedDict[bytes, Dict[str, Any]] = OrderedDict()
+_verified_tokens_lock = threading.Lock()
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Devuelve los claims de un JWT válido; lanza ExpiredSignatureError o JWTError como `jwt.decode`.
+
+    Los tokens verificados se recuerdan hasta su `exp` (como mucho settings.VERIFIED_TOKEN_CACHE_SIZE).
+    Los claims devueltos son compartidos: no deben modificarse.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    with _verified_tokens_lock:
+        claims = _verified_tokens.get(digest)
+        if claims is not None:
+            if claims["exp"] > time.time():
+                _verified_tokens.move_to_end(digest)
+                return claims
+            del _verified_tokens[digest]
+
+    claims = jwt.decode(token, _verification_key(token), algorithms=[ALGORITHM])
+    if settings.VERIFIED_TOKEN_CACHE_SIZE > 0 and isinstance(claims.get("exp"), (int, float)):
+        with _verified_tokens_lock:
+            _verified_tokens[digest] = claims
+            while len(_verified_tokens) > settings.VERIFIED_TOKEN_CACHE_SIZE:
+                _verified_tokens.popitem(last=False)
+    return claims
@@ -0,0 +1,92 @@
+"""Mantenimiento de filas soft-deleted.
+
+python -m app.db.maintenance archive [--days 30] [--purge] [--batch-size 1000] [--pause 0.05]
+python -m app.db.maintenance restore board|task|comment ID
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+import anyio
+
+from app.core.cache import close_cache, init_cache
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.schemas.maintenance import ArchiveMode, ArchiveReport
+from app.services.maintenance_service import (
+    archive_exclusively,
+    restore_board,
+    restore_comment,
+    restore_task,
+)
+
+_RESTORERS = {
+    "board": lambda db, id: restore_board(db, board_id=id),
+    "task": lambda db, id: restore_task(db, task_id=id),
+    "comment": lambda db, id: restore_comment(db, comment_id=id),
+}
+
+
+def _print_report(report: ArchiveReport) -> None:
+    print(f"{report.mode.value} de filas borradas antes de {report.cutoff:%Y-%m-%d %H:%M} UTC")
+    for table in report.tables:
+        print(
+            f"  {table.table:<10} {table.rows:>9} filas  {table.batches:>5} lotes  {table.rows_per_second:>10} filas/s"
+        )
+    print(f"  {'total':<10} {report.rows:>9} filas  {report.seconds:>9.2f}s  {report.rows_per_second:>10} filas/s")
+
+
+async def _restore(db, kind: str, id: int) -> dict[str, int]:
+    # Las invalidaciones de caché de la restauración usan el cliente asíncrono de Redis, que
+    # queda ligado al loop en el que se usa: se crea, se usa y se cierra dentro de este. La
+    # restauración corre en un hilo para que `run_async` delegue en este loop.
+    init_cache()
+    try:
+        return await anyio.to_thread.run_sync(_RESTORERS[kind], db, id)
+    finally:
+        await close_cache()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.db.maintenance", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    archive = commands.add_parser("archive", help="Archiva (o purga) filas soft-deleted antiguas por lotes")
+    archive.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    archive.add_argument("--purge", action="store_true", help="Borrado físico en lugar de archivar")
+    archive.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    archive.add_argument("--pause", type=float, default=settings.ARCHIVE_BATCH_PAUSE_SECONDS)
+
+    restore = commands.add_parser("restore", help="Restaura un elemento archivado y sus hijos")
+    restore.add_argument("kind", choices=sorted(_RESTORERS))
+    restore.add_argument("id", type=int)
+
+    args = parser.parse_args(argv)
+    db = SessionLocal()
+    try:
+        if args.command == "archive":
+            report = archive_exclusively(
+                db,
+                older_than_days=args.days,
+                mode=ArchiveMode.PURGE if args.purge else ArchiveMode(settings.ARCHIVE_MODE),
+                batch_size=args.batch_size,
+                pause_seconds=args.pause,
+                lock_timeout_ms=settings.ARCHIVE_LOCK_TIMEOUT_MS,
+            )
+            if report is None:
+                parser.exit(1, "Ya hay otra ejecución de archivado en curso\n")
+            _print_report(report)
+        else:
+            try:
+                restored = asyncio.run(_restore(db, args.kind, args.id))
+            except ValueError as exc:
+                parser.exit(1, f"{exc}\n")
+            print(", ".join(f"{table}: {rows}" for table, rows in restored.items()))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Enrutado de lecturas a réplicas con garantía read-your-writes.
+
+Los endpoints GET usan una sesión de réplica y las escrituras el primario. Cuando una
+petición autenticada confirma una escritura, el usuario queda fijado al primario durante
+`READ_YOUR_WRITES_SECONDS` para no leer tableros desactualizados por el retraso de
+replicación. La marca vive en el backend de FastAPICache (Redis en producción), así que
+es común a todos los workers.
+"""
+
+import random
+
+from fastapi_cache import FastAPICache
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.cache import run_async
+from app.core.config import settings
+from app.db.session import ReplicaSessionLocals
+
+# Claves de Session.info usadas para detectar escrituras de un usuario
+SESSION_USER_KEY = "user_id"
+_WROTE_KEY = "wrote"
+
+
+def _pin_key(user_id: int) -> str:
+    return f"{FastAPICache.get_prefix()}rw:u:{user_id}"
+
+
+async def pin_to_primary(user_id: int) -> None:
+    await FastAPICache.get_backend().set(_pin_key(user_id), b"1", expire=settings.READ_YOUR_WRITES_SECONDS)
+
+
+async def is_pinned_to_primary(user_id: int) -> bool:
+    try:
+        return await FastAPICache.get_backend().get(_pin_key(user_id)) is not None
+    except Exception:
+        # Sin backend no podemos garantizar read-your-writes: mejor leer del primario
+        return True
+
+
+async def replica_sessionmaker(user_id: int | None) -> async_sessionmaker | None:
+    """Sessionmaker de una réplica al azar para una lectura, o None si debe ir al primario
+    (no hay réplicas o el usuario escribió hace poco)."""
+    if not ReplicaSessionLocals:
+        return None
+    if user_id is not None and await is_pinned_to_primary(user_id):
+        return None
+    return random.choice(ReplicaSessionLocals)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_write(session: Session, flush_context) -> None:
+    if session.new or session.dirty or session.deleted:
+        session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_write(orm_execute_state: ORMExecuteState) -> None:
+    # INSERT/UPDATE/DELETE por lotes no pasan por el flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_after_commit(session: Session) -> None:
+    wrote = session.info.pop(_WROTE_KEY, False)
+    user_id = session.info.get(SESSION_USER_KEY)
+    if wrote and user_id is not None:
+        run_async(pin_to_primary, user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_write(session: Session) -> None:
+    session.info.pop(_WROTE_KEY, None)
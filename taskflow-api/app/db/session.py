@@ -1,11 +1,57 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.instrumentation import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True, future=True)
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+    }
+
+
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="sync",
+    future=True,
+    **_pool_options(),
+)
+instrument_engine(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
 
+# Motor asíncrono (psycopg 3 en modo async) para los routers: la espera a PostgreSQL
+# no ocupa un hilo del threadpool de anyio.
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_logging_name="async",
+    **_pool_options(),
+)
+instrument_engine(async_engine.sync_engine, "async")
+# Sin expirar en commit: tras el commit las respuestas se serializan fuera del contexto
+# async y un atributo expirado intentaría una carga perezosa (MissingGreenlet).
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# Réplicas de lectura: un motor (y pool) por DSN
+replica_engines = [
+    create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, pool_logging_name=f"replica{i}", **_pool_options())
+    for i, url in enumerate(settings.DB_REPLICA_URLS)
+]
+for i, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine.sync_engine, f"replica{i}")
+ReplicaSessionLocals = [
+    async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False)
+    for replica_engine in replica_engines
+]
+
 
 def get_db():
     db = SessionLocal()
@@ -13,3 +59,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,6 +1,9 @@
+import asyncio
+
 from asgi_correlation_id import CorrelationIdMiddleware
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
@@ -12,9 +15,13 @@ from app.api.routers import columns as columns_router
 from app.api.routers import comments as comments_router
 from app.api.routers import health as health_router
 from app.api.routers import tasks as tasks_router
-from app.core.cache import init_cache
+from app.core.cache import init_cache, start_invalidation_listener
+from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.pagination import InvalidCursorError
 from app.core.rate_limit import limiter
+from app.core.security import PasswordHashingBusyError, shutdown_password_hashing
+from app.services.maintenance_service import archive_periodically
 
 setup_logging()
 
@@ -44,10 +51,43 @@ def create_app() -> FastAPI:
     app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+    @app.exception_handler(InvalidCursorError)
+    async def _invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+    @app.exception_handler(PasswordHashingBusyError)
+    async def _password_hashing_busy_handler(request: Request, exc: PasswordHashingBusyError):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": str(exc)}, headers={"Retry-After": "1"}
+        )
+
     @app.on_event("startup")
     async def _startup_cache():
-        # Inicializa caché Redis
+        # Inicializa caché Redis (y la escucha de invalidaciones de la L1 de este worker)
         init_cache()
+        app.state.cache_listener = start_invalidation_listener()
+
+    @app.on_event("startup")
+    async def _startup_archive_job():
+        # Archivado periódico de filas soft-deleted (un advisory lock evita ejecuciones solapadas)
+        if settings.ARCHIVE_INTERVAL_SECONDS > 0:
+            app.state.archive_task = asyncio.create_task(archive_periodically(settings.ARCHIVE_INTERVAL_SECONDS))
+
+    @app.on_event("shutdown")
+    async def _shutdown_archive_job():
+        task = getattr(app.state, "archive_task", None)
+        if task is not None:
+            task.cancel()
+
+    @app.on_event("shutdown")
+    async def _shutdown_password_hashing():
+        shutdown_password_hashing()
+
+    @app.on_event("shutdown")
+    async def _shutdown_cache_listener():
+        listener = getattr(app.state, "cache_listener", None)
+        if listener is not None:
+            listener.cancel()
 
     app.include_router(health_router.router, prefix="/api/v1", tags=["health"])
     app.include_router(auth_router.router, prefix="/api/v1")
@@ -57,7 +97,7 @@ def create_app() -> FastAPI:
     app.include_router(comments_router.router, prefix="/api/v1")
 
     @app.get("/")
-    def root():
+    async def root():
         return {"app": "taskflow", "message": "OK"}
 
     return app
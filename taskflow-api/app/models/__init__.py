@@ -1,3 +1,4 @@
+from . import archive, task_fts  # noqa: F401
 from .board import Board  # noqa: F401
 from .column import Column  # noqa: F401
 from .comment import Comment  # noqa: F401
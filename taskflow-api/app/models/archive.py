@@ -0,0 +1,42 @@
+"""Tablas de archivo para filas soft-deleted antiguas.
+
+Cada tabla replica las columnas de su tabla de origen (sin claves foráneas ni índices de
+consulta) más `archived_at`. Los vectores de búsqueda de tareas no se archivan: los
+triggers los recalculan al restaurar la tarea y sus comentarios.
+"""
+
+from sqlalchemy import Column, DateTime, Index, Table, func
+
+from app.db.base import Base
+from app.models.board import Board
+from app.models.column import Column as BoardColumn
+from app.models.comment import Comment
+from app.models.task import Task
+
+_NOT_ARCHIVED = {"search_vector", "comments_vector"}
+
+
+def _archive_table(source: Table, *, parent_key: str | None = None) -> Table:
+    columns = [
+        Column(c.name, c.type, primary_key=c.primary_key, autoincrement=False, nullable=c.nullable)
+        for c in source.columns
+        if c.name not in _NOT_ARCHIVED
+    ]
+    columns.append(Column("archived_at", DateTime(), server_default=func.now(), nullable=False))
+    # El padre se usa para restaurar un tablero o una tarea junto con sus hijos
+    indexes = [Index(f"ix_{source.name}_archive_{parent_key}", parent_key)] if parent_key else []
+    return Table(f"{source.name}_archive", Base.metadata, *columns, *indexes)
+
+
+boards_archive = _archive_table(Board.__table__)
+columns_archive = _archive_table(BoardColumn.__table__, parent_key="board_id")
+tasks_archive = _archive_table(Task.__table__, parent_key="column_id")
+comments_archive = _archive_table(Comment.__table__, parent_key="task_id")
+
+# Tabla de origen -> tabla de archivo, en orden de padres a hijos
+ARCHIVE_TABLES: dict[Table, Table] = {
+    Board.__table__: boards_archive,
+    BoardColumn.__table__: columns_archive,
+    Task.__table__: tasks_archive,
+    Comment.__table__: comments_archive,
+}
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -11,6 +11,16 @@ from app.db.base import Base
 
 class Board(Base):
     __tablename__ = "boards"
+    __table_args__ = (
+        # Tableros vivos de un dueño en orden de paginación (owner_id = ? AND deleted_at IS NULL ORDER BY id)
+        Index(
+            "ix_boards_live_owner_id_id",
+            "owner_id",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
@@ -24,5 +34,5 @@ class Board(Base):
         "Column",
         back_populates="board",
         cascade="all, delete-orphan",
-        order_by="Column.position",
+        order_by="(Column.rank, Column.id)",
     )
@@ -1,18 +1,22 @@
 from __future__ import annotations
 
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.ranking import RankType, rank_default
 from app.db.base import Base
 
 
 class Column(Base):
     __tablename__ = "columns"
+    __table_args__ = (Index("ix_columns_board_id_rank", "board_id", "rank"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     position: Mapped[int] = mapped_column(Integer, nullable=False)
-    board_id: Mapped[int] = mapped_column(ForeignKey("boards.id", ondelete="CASCADE"), index=True, nullable=False)
+    # Orden dentro del tablero; si no se indica se deriva de `position`
+    rank: Mapped[str] = mapped_column(RankType, nullable=False, default=rank_default)
+    board_id: Mapped[int] = mapped_column(ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
 
     # Relaciones
     board = relationship("Board", back_populates="columns")
@@ -20,5 +24,5 @@ class Column(Base):
         "Task",
         back_populates="column",
         cascade="all, delete-orphan",
-        order_by="Task.position",
+        order_by="(Task.rank, Task.id)",
     )
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -11,6 +11,16 @@ from app.db.base import Base
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        # Hilo de una tarea: task_id = ? AND deleted_at IS NULL ORDER BY created_at
+        Index(
+            "ix_comments_live_task_id_created_at",
+            "task_id",
+            "created_at",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     text: Mapped[str] = mapped_column(String(1000), nullable=False)
@@ -3,12 +3,15 @@ from __future__ import annotations
 import enum
 from datetime import datetime
 
-from sqlalchemy import Enum, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Enum, ForeignKey, Index, Integer, String, Text, event, select, text, update
+from sqlalchemy.orm import Mapped, attributes, mapped_column, query_expression, relationship
 from sqlalchemy.sql import func
 from sqlalchemy.types import TEXT, TypeDecorator
 
+from app.core.ranking import RankType, rank_default
 from app.db.base import Base
+from app.models.board import Board
+from app.models.column import Column
 
 
 class TaskPriority(str, enum.Enum):
@@ -20,14 +23,57 @@ class TaskPriority(str, enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Listado de una columna: column_id = ? AND deleted_at IS NULL ORDER BY rank, id
+        Index(
+            "ix_tasks_live_column_id_rank",
+            "column_id",
+            "rank",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+        # Búsqueda del usuario en un solo escaneo GIN: owner_id = ? AND search_vector @@ q (btree_gin)
+        Index(
+            "ix_tasks_live_owner_id_search_vector",
+            "owner_id",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=text("deleted_at IS NULL"),
+        ).ddl_if(dialect="postgresql"),
+        # Búsqueda difusa (pg_trgm): ILIKE '%q%' y q <% campo sobre título y descripción
+        Index(
+            "ix_tasks_live_owner_id_title_trgm",
+            "owner_id",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_where=text("deleted_at IS NULL"),
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_tasks_live_owner_id_description_trgm",
+            "owner_id",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+            postgresql_where=text("deleted_at IS NULL"),
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     priority: Mapped[TaskPriority] = mapped_column(Enum(TaskPriority), default=TaskPriority.MEDIUM, nullable=False)
     position: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Orden dentro de la columna; si no se indica se deriva de `position`
+    rank: Mapped[str] = mapped_column(RankType, nullable=False, default=rank_default)
 
+    # Índice completo para el ON DELETE CASCADE (incluye tareas soft-deleted)
     column_id: Mapped[int] = mapped_column(ForeignKey("columns.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Copias de columns.board_id y boards.owner_id para filtrar por dueño sin JOIN.
+    # Se mantienen con los eventos de abajo (y explícitamente en las escrituras por lotes).
+    board_id: Mapped[int] = mapped_column(ForeignKey("boards.id", ondelete="CASCADE"), nullable=False, index=True)
+    owner_id: Mapped[int] = mapped_column(Integer, nullable=False)
     assignee_id: Mapped[int | None] = mapped_column(
         ForeignKey("users.id", ondelete="SET NULL"),
         nullable=True,
@@ -61,4 +107,55 @@ class Task(Base):
                 return dialect.type_descriptor(PG_TSVECTOR())
             return dialect.type_descriptor(TEXT())
 
-    search_vector: Mapped[str | None] = mapped_column(TSVectorType(), nullable=True, index=True)
+    search_vector: Mapped[str | None] = mapped_column(TSVectorType(), nullable=True)
+    # Agregado de los comentarios vivos que mantienen los triggers de comments (tsvector de peso D
+    # en PostgreSQL, texto concatenado en SQLite); forma parte del índice de búsqueda
+    comments_vector: Mapped[str | None] = mapped_column(TSVectorType(), nullable=True, deferred=True)
+    # Solo se rellenan en las búsquedas (with_expression): relevancia y fragmento resaltado
+    search_rank: Mapped[float | None] = query_expression()
+    search_snippet: Mapped[str | None] = query_expression()
+
+
+def _placement(connection, column_id: int):
+    return connection.execute(
+        select(Column.board_id, Board.owner_id).join(Board, Board.id == Column.board_id).where(Column.id == column_id)
+    ).first()
+
+
+@event.listens_for(Task, "before_insert")
+def _fill_placement_on_insert(mapper, connection, target: Task) -> None:
+    if target.board_id is None or target.owner_id is None:
+        placement = _placement(connection, target.column_id)
+        if placement is not None:
+            target.board_id, target.owner_id = placement
+
+
+@event.listens_for(Task, "before_update")
+def _fill_placement_on_move(mapper, connection, target: Task) -> None:
+    # Cambio de columna sin board_id explícito: puede ser una columna de otro tablero
+    if (
+        attributes.get_history(target, "column_id").has_changes()
+        and not attributes.get_history(target, "board_id").has_changes()
+    ):
+        placement = _placement(connection, target.column_id)
+        if placement is not None:
+            target.board_id, target.owner_id = placement
+
+
+@event.listens_for(Column, "after_update")
+def _propagate_column_board(mapper, connection, target: Column) -> None:
+    if attributes.get_history(target, "board_id").has_changes():
+        owner_id = select(Board.owner_id).where(Board.id == target.board_id).scalar_subquery()
+        connection.execute(
+            update(Task.__table__)
+            .where(Task.__table__.c.column_id == target.id)
+            .values(board_id=target.board_id, owner_id=owner_id)
+        )
+
+
+@event.listens_for(Board, "after_update")
+def _propagate_board_owner(mapper, connection, target: Board) -> None:
+    if attributes.get_history(target, "owner_id").has_changes():
+        connection.execute(
+            update(Task.__table__).where(Task.__table__.c.board_id == target.id).values(owner_id=target.owner_id)
+        )
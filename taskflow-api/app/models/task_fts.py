@@ -0,0 +1,92 @@
+"""Índice de búsqueda FTS5 de tareas para SQLite.
+
+Tabla virtual de contenido externo (`content='tasks'`): solo guarda el índice invertido de
+título, descripción y `comments_vector` (aquí, el texto concatenado de los comentarios vivos),
+y los triggers la mantienen al día con cada INSERT, DELETE y cambio de texto de `tasks`. Los
+triggers de `comments` mantienen a su vez `comments_vector`, como en PostgreSQL. Se crea junto
+con las tablas en `metadata.create_all` solo en SQLite; en PostgreSQL la búsqueda usa
+`search_vector` y pg_trgm.
+"""
+
+from sqlalchemy import DDL, Integer, event
+from sqlalchemy.sql import column, table
+
+from app.models.comment import Comment
+from app.models.task import Task
+
+# `tasks_fts` es también la columna oculta sobre la que se hace MATCH
+tasks_fts = table(
+    "tasks_fts",
+    column("rowid", Integer),
+    column("title"),
+    column("description"),
+    column("comments_vector"),
+    column("tasks_fts"),
+)
+
+_FIELDS = "title, description, comments_vector"
+_NEW = "new.id, new.title, new.description, new.comments_vector"
+_OLD = "'delete', old.id, old.title, old.description, old.comments_vector"
+
+_CREATE_TASKS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        {_FIELDS},
+        content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, {_FIELDS}) VALUES ({_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, {_FIELDS}) VALUES ({_OLD});
+    END
+    """,
+    # Solo cambios de texto: mover o borrar (soft) una tarea no reindexa
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF {_FIELDS} ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, {_FIELDS}) VALUES ({_OLD});
+        INSERT INTO tasks_fts(rowid, {_FIELDS}) VALUES ({_NEW});
+    END
+    """,
+    # Indexa las filas que ya existieran (no-op con la tabla vacía)
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+]
+
+# Re-agrega los comentarios vivos de una tarea (edición, soft delete o borrado de uno de ellos)
+_REAGGREGATE = """
+    UPDATE tasks SET comments_vector = (
+        SELECT group_concat(text, ' ') FROM comments WHERE task_id = tasks.id AND deleted_at IS NULL
+    ) WHERE id IN ({ids});
+"""
+
+_CREATE_COMMENTS = [
+    # Alta: se concatena el texto sin releer el resto de comentarios
+    """
+    CREATE TRIGGER IF NOT EXISTS comments_vector_ai AFTER INSERT ON comments WHEN new.deleted_at IS NULL BEGIN
+        UPDATE tasks SET comments_vector = coalesce(comments_vector || ' ', '') || new.text WHERE id = new.task_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS comments_vector_au AFTER UPDATE OF text, deleted_at, task_id ON comments BEGIN
+        {_REAGGREGATE.format(ids="old.task_id, new.task_id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS comments_vector_ad AFTER DELETE ON comments WHEN old.deleted_at IS NULL BEGIN
+        {_REAGGREGATE.format(ids="old.task_id")}
+    END
+    """,
+]
+
+for statement in _CREATE_TASKS:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in _CREATE_COMMENTS:
+    event.listen(Comment.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+# Los triggers desaparecen con sus tablas
+event.listen(Task.__table__, "before_drop", DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"))
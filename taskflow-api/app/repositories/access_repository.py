@@ -0,0 +1,98 @@
+from typing import Iterable
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models.board import Board
+from app.models.column import Column
+from app.models.comment import Comment
+from app.models.task import Task
+
+
+class AccessRepository:
+    """Resuelve una entidad comprobando en la misma consulta que el usuario es dueño del tablero.
+
+    Sustituye la cadena tarea -> columna -> tablero (una búsqueda por clave primaria por
+    nivel) por un único SELECT con JOIN hasta `boards.owner_id`, excluyendo soft-deleted.
+    Las tareas llevan `board_id`/`owner_id` copiados, así que les basta con unirse al tablero
+    (solo para descartar tableros soft-deleted).
+    """
+
+    def get_board(self, db: Session, *, board_id: int, owner_id: int) -> Board | None:
+        return (
+            db.query(Board)
+            .filter(Board.id == board_id, Board.owner_id == owner_id, Board.deleted_at.is_(None))
+            .first()
+        )
+
+    def get_column(self, db: Session, *, column_id: int, owner_id: int) -> Column | None:
+        return (
+            db.query(Column)
+            .join(Board, Column.board_id == Board.id)
+            .filter(Column.id == column_id, Board.owner_id == owner_id, Board.deleted_at.is_(None))
+            .first()
+        )
+
+    def get_owned_column_boards(self, db: Session, *, column_ids: Iterable[int], owner_id: int) -> dict[int, int]:
+        """Columnas de `column_ids` en tableros vivos del usuario -> su tablero (una consulta)."""
+        ids = set(column_ids)
+        if not ids:
+            return {}
+        rows = (
+            db.query(Column.id, Column.board_id)
+            .join(Board, Column.board_id == Board.id)
+            .filter(Column.id.in_(ids), Board.owner_id == owner_id, Board.deleted_at.is_(None))
+            .all()
+        )
+        return {row.id: row.board_id for row in rows}
+
+    def get_task(self, db: Session, *, task_id: int, owner_id: int) -> Task | None:
+        return (
+            db.query(Task)
+            .join(Board, Task.board_id == Board.id)
+            .filter(
+                Task.id == task_id,
+                Task.deleted_at.is_(None),
+                Task.owner_id == owner_id,
+                Board.deleted_at.is_(None),
+            )
+            .first()
+        )
+
+    def get_tasks(self, db: Session, *, task_ids: Iterable[int], owner_id: int) -> dict[int, Task]:
+        """Tareas vivas de `task_ids` accesibles por el usuario, indexadas por id (una consulta)."""
+        ids = set(task_ids)
+        if not ids:
+            return {}
+        tasks = (
+            db.query(Task)
+            .join(Board, Task.board_id == Board.id)
+            .filter(
+                Task.id.in_(ids),
+                Task.deleted_at.is_(None),
+                Task.owner_id == owner_id,
+                Board.deleted_at.is_(None),
+            )
+            .all()
+        )
+        return {task.id: task for task in tasks}
+
+    def get_comment(self, db: Session, *, comment_id: int, user_id: int, author_only: bool = False) -> Comment | None:
+        """Comentario visible para el usuario: su autor o el dueño del tablero de la tarea.
+
+        Con `author_only` solo se devuelve si el usuario es el autor (edición/borrado).
+        """
+        query = db.query(Comment).filter(Comment.id == comment_id, Comment.deleted_at.is_(None))
+        if author_only:
+            return query.filter(Comment.author_id == user_id).first()
+        return (
+            query.join(Task, Comment.task_id == Task.id)
+            .join(Board, Task.board_id == Board.id)
+            .filter(
+                or_(
+                    Comment.author_id == user_id,
+                    and_(Task.owner_id == user_id, Task.deleted_at.is_(None), Board.deleted_at.is_(None)),
+                )
+            )
+            .first()
+        )
@@ -0,0 +1,68 @@
+from typing import Sequence
+
+from sqlalchemy import ColumnElement, Table, delete, insert, null, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.archive import ARCHIVE_TABLES
+
+# Clave del advisory lock que serializa las ejecuciones entre workers/réplicas del servicio
+_ARCHIVE_LOCK_KEY = 7_310_011
+
+
+class ArchiveRepository:
+    """Movimiento por lotes entre las tablas vivas y sus tablas de archivo.
+
+    Cada operación trabaja sobre un lote de ids acotado y no hace commit: el servicio
+    confirma lote a lote para que los bloqueos duren lo que dura un lote.
+    """
+
+    def try_lock(self, conn: Connection) -> bool:
+        """Advisory lock de sesión en PostgreSQL; en otros motores no hay concurrencia que evitar."""
+        if conn.dialect.name != "postgresql":
+            return True
+        return bool(conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _ARCHIVE_LOCK_KEY}).scalar())
+
+    def unlock(self, conn: Connection) -> None:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _ARCHIVE_LOCK_KEY})
+
+    def set_lock_timeout(self, db: Session, *, milliseconds: int) -> None:
+        # En PostgreSQL, mejor abortar el lote que esperar detrás de una transacción larga
+        if db.get_bind().dialect.name == "postgresql" and milliseconds > 0:
+            db.execute(text(f"SET LOCAL lock_timeout = {int(milliseconds)}"))
+
+    def next_batch(self, db: Session, table: Table, condition: ColumnElement[bool], *, limit: int) -> list[int]:
+        """Ids del siguiente lote; en PostgreSQL salta las filas bloqueadas por otra transacción."""
+        query = (
+            select(table.c.id)
+            .where(condition)
+            .order_by(table.c.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=table)
+        )
+        return list(db.execute(query).scalars())
+
+    def archive(self, db: Session, table: Table, ids: Sequence[int]) -> int:
+        """Copia las filas a la tabla de archivo y las borra de la tabla viva."""
+        archive = ARCHIVE_TABLES[table]
+        names = [c.name for c in archive.columns if c.name != "archived_at"]
+        db.execute(insert(archive).from_select(names, select(*(table.c[n] for n in names)).where(table.c.id.in_(ids))))
+        return self.purge(db, table, ids)
+
+    def purge(self, db: Session, table: Table, ids: Sequence[int]) -> int:
+        return db.execute(delete(table).where(table.c.id.in_(ids))).rowcount
+
+    def get_archived_ids(self, db: Session, table: Table, condition: ColumnElement[bool]) -> list[int]:
+        archive = ARCHIVE_TABLES[table]
+        return list(db.execute(select(archive.c.id).where(condition).order_by(archive.c.id)).scalars())
+
+    def restore(self, db: Session, table: Table, ids: Sequence[int], *, undelete: bool = False) -> int:
+        """Devuelve las filas archivadas a la tabla viva (opcionalmente sin `deleted_at`)."""
+        if not ids:
+            return 0
+        archive = ARCHIVE_TABLES[table]
+        names = [c.name for c in archive.columns if c.name != "archived_at"]
+        columns = [null() if undelete and n == "deleted_at" else archive.c[n] for n in names]
+        db.execute(insert(table).from_select(names, select(*columns).where(archive.c.id.in_(ids))))
+        return db.execute(delete(archive).where(archive.c.id.in_(ids))).rowcount
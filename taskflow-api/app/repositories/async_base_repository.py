@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Generic, Sequence, Tuple, Type, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import TotalMode
+from app.repositories.base_repository import BaseRepository
+
+ModelType = TypeVar("ModelType")
+
+
+class AsyncBaseRepository(Generic[ModelType]):
+    """Equivalente de `BaseRepository` sobre `AsyncSession`.
+
+    Las operaciones simples usan la API asíncrona directamente. La paginación reutiliza
+    `BaseRepository.paginate` (construida sobre `Query`, que es síncrona) mediante
+    `AsyncSession.run_sync`: el código ORM es el mismo y la E/S sigue yendo por el driver
+    asíncrono, sin ocupar hilos.
+    """
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+        self._sync = BaseRepository(model)
+
+    @property
+    def keyset(self) -> tuple:
+        return self._sync.keyset
+
+    async def get(self, db: AsyncSession, id: int) -> ModelType | None:
+        obj = await db.get(self.model, id)
+        if obj is None:
+            return None
+        # Excluir registros soft-deleted si el modelo tiene el atributo
+        if hasattr(self.model, "deleted_at") and getattr(obj, "deleted_at", None) is not None:
+            return None
+        return obj
+
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Tuple[Sequence[ModelType], int | None]:
+        return await db.run_sync(self._sync.get_multi, skip=skip, limit=limit, cursor=cursor, total_mode=total_mode)
+
+    async def create(self, db: AsyncSession, obj_in: dict) -> ModelType:
+        db_obj = self.model(**obj_in)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(self, db: AsyncSession, db_obj: ModelType, obj_in: dict) -> ModelType:
+        for field, value in obj_in.items():
+            setattr(db_obj, field, value)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, id: int) -> ModelType | None:
+        obj = await db.get(self.model, id)
+        if obj is None:
+            return None
+        # Soft delete si el modelo tiene deleted_at, si no, borrar físicamente
+        if hasattr(self.model, "deleted_at"):
+            setattr(obj, "deleted_at", datetime.now(timezone.utc))
+            db.add(obj)
+        else:
+            await db.delete(obj)
+        await db.commit()
+        return obj
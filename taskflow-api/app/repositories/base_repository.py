@@ -1,13 +1,33 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Generic, Sequence, Tuple, Type, TypeVar
+from typing import Any, Callable, Generic, Sequence, Tuple, Type, TypeVar
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.pagination import TotalMode, apply_keyset
+from app.core.ranking import RANK_MAX_LENGTH, rank_between, ranks_between, spread_ranks
 
 ModelType = TypeVar("ModelType")
 
 
+class ExplainJson(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` de una sentencia, con sus parámetros enlazados como en la consulta real."""
+
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(ExplainJson, "postgresql")
+def _compile_explain_json(element: ExplainJson, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
 class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
@@ -21,13 +41,280 @@ class BaseRepository(Generic[ModelType]):
             return None
         return obj
 
-    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> Tuple[Sequence[ModelType], int]:
+    @property
+    def keyset(self) -> tuple:
+        # Clave de ordenación estable para paginación por cursor
+        return (self.model.id,)
+
+    def get_multi(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Tuple[Sequence[ModelType], int | None]:
         query = db.query(self.model)
         if hasattr(self.model, "deleted_at"):
             query = query.filter(self.model.deleted_at.is_(None))
-        total = query.count()
-        items = query.offset(skip).limit(limit).all()
-        return items, total
+        return self.paginate(query, self.keyset, skip=skip, limit=limit, cursor=cursor, total_mode=total_mode)
+
+    @staticmethod
+    def paginate(
+        query: Query,
+        keyset: Sequence,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        descending: bool = False,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Tuple[list, int | None]:
+        """Obtiene la página ordenada por `keyset` y, según `total_mode`, el total.
+
+        Con cursor la página se obtiene buscando en el índice a partir del último
+        elemento visto (skip se ignora); sin cursor se mantiene OFFSET/LIMIT.
+        El total exacto viaja en la misma sentencia que la página: como función
+        ventana en modo offset y como subconsulta escalar en modo cursor (el filtro
+        del cursor no debe afectar al conteo). En ambos casos el motor recorre todo el
+        conjunto filtrado, no solo la página; en listados grandes conviene `estimate`
+        o `none`.
+        """
+        page_query = apply_keyset(query, keyset, cursor, descending=descending)
+        page_query = (page_query if cursor else page_query.offset(skip)).limit(limit)
+
+        if total_mode != TotalMode.EXACT:
+            items = page_query.all()
+            if total_mode == TotalMode.ESTIMATE:
+                return items, BaseRepository.estimate_total(query)
+            return items, None
+
+        if cursor is None:
+            total_column = func.count().over()
+        else:
+            total_column = query.order_by(None).with_entities(func.count()).scalar_subquery().correlate(None)
+        rows = page_query.add_columns(total_column).all()
+        items = [row[0] for row in rows]
+        if rows:
+            return items, rows[0][-1]
+        if cursor is None and skip == 0:
+            return items, 0
+        # Página vacía más allá del final: no hay fila que traiga el total
+        return items, query.order_by(None).count()
+
+    @staticmethod
+    def estimate_total(query: Query) -> int:
+        """Número de filas estimado por el planificador de PostgreSQL.
+
+        En otros motores (SQLite en pruebas/instalaciones pequeñas) no hay estimación
+        disponible y se cuenta de forma exacta.
+        """
+        db = query.session
+        if db.bind is None or db.bind.dialect.name != "postgresql":
+            return query.order_by(None).count()
+        plan = db.execute(ExplainJson(query.order_by(None).statement)).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def _live_in_scope(self, db: Session, scope, item_id: int | None = None) -> Query:
+        model = self.model
+        query = db.query(model.rank, model.id).filter(scope)
+        if item_id is not None:
+            query = query.filter(model.id != item_id)
+        if hasattr(model, "deleted_at"):
+            query = query.filter(model.deleted_at.is_(None))
+        return query
+
+    def get_neighbour_ranks(
+        self,
+        db: Session,
+        *,
+        scope,
+        item_id: int | None = None,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> Tuple[str | None, str | None] | None:
+        """Ranks entre los que colocar un elemento dentro de `scope` (p. ej. una columna).
+
+        `after_id`/`before_id` son los elementos que quedarán justo encima/debajo; si solo
+        se indica uno, el otro es su vecino actual, y sin ninguno se coloca al final.
+        Devuelve None si algún vecino indicado no pertenece al ámbito.
+        """
+        model = self.model
+        query = self._live_in_scope(db, scope, item_id)
+        key = tuple_(model.rank, model.id)
+
+        lower = upper = None
+        if after_id is not None:
+            lower = query.filter(model.id == after_id).first()
+            if lower is None:
+                return None
+        if before_id is not None:
+            upper = query.filter(model.id == before_id).first()
+            if upper is None:
+                return None
+        if after_id is None and before_id is None:
+            lower = query.order_by(model.rank.desc(), model.id.desc()).first()
+        elif before_id is None:
+            upper = query.filter(key > tuple_(lower.rank, lower.id)).order_by(model.rank, model.id).first()
+        elif after_id is None:
+            lower = (
+                query.filter(key < tuple_(upper.rank, upper.id)).order_by(model.rank.desc(), model.id.desc()).first()
+            )
+        return (lower.rank if lower else None, upper.rank if upper else None)
+
+    def get_ranks_at_position(
+        self, db: Session, *, scope, position: int, item_id: int | None = None
+    ) -> Tuple[str | None, str | None]:
+        """Ranks entre los que colocar un elemento con la posición entera `position`.
+
+        Queda delante del primer elemento (en orden de rank) con una posición mayor y detrás
+        de su vecino anterior, como con el ORDER BY position heredado; si no hay ninguno, al final.
+        """
+        model = self.model
+        query = self._live_in_scope(db, scope, item_id)
+        upper = query.filter(model.position > position).order_by(model.rank, model.id).first()
+        if upper is None:
+            last = query.order_by(model.rank.desc(), model.id.desc()).first()
+            return (last.rank if last else None), None
+        lower = (
+            query.filter(tuple_(model.rank, model.id) < tuple_(upper.rank, upper.id))
+            .order_by(model.rank.desc(), model.id.desc())
+            .first()
+        )
+        return (lower.rank if lower else None), upper.rank
+
+    def _rank_within(self, db: Session, *, scope, bounds: Callable[[], Tuple[str | None, str | None] | None]):
+        # Si los vecinos empatan (posiciones heredadas repetidas) o el rank resultante no cabe
+        # en la columna, se rebalancea el ámbito una vez y se recalcula
+        for attempt in range(2):
+            neighbours = bounds()
+            if neighbours is None:
+                return None
+            lower, upper = neighbours
+            if lower is None or upper is None or lower < upper:
+                rank = rank_between(lower, upper)
+                if len(rank) <= RANK_MAX_LENGTH:
+                    return rank
+            if attempt == 0:
+                self.reassign_ranks(db, scope=scope)
+        raise RuntimeError("No se pudo calcular un rank tras rebalancear")
+
+    def rank_for_move(
+        self,
+        db: Session,
+        *,
+        scope,
+        item_id: int,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> str | None:
+        """Rank para colocar `item_id` entre sus nuevos vecinos, o None si algún vecino no existe."""
+        return self._rank_within(
+            db,
+            scope=scope,
+            bounds=lambda: self.get_neighbour_ranks(
+                db, scope=scope, item_id=item_id, after_id=after_id, before_id=before_id
+            ),
+        )
+
+    def rank_at_position(self, db: Session, *, scope, position: int, item_id: int | None = None) -> str:
+        """Rank para el `position` entero de la API dentro de `scope`.
+
+        Se calcula con los vecinos actuales y no con la escala de `rank_for_position`, que los
+        ranks del backfill y de los rebalanceos no respetan.
+        """
+        return self._rank_within(
+            db,
+            scope=scope,
+            bounds=lambda: self.get_ranks_at_position(db, scope=scope, position=position, item_id=item_id),
+        )
+
+    def ranks_for_batch(
+        self,
+        db: Session,
+        *,
+        container,
+        placements: Sequence[Tuple[Any, int | None]],
+        exclude_ids: Sequence[int] = (),
+    ) -> list[str]:
+        """Ranks para varios elementos nuevos o movidos, en el orden del lote.
+
+        `placements` son pares (valor de `container`, posición), p. ej. (column_id, position) con
+        `container=Task.column_id`. Cada posición se resuelve como en `rank_at_position` contando
+        con los elementos anteriores del lote (sin posición, al final), sobre una sola lectura de
+        los vecinos de cada contenedor y sin commit. `exclude_ids` son los elementos que se mueven.
+        """
+        positioned = {key for key, position in placements if position is not None}
+        appended = {key for key, _ in placements} - positioned
+        neighbours = self._batch_neighbours(
+            db, container=container, positioned=positioned, appended=appended, exclude_ids=exclude_ids
+        )
+
+        ranks: list[str | None] = [None] * len(placements)
+        for key in positioned | appended:
+            indexes = [i for i, (k, _) in enumerate(placements) if k == key]
+            positions = [placements[i][1] for i in indexes]
+            planned = _plan_ranks(neighbours[key], positions)
+            if planned is None:
+                # Vecinos empatados o un rank demasiado largo: rebalancear el contenedor y repetir
+                scope = container == key
+                self.reassign_ranks(db, scope=scope)
+                rows = self._batch_neighbours(
+                    db, container=container, positioned={key}, appended=set(), exclude_ids=exclude_ids
+                )
+                planned = _plan_ranks(rows[key], positions)
+                if planned is None:
+                    raise RuntimeError("No se pudo calcular un rank tras rebalancear")
+            for i, rank in zip(indexes, planned):
+                ranks[i] = rank
+        return ranks
+
+    def _batch_neighbours(
+        self, db: Session, *, container, positioned: set, appended: set, exclude_ids: Sequence[int]
+    ) -> dict[Any, list[Tuple[str, int | None]]]:
+        # (rank, position) de los elementos vivos de cada contenedor en orden; de aquellos en los
+        # que el lote solo añade al final basta con el último rank
+        model = self.model
+        filters = []
+        if exclude_ids:
+            filters.append(model.id.not_in(exclude_ids))
+        if hasattr(model, "deleted_at"):
+            filters.append(model.deleted_at.is_(None))
+        neighbours: dict[Any, list[Tuple[str, int | None]]] = {key: [] for key in positioned | appended}
+        if positioned:
+            rows = (
+                db.query(container, model.rank, model.position)
+                .filter(container.in_(positioned), *filters)
+                .order_by(container, model.rank, model.id)
+            )
+            for key, rank, position in rows:
+                neighbours[key].append((rank, position))
+        if appended:
+            rows = (
+                db.query(container, func.max(model.rank)).filter(container.in_(appended), *filters).group_by(container)
+            )
+            for key, rank in rows:
+                neighbours[key].append((rank, None))
+        return neighbours
+
+    def reassign_ranks(self, db: Session, *, scope) -> int:
+        """Como `rebalance_ranks` pero sin commit, para hacerlo dentro de la transacción en curso."""
+        query = db.query(self.model.id).filter(scope)
+        if hasattr(self.model, "deleted_at"):
+            query = query.filter(self.model.deleted_at.is_(None))
+        ids = [row.id for row in query.order_by(self.model.rank, self.model.id)]
+        rows = [{"id": id_, "rank": rank} for id_, rank in zip(ids, spread_ranks(len(ids)))]
+        if rows:
+            db.execute(update(self.model), rows)
+        return len(rows)
+
+    def rebalance_ranks(self, db: Session, *, scope) -> int:
+        """Reasigna ranks cortos y equiespaciados a los elementos de `scope` conservando el orden."""
+        count = self.reassign_ranks(db, scope=scope)
+        if count:
+            db.commit()
+        return count
 
     def create(self, db: Session, obj_in: dict) -> ModelType:
         db_obj = self.model(**obj_in)
@@ -56,3 +343,33 @@ class BaseRepository(Generic[ModelType]):
             db.delete(obj)
         db.commit()
         return obj
+
+
+def _plan_ranks(neighbours: Sequence[Tuple[str, int | None]], positions: Sequence[int | None]) -> list[str] | None:
+    """Ranks de `positions` entre `neighbours` (rank, posición) ordenados, o None si no caben."""
+    # Se insertan en orden como si cada uno ya estuviera guardado; los añadidos al final no
+    # tienen posición con la que comparar
+    order: list[Tuple[str | None, int | None, int | None]] = [(rank, position, None) for rank, position in neighbours]
+    for i, position in enumerate(positions):
+        index = len(order)
+        if position is not None:
+            index = next((k for k, (_, p, _) in enumerate(order) if p is not None and p > position), len(order))
+        order.insert(index, (None, position, i))
+
+    ranks: list[str] = [""] * len(positions)
+    lower: str | None = None
+    run: list[int] = []
+    for rank, _, index in [*order, (None, None, None)]:
+        if index is not None:
+            run.append(index)
+            continue
+        if run:
+            if lower is not None and rank is not None and lower >= rank:
+                return None
+            for i, planned in zip(run, ranks_between(lower, rank, len(run))):
+                if len(planned) > RANK_MAX_LENGTH:
+                    return None
+                ranks[i] = planned
+            run = []
+        lower = rank
+    return ranks
@@ -1,19 +1,36 @@
 from typing import Sequence, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
+from app.core.pagination import TotalMode
 from app.models.board import Board
 from app.repositories.base_repository import BaseRepository
 
 
 class BoardRepository(BaseRepository[Board]):
+    keyset = (Board.id,)
+
     def __init__(self) -> None:
         super().__init__(Board)
 
     def get_multi_by_owner(
-        self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
-    ) -> Tuple[Sequence[Board], int]:
+        self,
+        db: Session,
+        *,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Tuple[Sequence[Board], int | None]:
         query = db.query(Board).filter(Board.owner_id == owner_id, Board.deleted_at.is_(None))
-        total = query.count()
-        items = query.offset(skip).limit(limit).all()
-        return items, total
+        return self.paginate(query, self.keyset, skip=skip, limit=limit, cursor=cursor, total_mode=total_mode)
+
+    def get_with_columns(self, db: Session, *, board_id: int, owner_id: int) -> Board | None:
+        """Tablero del dueño con sus columnas ordenadas (2 consultas: tablero + selectinload)."""
+        return (
+            db.query(Board)
+            .options(selectinload(Board.columns))
+            .filter(Board.id == board_id, Board.owner_id == owner_id, Board.deleted_at.is_(None))
+            .first()
+        )
@@ -1,16 +1,47 @@
 import re
+from datetime import datetime, timezone
 from typing import Sequence, Tuple
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Float,
+    String,
+    Text,
+    cast,
+    false,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import TSQUERY
+from sqlalchemy.orm import Session, with_expression
 
-from app.models.board import Board
-from app.models.column import Column
+from app.core.config import settings
+from app.core.pagination import TotalMode
 from app.models.task import Task, TaskPriority
+from app.models.task_fts import tasks_fts
 from app.repositories.base_repository import BaseRepository
 
+_TS_CONFIG = "pg_catalog.english"
+_HEADLINE_OPTIONS = "StartSel=«, StopSel=», MaxWords=25, MinWords=8, MaxFragments=2"
+# Pesos de bm25 por columna de tasks_fts: título, descripción y comentarios
+_FTS5_WEIGHTS = (2.0, 1.0, 0.5)
+# Facetas de la búsqueda (columnas de tasks)
+_FACETS = ("board_id", "column_id", "priority", "assignee_id")
+# Términos de la sintaxis de buscador: "frase entre comillas" o palabra, con "-" opcional
+_WEBSEARCH_TOKEN = re.compile(r'-?"[^"]*"?|\S+')
+
 
 class TaskRepository(BaseRepository[Task]):
+    # Orden dentro de una columna y orden de búsqueda (relevancia e id descendentes)
+    column_keyset = (Task.rank, Task.id)
+    search_keyset = (Task.search_rank, Task.id)
+
     def __init__(self) -> None:
         super().__init__(Task)
 
@@ -21,18 +52,96 @@ class TaskRepository(BaseRepository[Task]):
         column_id: int,
         skip: int = 0,
         limit: int = 100,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
         priority: TaskPriority | None = None,
         assignee_id: int | None = None,
-    ) -> Tuple[Sequence[Task], int]:
+    ) -> Tuple[Sequence[Task], int | None]:
         query = db.query(Task).filter(Task.column_id == column_id, Task.deleted_at.is_(None))
         if priority is not None:
             query = query.filter(Task.priority == priority)
         if assignee_id is not None:
             query = query.filter(Task.assignee_id == assignee_id)
-        query = query.order_by(Task.position)
-        total = query.count()
-        items = query.offset(skip).limit(limit).all()
-        return items, total
+        return self.paginate(query, self.column_keyset, skip=skip, limit=limit, cursor=cursor, total_mode=total_mode)
+
+    def get_last_ranks(self, db: Session, *, column_ids: Sequence[int]) -> dict[int, str]:
+        """Rank más alto de las tareas vivas de cada columna, en una sola consulta."""
+        if not column_ids:
+            return {}
+        rows = (
+            db.query(Task.column_id, func.max(Task.rank))
+            .filter(Task.column_id.in_(set(column_ids)), Task.deleted_at.is_(None))
+            .group_by(Task.column_id)
+            .all()
+        )
+        return {column_id: rank for column_id, rank in rows}
+
+    def get_many(self, db: Session, ids: Sequence[int]) -> list[Task]:
+        """Tareas por id en una sola consulta, en el orden de `ids`."""
+        by_id = {task.id: task for task in db.query(Task).filter(Task.id.in_(ids)).populate_existing()}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def create_many(self, db: Session, rows: Sequence[dict]) -> list[Task]:
+        """Inserta todas las filas con un INSERT multi-fila ... RETURNING y un único commit."""
+        if not rows:
+            return []
+        # Las filas deben compartir claves para que el INSERT se agrupe en una sola sentencia
+        ids = db.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), list(rows)).all()
+        db.commit()
+        return self.get_many(db, ids)
+
+    def update_many(self, db: Session, rows: Sequence[dict]) -> list[Task]:
+        """UPDATE por clave primaria de varias filas (cada dict incluye `id`) y un único commit."""
+        if not rows:
+            return []
+        db.execute(update(Task), list(rows))
+        db.commit()
+        return self.get_many(db, [row["id"] for row in rows])
+
+    def remove_many(self, db: Session, ids: Sequence[int]) -> None:
+        """Soft delete de varias tareas en una sola sentencia."""
+        if not ids:
+            return
+        db.execute(
+            update(Task)
+            .where(Task.id.in_(ids))
+            .values(deleted_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def get_top_by_columns(
+        self, db: Session, *, column_ids: Sequence[int], limit_per_column: int
+    ) -> dict[int, Tuple[list[Task], int]]:
+        """Primeras `limit_per_column` tareas vivas de cada columna y su total, en una sola consulta.
+
+        selectinload no permite limitar por columna, así que se numeran las filas con una
+        función ventana particionada por columna y se filtra por ese número.
+        """
+        result: dict[int, Tuple[list[Task], int]] = {column_id: ([], 0) for column_id in column_ids}
+        if not column_ids:
+            return result
+        ranked = (
+            select(
+                Task.id,
+                func.row_number().over(partition_by=Task.column_id, order_by=self.column_keyset).label("rn"),
+                func.count().over(partition_by=Task.column_id).label("cnt"),
+            )
+            .where(Task.column_id.in_(column_ids), Task.deleted_at.is_(None))
+            .subquery()
+        )
+        rows = (
+            db.query(Task, ranked.c.cnt)
+            .join(ranked, Task.id == ranked.c.id)
+            .filter(ranked.c.rn <= limit_per_column)
+            .order_by(Task.column_id, ranked.c.rn)
+            .all()
+        )
+        for task, count in rows:
+            tasks, _ = result[task.column_id]
+            tasks.append(task)
+            result[task.column_id] = (tasks, count)
+        return result
 
     def search_tasks_by_owner(
         self,
@@ -40,37 +149,311 @@ class TaskRepository(BaseRepository[Task]):
         *,
         owner_id: int,
         query: str,
+        prefix: bool = False,
+        fuzzy: bool = False,
+        similarity: float | None = None,
+        include_comments: bool = False,
+        priorities: Sequence[TaskPriority] | None = None,
+        assignee_id: int | None = None,
+        board_id: int | None = None,
         skip: int = 0,
         limit: int = 100,
-    ) -> Tuple[Sequence[Task], int]:
-        # Convertir entrada libre en tsquery combinada con AND para evitar errores de sintaxis
-        raw_terms = [t for t in re.split(r"\s+", query.strip()) if t]
-        tsquery_string = " & ".join(raw_terms) if raw_terms else ""
-
-        # En SQLite (tests), to_tsquery/@@ no existen; aplicamos fallback con LIKE
-        if db.bind and getattr(db.bind.dialect, "name", "") == "sqlite":
-            like_term = f"%{query}%"
-            q = (
-                db.query(Task)
-                .join(Column, Task.column_id == Column.id)
-                .join(Board, Column.board_id == Board.id)
-                .filter(Board.owner_id == owner_id)
-                .filter(Task.deleted_at.is_(None))
-                .filter((Task.title.ilike(like_term)) | (Task.description.ilike(like_term)))
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> Tuple[Sequence[Task], int | None]:
+        """Tareas del usuario que casan con `query`, por relevancia (`search_rank`) descendente.
+
+        La relevancia solo se calcula sobre los `SEARCH_CANDIDATE_LIMIT` candidatos más
+        recientes que devuelve el índice, de modo que el coste no crece con el número de
+        coincidencias; el total (si se pide) también queda acotado por ese límite.
+
+        Con `fuzzy` se añaden las coincidencias por subcadena (`ILIKE '%q%'`) y, en
+        PostgreSQL, los textos con alguna parte parecida a `query` (`word_similarity >=
+        similarity`, por defecto `SEARCH_TRIGRAM_THRESHOLD`). Con `include_comments` también
+        casan los comentarios vivos, que ya están en el índice (ver `Task.comments_vector`).
+        `priorities`, `assignee_id` y `board_id` filtran los candidatos que devuelve el índice.
+        """
+        ranked, snippet = self._search_ranked(
+            db,
+            owner_id=owner_id,
+            query=query,
+            prefix=prefix,
+            fuzzy=fuzzy,
+            similarity=similarity,
+            include_comments=include_comments,
+            priorities=priorities,
+            assignee_id=assignee_id,
+            board_id=board_id,
+        )
+        q = (
+            db.query(Task)
+            .join(ranked, ranked.c.id == Task.id)
+            .options(
+                with_expression(Task.search_rank, ranked.c.search_rank),
+                with_expression(Task.search_snippet, snippet),
+            )
+        )
+        keyset = (ranked.c.search_rank, Task.id)
+        return self.paginate(q, keyset, skip=skip, limit=limit, cursor=cursor, descending=True, total_mode=total_mode)
+
+    def search_facets_by_owner(self, db: Session, **search) -> dict[str, list[tuple[str | None, int]]]:
+        """Recuentos por tablero, columna, prioridad y responsable del conjunto que casa con la búsqueda.
+
+        Recibe los mismos argumentos de búsqueda y filtros que `search_tasks_by_owner` y cuenta
+        sobre los mismos candidatos (acotados por `SEARCH_CANDIDATE_LIMIT`), en una sola
+        sentencia: los candidatos como CTE y un GROUP BY por faceta unidos con UNION ALL.
+        Los valores vuelven como texto (NULL = sin responsable), de más a menos frecuente.
+        """
+        ranked, _ = self._search_ranked(db, **search)
+        matched = (
+            select(Task.board_id, Task.column_id, Task.priority, Task.assignee_id)
+            .join(ranked, ranked.c.id == Task.id)
+            .cte("matched")
+        )
+        stmt = union_all(
+            *(
+                select(
+                    literal(name).label("facet"),
+                    cast(matched.c[name], String).label("value"),
+                    func.count().label("count"),
+                ).group_by(matched.c[name])
+                for name in _FACETS
+            )
+        )
+        facets: dict[str, list[tuple[str | None, int]]] = {name: [] for name in _FACETS}
+        for row in db.execute(stmt):
+            facets[row.facet].append((row.value, row.count))
+        for counts in facets.values():
+            counts.sort(key=lambda item: -item[1])
+        return facets
+
+    def _search_ranked(
+        self,
+        db: Session,
+        *,
+        owner_id: int,
+        query: str,
+        prefix: bool = False,
+        fuzzy: bool = False,
+        similarity: float | None = None,
+        include_comments: bool = False,
+        priorities: Sequence[TaskPriority] | None = None,
+        assignee_id: int | None = None,
+        board_id: int | None = None,
+    ):
+        """Subconsulta (id, search_rank) de los candidatos y expresión del fragmento, según el motor."""
+        # El índice (GIN o FTS5) resuelve la coincidencia; el resto se comprueba sobre sus filas
+        filters = [Task.owner_id == owner_id, Task.deleted_at.is_(None)]
+        if priorities:
+            filters.append(Task.priority.in_(priorities))
+        if assignee_id is not None:
+            filters.append(Task.assignee_id == assignee_id)
+        if board_id is not None:
+            filters.append(Task.board_id == board_id)
+
+        if db.bind is not None and db.bind.dialect.name == "postgresql":
+            return self._ranked_postgresql(
+                db,
+                filters=filters,
+                query=query,
+                prefix=prefix,
+                fuzzy=fuzzy,
+                similarity=similarity,
+                include_comments=include_comments,
+            )
+        ranked = self._ranked_sqlite(
+            filters=filters, query=query, prefix=prefix, fuzzy=fuzzy, include_comments=include_comments
+        )
+        return ranked, ranked.c.search_snippet
+
+    def _ranked_postgresql(
+        self,
+        db: Session,
+        *,
+        filters: list,
+        query: str,
+        prefix: bool,
+        fuzzy: bool,
+        similarity: float | None,
+        include_comments: bool,
+    ):
+        """Candidatos por el GIN de (owner_id, search_vector) con su `ts_rank_cd`, y el fragmento.
+
+        Con `fuzzy` se suman los GIN gin_trgm_ops de título y descripción y la relevancia pasa a
+        ser `ts_rank_cd + word_similarity`, así que lo que casa por las dos vías queda delante.
+        """
+        term = query.strip()
+        # search_vector lleva título (A), descripción (B) y comentarios (D): sin comentarios basta
+        # con restringir los pesos del tsquery, y el índice GIN sigue sirviendo la consulta
+        ts_query = self._ts_query(query, prefix=prefix, weights="" if include_comments else "AB")
+        match = Task.search_vector.op("@@")(ts_query)
+        if fuzzy:
+            self._set_trigram_threshold(db, settings.SEARCH_TRIGRAM_THRESHOLD if similarity is None else similarity)
+            # Cada rama la resuelve un índice GIN gin_trgm_ops (BitmapOr con el de search_vector)
+            pattern = _contains_pattern(term)
+            match = or_(
+                match,
+                *(
+                    field.ilike(pattern, escape="/") | field.op("%>", is_comparison=True)(term)
+                    for field in (Task.title, Task.description)
+                ),
+            )
+
+        candidates = (
+            select(Task.id, Task.title, Task.description, Task.search_vector)
+            .where(*filters, match)
+            .order_by(Task.id.desc())
+            .limit(settings.SEARCH_CANDIDATE_LIMIT)
+            .subquery("candidates")
+        )
+        # Tipada para que el cursor de `search_keyset` solo acepte números
+        score = func.ts_rank_cd(candidates.c.search_vector, ts_query, type_=Float)
+        if fuzzy:
+            # greatest() ignora el NULL de una descripción vacía
+            score = score + func.greatest(
+                func.word_similarity(term, candidates.c.title),
+                func.word_similarity(term, candidates.c.description),
+                type_=Float,
+            )
+        ranked = select(candidates.c.id, score.label("search_rank")).subquery("ranked")
+        # PostgreSQL pospone las funciones caras de la lista SELECT hasta después del LIMIT
+        document = func.coalesce(Task.title, "") + " — " + func.coalesce(Task.description, "")
+        snippet = func.ts_headline(_TS_CONFIG, document, ts_query, _HEADLINE_OPTIONS)
+        return ranked, snippet
+
+    @staticmethod
+    def _ranked_sqlite(*, filters: list, query: str, prefix: bool, fuzzy: bool, include_comments: bool):
+        """Candidatos por la tabla FTS5 `tasks_fts`, con relevancia `-bm25` y fragmento `snippet()`.
+
+        bm25 y snippet solo existen dentro de la consulta con MATCH, así que se calculan en
+        ella; el título pesa el doble que la descripción y esta el doble que los comentarios, que
+        solo casan con `include_comments`. Con `fuzzy` el MATCH pasa a LEFT JOIN
+        y se añaden las subcadenas (`LIKE`, sin índice) con relevancia 0.
+        """
+        fts_query = _fts5_query(query, prefix=prefix, columns=None if include_comments else ("title", "description"))
+        fts = (
+            select(
+                tasks_fts.c.rowid,
+                (-func.bm25(literal_column("tasks_fts"), *_FTS5_WEIGHTS, type_=Float)).label("score"),
+                func.snippet(literal_column("tasks_fts"), -1, "«", "»", "…", 12).label("snippet"),
+            )
+            .where(tasks_fts.c.tasks_fts.match(fts_query) if fts_query else false())
+            .subquery("fts")
+        )
+        match = true()
+        if fuzzy:
+            pattern = _contains_pattern(query.strip())
+            match = or_(
+                fts.c.rowid.is_not(None),
+                Task.title.ilike(pattern, escape="/"),
+                Task.description.ilike(pattern, escape="/"),
+            )
+        return (
+            select(
+                Task.id,
+                func.coalesce(fts.c.score, 0.0, type_=Float).label("search_rank"),
+                fts.c.snippet.label("search_snippet"),
+            )
+            .join(fts, fts.c.rowid == Task.id, isouter=fuzzy)
+            .where(*filters, match)
+            .order_by(Task.id.desc())
+            .limit(settings.SEARCH_CANDIDATE_LIMIT)
+            .subquery("ranked")
+        )
+
+    def suggest_titles(self, db: Session, *, owner_id: int, prefix: str, limit: int = 10) -> list[tuple[int, str]]:
+        """(id, título) de hasta `limit` tareas vivas del usuario con palabras del título que empiezan por `prefix`.
+
+        Pensado para cada pulsación: solo título (peso A en PostgreSQL, columna `title` en
+        FTS5), todas las palabras como prefijo y sin fragmentos. La relevancia se calcula sobre
+        los `SUGGEST_CANDIDATE_LIMIT` candidatos más recientes, sin contar el total.
+        """
+        if db.bind is not None and db.bind.dialect.name == "postgresql":
+            ts_query = self._ts_query(prefix, prefix=True, weights="A")
+            candidates = (
+                select(Task.id, Task.title, Task.search_vector)
+                .where(Task.owner_id == owner_id, Task.deleted_at.is_(None), Task.search_vector.op("@@")(ts_query))
                 .order_by(Task.id.desc())
+                .limit(settings.SUGGEST_CANDIDATE_LIMIT)
+                .subquery("candidates")
             )
+            score = func.ts_rank_cd(candidates.c.search_vector, ts_query)
+            stmt = select(candidates.c.id, candidates.c.title).order_by(score.desc(), candidates.c.id.desc())
         else:
-            ts_query = func.to_tsquery("pg_catalog.english", tsquery_string)
-            q = (
-                db.query(Task)
-                .join(Column, Task.column_id == Column.id)
-                .join(Board, Column.board_id == Board.id)
-                .filter(Board.owner_id == owner_id)
-                .filter(Task.deleted_at.is_(None))
-                .filter(Task.search_vector.op("@@")(ts_query))
+            fts_query = _fts5_query(prefix, prefix=True, columns=("title",))
+            if fts_query is None:
+                return []
+            candidates = (
+                select(Task.id, Task.title, (-func.bm25(literal_column("tasks_fts"), *_FTS5_WEIGHTS)).label("score"))
+                .join(tasks_fts, tasks_fts.c.rowid == Task.id)
+                .where(tasks_fts.c.tasks_fts.match(fts_query), Task.owner_id == owner_id, Task.deleted_at.is_(None))
                 .order_by(Task.id.desc())
+                .limit(settings.SUGGEST_CANDIDATE_LIMIT)
+                .subquery("candidates")
             )
+            stmt = select(candidates.c.id, candidates.c.title).order_by(
+                candidates.c.score.desc(), candidates.c.id.desc()
+            )
+        return [(row.id, row.title) for row in db.execute(stmt.limit(limit))]
+
+    @staticmethod
+    def _ts_query(query: str, *, prefix: bool, weights: str = ""):
+        """tsquery con la sintaxis de buscador (`"frase"`, `or`, `-excluir`), que nunca falla al parsear.
+
+        Con `prefix` cada lexema pasa a `lexema:*` para casar también palabras que empiezan así,
+        y con `weights` (p. ej. "AB") solo casa en las partes del vector con esos pesos.
+        """
+        ts_query = func.websearch_to_tsquery(_TS_CONFIG, query)
+        suffix = ("*" if prefix else "") + weights
+        if not suffix:
+            return ts_query
+        # Lexemas entre comillas simples; una comilla dentro del lexema va duplicada
+        as_text = cast(ts_query, Text)
+        return cast(func.regexp_replace(as_text, "'((?:[^']|'')+)'", f"'\\1':{suffix}", "g"), TSQUERY)
+
+    @staticmethod
+    def _set_trigram_threshold(db: Session, threshold: float) -> None:
+        """Umbral de `<%`/`%>` para la transacción actual.
+
+        Los índices GIN solo resuelven el operador, no `word_similarity(...) >= x`, así que el
+        umbral por petición se fija con SET LOCAL (set_config(..., true)).
+        """
+        db.execute(select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True)))
+
+
+def _fts5_query(query: str, *, prefix: bool, columns: Sequence[str] | None = None) -> str | None:
+    """Traduce la sintaxis de buscador (`"frase"`, `or`, `-excluir`) a una consulta FTS5.
+
+    Cada término va entre comillas, así que ninguna entrada produce un error de sintaxis.
+    `columns` limita la búsqueda a esas columnas de tasks_fts. None si no queda ningún
+    término positivo (nada que buscar).
+    """
+    positive: list[str] = []
+    negative: list[str] = []
+    for token in _WEBSEARCH_TOKEN.findall(query):
+        excluded = token.startswith("-")
+        text = token.lstrip("-").strip('"')
+        if not text:
+            continue
+        if not excluded and text.lower() == "or":
+            if positive and positive[-1] != "OR":
+                positive.append("OR")
+            continue
+        phrase = '"' + text.replace('"', '""') + '"' + ("*" if prefix else "")
+        (negative if excluded else positive).append(phrase)
+    if positive and positive[-1] == "OR":
+        positive.pop()
+    if not positive:
+        return None
+    expression = " ".join(positive)
+    if negative:
+        expression = f"({expression}) NOT " + " NOT ".join(negative)
+    if columns:
+        expression = "{" + " ".join(columns) + "} : (" + expression + ")"
+    return expression
+
 
-        total = q.count()
-        items = q.offset(skip).limit(limit).all()
-        return items, total
+def _contains_pattern(term: str) -> str:
+    """Patrón LIKE '%term%' con los comodines de `term` escapados (ESCAPE '/')."""
+    escaped = term.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return f"%{escaped}%"
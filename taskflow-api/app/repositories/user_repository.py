@@ -1,6 +1,9 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.user import User
+from app.repositories.async_base_repository import AsyncBaseRepository
 from app.repositories.base_repository import BaseRepository
 
 
@@ -10,3 +13,11 @@ class UserRepository(BaseRepository[User]):
 
     def get_by_email(self, db: Session, *, email: str) -> User | None:
         return db.query(User).filter(User.email == email).first()
+
+
+class AsyncUserRepository(AsyncBaseRepository[User]):
+    def __init__(self) -> None:
+        super().__init__(User)
+
+    async def get_by_email(self, db: AsyncSession, *, email: str) -> User | None:
+        return (await db.scalars(select(User).where(User.email == email).limit(1))).first()
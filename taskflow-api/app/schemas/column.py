@@ -7,6 +7,8 @@ class ColumnBase(BaseModel):
 
 
 class ColumnCreate(ColumnBase):
+    # Sin posición la columna se añade al final del tablero
+    position: int | None = None
     board_id: int
 
 
@@ -15,8 +17,15 @@ class ColumnUpdate(BaseModel):
     position: int | None = None
 
 
+class ColumnMove(BaseModel):
+    # Columnas que quedarán justo a la izquierda/derecha
+    after_id: int | None = None
+    before_id: int | None = None
+
+
 class ColumnRead(ColumnBase):
     id: int
     board_id: int
+    rank: str
 
     model_config = ConfigDict(from_attributes=True)
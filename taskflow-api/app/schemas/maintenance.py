@@ -0,0 +1,40 @@
+import enum
+from datetime import datetime
+
+from pydantic import BaseModel, computed_field
+
+
+class ArchiveMode(str, enum.Enum):
+    """Qué hacer con las filas soft-deleted antiguas."""
+
+    ARCHIVE = "archive"  # mover a las tablas *_archive (restaurables)
+    PURGE = "purge"  # borrado físico
+
+
+class TableArchiveReport(BaseModel):
+    table: str
+    rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @computed_field
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.rows / self.seconds, 1) if self.seconds > 0 else 0.0
+
+
+class ArchiveReport(BaseModel):
+    mode: ArchiveMode
+    cutoff: datetime
+    tables: list[TableArchiveReport]
+    seconds: float = 0.0
+
+    @computed_field
+    @property
+    def rows(self) -> int:
+        return sum(t.rows for t in self.tables)
+
+    @computed_field
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.rows / self.seconds, 1) if self.seconds > 0 else 0.0
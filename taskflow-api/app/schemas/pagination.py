@@ -9,6 +9,9 @@ T = TypeVar("T")
 
 class Page(BaseModel, Generic[T]):
     items: list[T]
-    total: int
+    # None cuando se pide total=none
+    total: int | None
     page: int
     size: int
+    # Cursor opaco para pedir la página siguiente (None si no hay más)
+    next_cursor: str | None = None
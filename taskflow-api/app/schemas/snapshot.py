@@ -0,0 +1,13 @@
+from app.schemas.board import BoardRead
+from app.schemas.column import ColumnRead
+from app.schemas.task import TaskRead
+
+
+class ColumnSnapshot(ColumnRead):
+    tasks: list[TaskRead]
+    # Total de tareas vivas en la columna (puede superar len(tasks) por el límite por columna)
+    task_count: int
+
+
+class BoardSnapshot(BoardRead):
+    columns: list[ColumnSnapshot]
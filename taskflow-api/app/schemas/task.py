@@ -1,8 +1,12 @@
 from datetime import datetime
+from typing import Generic, Literal, TypeVar
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.task import TaskPriority
+from app.schemas.pagination import Page
+
+T = TypeVar("T")
 
 
 class TaskBase(BaseModel):
@@ -14,6 +18,7 @@ class TaskBase(BaseModel):
 class TaskCreate(TaskBase):
     column_id: int
     assignee_id: int | None = None
+    # Posición entera heredada; sin ella la tarea se añade al final de la columna
     position: int | None = None
 
 
@@ -26,10 +31,80 @@ class TaskUpdate(BaseModel):
     position: int | None = None
 
 
+class TaskMove(BaseModel):
+    # Columna destino (por defecto la actual) y tareas que quedarán justo encima/debajo
+    column_id: int | None = None
+    after_id: int | None = None
+    before_id: int | None = None
+
+
 class TaskRead(TaskBase):
     id: int
     column_id: int
+    rank: str
     assignee_id: int | None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TaskSearchRead(TaskRead):
+    # Relevancia (ts_rank_cd o -bm25 en SQLite) y fragmento con los términos entre « »
+    search_rank: float | None = None
+    search_snippet: str | None = None
+
+
+class FacetCount(BaseModel, Generic[T]):
+    # None en assignee_id: tareas sin responsable
+    value: T
+    count: int
+
+
+class TaskSearchFacets(BaseModel):
+    # Recuentos sobre el conjunto que casa con la búsqueda y sus filtros, de más a menos frecuente
+    board_id: list[FacetCount[int]] = []
+    column_id: list[FacetCount[int]] = []
+    priority: list[FacetCount[TaskPriority]] = []
+    assignee_id: list[FacetCount[int | None]] = []
+
+
+class TaskSearchPage(Page[TaskSearchRead]):
+    # Solo con facets=true
+    facets: TaskSearchFacets | None = None
+
+
+class TaskSuggestion(BaseModel):
+    id: int
+    title: str
+
+
+# Operaciones por lotes (/tasks/batch)
+MAX_BATCH_SIZE = 500
+
+
+class TaskBatchCreate(BaseModel):
+    items: list[TaskCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchUpdateItem(TaskUpdate):
+    id: int
+
+
+class TaskBatchUpdate(BaseModel):
+    items: list[TaskBatchUpdateItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchDelete(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchItemResult(BaseModel):
+    # Posición del elemento en la petición
+    index: int
+    id: int | None = None
+    status: Literal["created", "updated", "deleted", "not_found"]
+    task: TaskRead | None = None
+
+
+class TaskBatchResult(BaseModel):
+    items: list[TaskBatchItemResult]
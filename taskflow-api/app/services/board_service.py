@@ -1,11 +1,20 @@
 from sqlalchemy.orm import Session
 
+from app.core.cache import invalidate_boards_cache_for_user
+from app.core.pagination import TotalMode
 from app.models.board import Board
 from app.models.user import User
+from app.repositories.access_repository import AccessRepository
 from app.repositories.board_repository import BoardRepository
+from app.repositories.task_repository import TaskRepository
 from app.schemas.board import BoardCreate, BoardUpdate
+from app.schemas.column import ColumnRead
+from app.schemas.snapshot import BoardSnapshot, ColumnSnapshot
+from app.schemas.task import TaskRead
 
 board_repository = BoardRepository()
+access_repository = AccessRepository()
+task_repository = TaskRepository()
 
 
 def create_board(db: Session, *, current_user: User, board_in: BoardCreate) -> Board:
@@ -13,31 +22,34 @@ def create_board(db: Session, *, current_user: User, board_in: BoardCreate) -> B
         "name": board_in.name,
         "owner_id": current_user.id,
     }
-    return board_repository.create(db, data)
+    board = board_repository.create(db, data)
+    invalidate_boards_cache_for_user(current_user.id)
+    return board
 
 
 def get_board(db: Session, *, board_id: int, current_user: User) -> Board | None:
-    board = board_repository.get(db, board_id)
-    if board is None:
-        return None
-    if board.owner_id != current_user.id:
-        return None
-    return board
+    return access_repository.get_board(db, board_id=board_id, owner_id=current_user.id)
 
 
 def get_all_boards_by_user(
-    db: Session, *, current_user: User, skip: int = 0, limit: int = 100
-) -> tuple[list[Board], int]:
-    items, total = board_repository.get_multi_by_owner(db, owner_id=current_user.id, skip=skip, limit=limit)
+    db: Session,
+    *,
+    current_user: User,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    total_mode: TotalMode = TotalMode.EXACT,
+) -> tuple[list[Board], int | None]:
+    items, total = board_repository.get_multi_by_owner(
+        db, owner_id=current_user.id, skip=skip, limit=limit, cursor=cursor, total_mode=total_mode
+    )
     return list(items), total
 
 
 def update_board(db: Session, *, board_id: int, board_in: BoardUpdate, current_user: User) -> Board | None:
-    board = board_repository.get(db, board_id)
+    board = get_board(db, board_id=board_id, current_user=current_user)
     if board is None:
         return None
-    if board.owner_id != current_user.id:
-        return None
 
     update_data: dict = {}
     if board_in.name is not None:
@@ -46,13 +58,38 @@ def update_board(db: Session, *, board_id: int, board_in: BoardUpdate, current_u
     if not update_data:
         return board
 
-    return board_repository.update(db, board, update_data)
+    updated = board_repository.update(db, board, update_data)
+    invalidate_boards_cache_for_user(current_user.id, [board_id])
+    return updated
 
 
 def delete_board(db: Session, *, board_id: int, current_user: User) -> Board | None:
-    board = board_repository.get(db, board_id)
+    board = get_board(db, board_id=board_id, current_user=current_user)
     if board is None:
         return None
-    if board.owner_id != current_user.id:
+    removed = board_repository.remove(db, board_id)
+    invalidate_boards_cache_for_user(current_user.id, [board_id])
+    return removed
+
+
+def get_board_snapshot(
+    db: Session, *, board_id: int, current_user: User, tasks_per_column: int = 100
+) -> BoardSnapshot | None:
+    """Tablero completo (columnas ordenadas y sus tareas vivas) con un número fijo de consultas."""
+    board = board_repository.get_with_columns(db, board_id=board_id, owner_id=current_user.id)
+    if board is None:
         return None
-    return board_repository.remove(db, board_id)
+    tasks_by_column = task_repository.get_top_by_columns(
+        db, column_ids=[c.id for c in board.columns], limit_per_column=tasks_per_column
+    )
+    columns = []
+    for column in board.columns:
+        tasks, count = tasks_by_column[column.id]
+        columns.append(
+            ColumnSnapshot(
+                **ColumnRead.model_validate(column).model_dump(),
+                tasks=[TaskRead.model_validate(t) for t in tasks],
+                task_count=count,
+            )
+        )
+    return BoardSnapshot(id=board.id, name=board.name, owner_id=board.owner_id, columns=columns)
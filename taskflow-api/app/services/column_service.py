@@ -1,32 +1,40 @@
 from sqlalchemy.orm import Session
 
+from app.core.cache import invalidate_boards_cache_for_user
+from app.core.pagination import TotalMode
+from app.core.ranking import rank_between
 from app.models.column import Column
 from app.models.user import User
+from app.repositories.access_repository import AccessRepository
 from app.repositories.column_repository import ColumnRepository
-from app.schemas.column import ColumnCreate, ColumnUpdate
+from app.schemas.column import ColumnCreate, ColumnMove, ColumnUpdate
 from app.services.board_service import get_board
 
 column_repository = ColumnRepository()
+access_repository = AccessRepository()
 
 
 def get_columns_by_board(
-    db: Session, *, board_id: int, current_user: User, skip: int = 0, limit: int = 100
-) -> tuple[list[Column], int]:
+    db: Session,
+    *,
+    board_id: int,
+    current_user: User,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    total_mode: TotalMode = TotalMode.EXACT,
+) -> tuple[list[Column], int | None]:
     board = get_board(db, board_id=board_id, current_user=current_user)
     if board is None:
         return [], 0
-    items, total = column_repository.get_multi_by_board(db, board_id=board_id, skip=skip, limit=limit)
+    items, total = column_repository.get_multi_by_board(
+        db, board_id=board_id, skip=skip, limit=limit, cursor=cursor, total_mode=total_mode
+    )
     return list(items), total
 
 
 def get_column(db: Session, *, column_id: int, current_user: User) -> Column | None:
-    column = column_repository.get(db, column_id)
-    if column is None:
-        return None
-    board = get_board(db, board_id=column.board_id, current_user=current_user)
-    if board is None:
-        return None
-    return column
+    return access_repository.get_column(db, column_id=column_id, owner_id=current_user.id)
 
 
 def create_column(db: Session, *, current_user: User, column_in: ColumnCreate) -> Column | None:
@@ -34,42 +42,78 @@ def create_column(db: Session, *, current_user: User, column_in: ColumnCreate) -
     if board is None:
         return None
 
+    scope = Column.board_id == column_in.board_id
+    if column_in.position is not None:
+        rank = column_repository.rank_at_position(db, scope=scope, position=column_in.position)
+    else:
+        # Sin posición explícita la columna se añade al final del tablero
+        last_rank, _ = column_repository.get_neighbour_ranks(db, scope=scope)
+        rank = rank_between(last_rank, None)
     data = {
         "name": column_in.name,
-        "position": column_in.position,
+        "position": column_in.position if column_in.position is not None else 0,
+        "rank": rank,
         "board_id": column_in.board_id,
     }
-    return column_repository.create(db, data)
+    column = column_repository.create(db, data)
+    invalidate_boards_cache_for_user(current_user.id, [column_in.board_id])
+    return column
 
 
 def update_column(db: Session, *, column_id: int, column_in: ColumnUpdate, current_user: User) -> Column | None:
-    column = column_repository.get(db, column_id)
+    column = get_column(db, column_id=column_id, current_user=current_user)
     if column is None:
         return None
 
-    board = get_board(db, board_id=column.board_id, current_user=current_user)
-    if board is None:
-        return None
-
     update_data: dict = {}
     if column_in.name is not None:
         update_data["name"] = column_in.name
     if column_in.position is not None:
         update_data["position"] = column_in.position
+        update_data["rank"] = column_repository.rank_at_position(
+            db, scope=Column.board_id == column.board_id, position=column_in.position, item_id=column.id
+        )
 
     if not update_data:
         return column
 
-    return column_repository.update(db, column, update_data)
+    updated = column_repository.update(db, column, update_data)
+    invalidate_boards_cache_for_user(current_user.id, [column.board_id])
+    return updated
 
 
-def delete_column(db: Session, *, column_id: int, current_user: User) -> Column | None:
-    column = column_repository.get(db, column_id)
+def move_column(db: Session, *, column_id: int, move_in: ColumnMove, current_user: User) -> Column | None:
+    """Coloca la columna entre `after_id` y `before_id` del mismo tablero reescribiendo solo su fila."""
+    column = get_column(db, column_id=column_id, current_user=current_user)
     if column is None:
         return None
 
-    board = get_board(db, board_id=column.board_id, current_user=current_user)
-    if board is None:
+    rank = column_repository.rank_for_move(
+        db,
+        scope=Column.board_id == column.board_id,
+        item_id=column_id,
+        after_id=move_in.after_id,
+        before_id=move_in.before_id,
+    )
+    if rank is None:
+        return None
+    updated = column_repository.update(db, column, {"rank": rank})
+    invalidate_boards_cache_for_user(current_user.id, [column.board_id])
+    return updated
+
+
+def rebalance_column_ranks(db: Session, *, board_id: int, current_user: User) -> None:
+    """Reasigna ranks cortos a las columnas del tablero (se lanza en segundo plano)."""
+    if column_repository.rebalance_ranks(db, scope=Column.board_id == board_id):
+        invalidate_boards_cache_for_user(current_user.id, [board_id])
+
+
+def delete_column(db: Session, *, column_id: int, current_user: User) -> Column | None:
+    column = get_column(db, column_id=column_id, current_user=current_user)
+    if column is None:
         return None
 
-    return column_repository.remove(db, column_id)
+    board_id = column.board_id
+    removed = column_repository.remove(db, column_id)
+    invalidate_boards_cache_for_user(current_user.id, [board_id])
+    return removed
@@ -1,12 +1,15 @@
 from sqlalchemy.orm import Session
 
+from app.core.cache import invalidate_search_cache_for_user
 from app.models.comment import Comment
 from app.models.user import User
+from app.repositories.access_repository import AccessRepository
 from app.repositories.comment_repository import CommentRepository
 from app.schemas.comment import CommentCreate, CommentUpdate
 from app.services.task_service import get_task
 
 comment_repository = CommentRepository()
+access_repository = AccessRepository()
 
 
 def create_comment(db: Session, *, current_user: User, comment_in: CommentCreate) -> Comment | None:
@@ -21,31 +24,21 @@ def create_comment(db: Session, *, current_user: User, comment_in: CommentCreate
         # Forzamos el autor al usuario actual, ignorando lo recibido
         "author_id": current_user.id,
     }
-    return comment_repository.create(db, data)
+    comment = comment_repository.create(db, data)
+    # El texto de los comentarios entra en las búsquedas del dueño de la tarea
+    invalidate_search_cache_for_user(task.owner_id)
+    return comment
 
 
 def get_comment(db: Session, *, comment_id: int, current_user: User) -> Comment | None:
-    comment = comment_repository.get(db, comment_id)
-    if comment is None:
-        return None
-
     # Permitir si es el autor o si es dueño del tablero de la tarea
-    if comment.author_id == current_user.id:
-        return comment
-
-    task = get_task(db, task_id=comment.task_id, current_user=current_user)
-    if task is None:
-        return None
-    return comment
+    return access_repository.get_comment(db, comment_id=comment_id, user_id=current_user.id)
 
 
 def update_comment(db: Session, *, comment_id: int, comment_in: CommentUpdate, current_user: User) -> Comment | None:
-    comment = comment_repository.get(db, comment_id)
-    if comment is None:
-        return None
-
     # Solo el autor puede editar
-    if comment.author_id != current_user.id:
+    comment = access_repository.get_comment(db, comment_id=comment_id, user_id=current_user.id, author_only=True)
+    if comment is None:
         return None
 
     update_data: dict = {}
@@ -55,16 +48,18 @@ def update_comment(db: Session, *, comment_id: int, comment_in: CommentUpdate, c
     if not update_data:
         return comment
 
-    return comment_repository.update(db, comment, update_data)
+    comment = comment_repository.update(db, comment, update_data)
+    invalidate_search_cache_for_user(comment.task.owner_id)
+    return comment
 
 
 def delete_comment(db: Session, *, comment_id: int, current_user: User) -> Comment | None:
-    comment = comment_repository.get(db, comment_id)
-    if comment is None:
-        return None
-
     # Solo el autor puede eliminar
-    if comment.author_id != current_user.id:
+    comment = access_repository.get_comment(db, comment_id=comment_id, user_id=current_user.id, author_only=True)
+    if comment is None:
         return None
 
-    return comment_repository.remove(db, comment_id)
+    comment = comment_repository.remove(db, comment_id)
+    if comment is not None:
+        invalidate_search_cache_for_user(comment.task.owner_id)
+    return comment
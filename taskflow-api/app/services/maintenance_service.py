@@ -0,0 +1,201 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import anyio
+import structlog
+from sqlalchemy import ColumnElement, Table, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_boards_cache_for_user, invalidate_tasks_cache_for_user
+from app.core.config import settings
+from app.core.instrumentation import ARCHIVE_BATCH_SECONDS, ARCHIVE_ROWS
+from app.db.session import SessionLocal
+from app.models.archive import boards_archive, columns_archive, comments_archive, tasks_archive
+from app.models.board import Board
+from app.models.column import Column
+from app.models.comment import Comment
+from app.models.task import Task
+from app.repositories.archive_repository import ArchiveRepository
+from app.schemas.maintenance import ArchiveMode, ArchiveReport, TableArchiveReport
+
+archive_repository = ArchiveRepository()
+logger = structlog.get_logger(__name__)
+
+_boards = Board.__table__
+_columns = Column.__table__
+_tasks = Task.__table__
+_comments = Comment.__table__
+
+
+def _expired_conditions(cutoff: datetime) -> list[tuple[Table, ColumnElement[bool]]]:
+    """Qué filas salen de cada tabla, de hijos a padres.
+
+    Un tablero caducado arrastra sus columnas, tareas y comentarios (aunque sigan vivos),
+    y una tarea caducada sus comentarios. Al procesar primero a los hijos ningún borrado
+    dispara cascadas fuera del lote, y si la ejecución se corta a medias lo que queda sigue
+    oculto tras su padre soft-deleted.
+    """
+    expired_boards = select(_boards.c.id).where(_boards.c.deleted_at < cutoff)
+    column_condition = _columns.c.board_id.in_(expired_boards)
+    task_condition = or_(
+        _tasks.c.deleted_at < cutoff,
+        _tasks.c.column_id.in_(select(_columns.c.id).where(column_condition)),
+    )
+    comment_condition = or_(
+        _comments.c.deleted_at < cutoff,
+        _comments.c.task_id.in_(select(_tasks.c.id).where(task_condition)),
+    )
+    return [
+        (_comments, comment_condition),
+        (_tasks, task_condition),
+        (_columns, column_condition),
+        (_boards, _boards.c.deleted_at < cutoff),
+    ]
+
+
+def archive_soft_deleted(
+    db: Session,
+    *,
+    older_than_days: int,
+    mode: ArchiveMode = ArchiveMode.ARCHIVE,
+    batch_size: int = 1000,
+    pause_seconds: float = 0.0,
+    lock_timeout_ms: int = 2000,
+) -> ArchiveReport:
+    """Archiva (o purga) las filas soft-deleted hace más de `older_than_days` días.
+
+    Cada lote es una transacción corta de como mucho `batch_size` filas; los bloqueos se
+    liberan en cada commit. Las filas ya no eran visibles, así que no hay caché que invalidar.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    report = ArchiveReport(mode=mode, cutoff=cutoff, tables=[])
+    started = time.perf_counter()
+    for table, condition in _expired_conditions(cutoff):
+        table_report = TableArchiveReport(table=table.name)
+        report.tables.append(table_report)
+        while True:
+            batch_started = time.perf_counter()
+            archive_repository.set_lock_timeout(db, milliseconds=lock_timeout_ms)
+            ids = archive_repository.next_batch(db, table, condition, limit=batch_size)
+            if not ids:
+                db.rollback()
+                break
+            if mode == ArchiveMode.ARCHIVE:
+                archive_repository.archive(db, table, ids)
+            else:
+                archive_repository.purge(db, table, ids)
+            db.commit()
+
+            elapsed = time.perf_counter() - batch_started
+            table_report.rows += len(ids)
+            table_report.batches += 1
+            table_report.seconds += elapsed
+            ARCHIVE_ROWS.labels(table=table.name, mode=mode.value).inc(len(ids))
+            ARCHIVE_BATCH_SECONDS.labels(table=table.name, mode=mode.value).observe(elapsed)
+            if len(ids) < batch_size:
+                break
+            if pause_seconds > 0:
+                time.sleep(pause_seconds)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def archive_exclusively(db: Session, **options) -> ArchiveReport | None:
+    """`archive_soft_deleted` sin solaparse con otra ejecución; None si ya hay una en curso."""
+    # El lock va en una conexión aparte: la sesión suelta la suya en cada commit
+    with db.get_bind().connect() as lock_conn:
+        if not archive_repository.try_lock(lock_conn):
+            return None
+        try:
+            return archive_soft_deleted(db, **options)
+        finally:
+            archive_repository.unlock(lock_conn)
+            lock_conn.commit()
+
+
+def run_archive_job() -> ArchiveReport | None:
+    """Una ejecución de la tarea programada con la configuración de `settings`."""
+    db = SessionLocal()
+    try:
+        report = archive_exclusively(
+            db,
+            older_than_days=settings.ARCHIVE_AFTER_DAYS,
+            mode=ArchiveMode(settings.ARCHIVE_MODE),
+            batch_size=settings.ARCHIVE_BATCH_SIZE,
+            pause_seconds=settings.ARCHIVE_BATCH_PAUSE_SECONDS,
+            lock_timeout_ms=settings.ARCHIVE_LOCK_TIMEOUT_MS,
+        )
+    finally:
+        db.close()
+    if report is None:
+        logger.info("archive_run_skipped", reason="otra ejecución en curso")
+    else:
+        logger.info("archive_run", **report.model_dump(mode="json"))
+    return report
+
+
+async def archive_periodically(interval_seconds: int) -> None:
+    """Bucle de la tarea programada; los errores se registran y se reintenta en la siguiente vuelta."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await anyio.to_thread.run_sync(run_archive_job)
+        except Exception:
+            logger.exception("archive_run_failed")
+
+
+def _restore(db: Session, table: Table, ids: list[int], restored: dict[str, int], *, undelete: bool = False) -> None:
+    restored[table.name] = archive_repository.restore(db, table, ids, undelete=undelete)
+
+
+def restore_board(db: Session, *, board_id: int) -> dict[str, int]:
+    """Devuelve un tablero archivado (sin `deleted_at`) con sus columnas, tareas y comentarios."""
+    if not archive_repository.get_archived_ids(db, _boards, boards_archive.c.id == board_id):
+        raise ValueError("El tablero no está archivado")
+    column_ids = archive_repository.get_archived_ids(db, _columns, columns_archive.c.board_id == board_id)
+    task_ids = archive_repository.get_archived_ids(db, _tasks, tasks_archive.c.column_id.in_(column_ids))
+    comment_ids = archive_repository.get_archived_ids(db, _comments, comments_archive.c.task_id.in_(task_ids))
+
+    restored: dict[str, int] = {}
+    _restore(db, _boards, [board_id], restored, undelete=True)
+    _restore(db, _columns, column_ids, restored)
+    _restore(db, _tasks, task_ids, restored)
+    _restore(db, _comments, comment_ids, restored)
+    db.commit()
+    owner_id = db.get(Board, board_id).owner_id
+    invalidate_boards_cache_for_user(owner_id, [board_id])
+    invalidate_tasks_cache_for_user(owner_id, [board_id])
+    return restored
+
+
+def restore_task(db: Session, *, task_id: int) -> dict[str, int]:
+    """Devuelve una tarea archivada (sin `deleted_at`) con sus comentarios a su columna."""
+    row = db.execute(select(tasks_archive.c.column_id).where(tasks_archive.c.id == task_id)).first()
+    if row is None:
+        raise ValueError("La tarea no está archivada")
+    column = db.get(Column, row.column_id)
+    if column is None:
+        raise ValueError("La columna de la tarea ya no existe; restaura antes su tablero")
+    comment_ids = archive_repository.get_archived_ids(db, _comments, comments_archive.c.task_id == task_id)
+
+    restored: dict[str, int] = {}
+    _restore(db, _tasks, [task_id], restored, undelete=True)
+    _restore(db, _comments, comment_ids, restored)
+    db.commit()
+    invalidate_tasks_cache_for_user(column.board.owner_id, [column.board_id])
+    return restored
+
+
+def restore_comment(db: Session, *, comment_id: int) -> dict[str, int]:
+    """Devuelve un comentario archivado (sin `deleted_at`) a su tarea."""
+    row = db.execute(select(comments_archive.c.task_id).where(comments_archive.c.id == comment_id)).first()
+    if row is None:
+        raise ValueError("El comentario no está archivado")
+    if db.get(Task, row.task_id) is None:
+        raise ValueError("La tarea del comentario ya no existe; restaura antes la tarea")
+
+    restored: dict[str, int] = {}
+    _restore(db, _comments, [comment_id], restored, undelete=True)
+    db.commit()
+    return restored
@@ -1,13 +1,30 @@
 from sqlalchemy.orm import Session
 
 from app.core.cache import invalidate_tasks_cache_for_user
+from app.core.pagination import TotalMode
+from app.core.ranking import rank_between
 from app.models.task import Task, TaskPriority
 from app.models.user import User
+from app.repositories.access_repository import AccessRepository
 from app.repositories.task_repository import TaskRepository
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.task import (
+    FacetCount,
+    TaskBatchCreate,
+    TaskBatchDelete,
+    TaskBatchItemResult,
+    TaskBatchResult,
+    TaskBatchUpdate,
+    TaskCreate,
+    TaskMove,
+    TaskRead,
+    TaskSearchFacets,
+    TaskSuggestion,
+    TaskUpdate,
+)
 from app.services.column_service import get_column
 
 task_repository = TaskRepository()
+access_repository = AccessRepository()
 
 
 def create_task(db: Session, *, current_user: User, column_id: int, task_in: TaskCreate) -> Task | None:
@@ -20,37 +37,35 @@ def create_task(db: Session, *, current_user: User, column_id: int, task_in: Tas
         "description": task_in.description,
         "priority": task_in.priority,
         "column_id": column_id,
+        "board_id": column.board_id,
+        "owner_id": current_user.id,
     }
     if task_in.assignee_id is not None:
         data["assignee_id"] = task_in.assignee_id
     if task_in.position is not None:
         data["position"] = task_in.position
+        data["rank"] = task_repository.rank_at_position(
+            db, scope=Task.column_id == column_id, position=task_in.position
+        )
+    else:
+        # Sin posición explícita la tarea se añade al final de la columna
+        last_rank = task_repository.get_last_ranks(db, column_ids=[column_id]).get(column_id)
+        data["rank"] = rank_between(last_rank, None)
     created = task_repository.create(db, data)
     if created is not None:
-        invalidate_tasks_cache_for_user(current_user.id)
+        invalidate_tasks_cache_for_user(current_user.id, [column.board_id])
     return created
 
 
 def get_task(db: Session, *, task_id: int, current_user: User) -> Task | None:
-    task = task_repository.get(db, task_id)
-    if task is None:
-        return None
-
-    column = get_column(db, column_id=task.column_id, current_user=current_user)
-    if column is None:
-        return None
-    return task
+    return access_repository.get_task(db, task_id=task_id, owner_id=current_user.id)
 
 
 def update_task(db: Session, *, task_id: int, task_in: TaskUpdate, current_user: User) -> Task | None:
-    task = task_repository.get(db, task_id)
+    task = get_task(db, task_id=task_id, current_user=current_user)
     if task is None:
         return None
 
-    column = get_column(db, column_id=task.column_id, current_user=current_user)
-    if column is None:
-        return None
-
     update_data: dict = {}
     if task_in.title is not None:
         update_data["title"] = task_in.title
@@ -68,31 +83,179 @@ def update_task(db: Session, *, task_id: int, task_in: TaskUpdate, current_user:
         if new_column is None:
             return None
         update_data["column_id"] = task_in.column_id
+        update_data["board_id"] = new_column.board_id
+    if task_in.position is not None:
+        # Puesto dentro de la columna destino, calculado con los vecinos que tendrá allí
+        update_data["rank"] = task_repository.rank_at_position(
+            db,
+            scope=Task.column_id == update_data.get("column_id", task.column_id),
+            position=task_in.position,
+            item_id=task.id,
+        )
 
     if not update_data:
         return task
 
+    board_ids = [task.board_id, update_data.get("board_id", task.board_id)]
     updated = task_repository.update(db, task, update_data)
     if updated is not None:
-        invalidate_tasks_cache_for_user(current_user.id)
+        invalidate_tasks_cache_for_user(current_user.id, board_ids)
     return updated
 
 
-def delete_task(db: Session, *, task_id: int, current_user: User) -> Task | None:
-    task = task_repository.get(db, task_id)
+def move_task(db: Session, *, task_id: int, move_in: TaskMove, current_user: User) -> Task | None:
+    """Coloca la tarea entre `after_id` y `before_id` reescribiendo solo su fila."""
+    task = get_task(db, task_id=task_id, current_user=current_user)
     if task is None:
         return None
+    column_id = move_in.column_id if move_in.column_id is not None else task.column_id
+    changes: dict = {"column_id": column_id}
+    if column_id != task.column_id:
+        column = get_column(db, column_id=column_id, current_user=current_user)
+        if column is None:
+            return None
+        changes["board_id"] = column.board_id
 
-    column = get_column(db, column_id=task.column_id, current_user=current_user)
-    if column is None:
+    rank = task_repository.rank_for_move(
+        db,
+        scope=Task.column_id == column_id,
+        item_id=task_id,
+        after_id=move_in.after_id,
+        before_id=move_in.before_id,
+    )
+    if rank is None:
+        return None
+    board_ids = [task.board_id, changes.get("board_id", task.board_id)]
+    updated = task_repository.update(db, task, {"rank": rank, **changes})
+    invalidate_tasks_cache_for_user(current_user.id, board_ids)
+    return updated
+
+
+def rebalance_task_ranks(db: Session, *, column_id: int, board_id: int, current_user: User) -> None:
+    """Reasigna ranks cortos a las tareas de la columna (se lanza en segundo plano)."""
+    if task_repository.rebalance_ranks(db, scope=Task.column_id == column_id):
+        invalidate_tasks_cache_for_user(current_user.id, [board_id])
+
+
+def delete_task(db: Session, *, task_id: int, current_user: User) -> Task | None:
+    task = get_task(db, task_id=task_id, current_user=current_user)
+    if task is None:
         return None
 
     removed = task_repository.remove(db, task_id)
     if removed is not None:
-        invalidate_tasks_cache_for_user(current_user.id)
+        invalidate_tasks_cache_for_user(current_user.id, [task.board_id])
     return removed
 
 
+def create_tasks_batch(db: Session, *, current_user: User, batch_in: TaskBatchCreate) -> TaskBatchResult:
+    """Crea varias tareas en una transacción validando el acceso una vez por columna distinta."""
+    allowed = access_repository.get_owned_column_boards(
+        db, column_ids=[item.column_id for item in batch_in.items], owner_id=current_user.id
+    )
+    indexes = [i for i, item in enumerate(batch_in.items) if item.column_id in allowed]
+    # Los ranks de todo el lote se calculan juntos: dos tareas con la misma posición en una
+    # columna quedan en el orden del lote y las que no la indican, al final
+    ranks = task_repository.ranks_for_batch(
+        db,
+        container=Task.column_id,
+        placements=[(batch_in.items[i].column_id, batch_in.items[i].position) for i in indexes],
+    )
+    rows: list[dict] = []
+    for i, rank in zip(indexes, ranks):
+        item = batch_in.items[i]
+        rows.append(
+            {
+                "title": item.title,
+                "description": item.description,
+                "priority": item.priority,
+                "column_id": item.column_id,
+                # El INSERT por lotes no pasa por los eventos del ORM: se copian aquí
+                "board_id": allowed[item.column_id],
+                "owner_id": current_user.id,
+                "assignee_id": item.assignee_id,
+                "position": item.position if item.position is not None else 0,
+                "rank": rank,
+            }
+        )
+    created = task_repository.create_many(db, rows)
+    if created:
+        invalidate_tasks_cache_for_user(current_user.id, [row["board_id"] for row in rows])
+
+    results = [TaskBatchItemResult(index=i, status="not_found") for i in range(len(batch_in.items))]
+    for i, task in zip(indexes, created):
+        results[i] = TaskBatchItemResult(index=i, id=task.id, status="created", task=TaskRead.model_validate(task))
+    return TaskBatchResult(items=results)
+
+
+def update_tasks_batch(db: Session, *, current_user: User, batch_in: TaskBatchUpdate) -> TaskBatchResult:
+    """Actualiza varias tareas en una transacción (UPDATE por clave primaria)."""
+    tasks = access_repository.get_tasks(db, task_ids=[item.id for item in batch_in.items], owner_id=current_user.id)
+    # Columnas destino de los movimientos: se validan juntas, una vez por columna
+    target_columns = access_repository.get_owned_column_boards(
+        db,
+        column_ids=[item.column_id for item in batch_in.items if item.column_id is not None],
+        owner_id=current_user.id,
+    )
+
+    results = [TaskBatchItemResult(index=i, id=item.id, status="not_found") for i, item in enumerate(batch_in.items)]
+    indexes = [
+        i
+        for i, item in enumerate(batch_in.items)
+        if item.id in tasks and (item.column_id is None or item.column_id in target_columns)
+    ]
+    # Ranks de las tareas recolocadas, calculados juntos por columna destino
+    moves = [i for i in indexes if batch_in.items[i].position is not None]
+    ranks = task_repository.ranks_for_batch(
+        db,
+        container=Task.column_id,
+        placements=[
+            (batch_in.items[i].column_id or tasks[batch_in.items[i].id].column_id, batch_in.items[i].position)
+            for i in moves
+        ],
+        exclude_ids=[batch_in.items[i].id for i in moves],
+    )
+    ranks_by_index = dict(zip(moves, ranks))
+
+    rows: list[dict] = []
+    for i in indexes:
+        item = batch_in.items[i]
+        update_data = item.model_dump(exclude={"id"}, exclude_none=True)
+        if i in ranks_by_index:
+            update_data["rank"] = ranks_by_index[i]
+        if item.column_id is not None:
+            # El UPDATE por lotes no pasa por los eventos del ORM
+            update_data["board_id"] = target_columns[item.column_id]
+        if update_data:
+            rows.append({"id": item.id, **update_data})
+        results[i] = TaskBatchItemResult(index=i, id=item.id, status="updated")
+
+    # Tableros de origen y destino de cada tarea modificada
+    board_ids = [tasks[row["id"]].board_id for row in rows] + [row["board_id"] for row in rows if "board_id" in row]
+    updated = {task.id: task for task in task_repository.update_many(db, rows)}
+    if rows:
+        invalidate_tasks_cache_for_user(current_user.id, board_ids)
+    for result in results:
+        if result.status == "updated":
+            result.task = TaskRead.model_validate(updated.get(result.id) or tasks[result.id])
+    return TaskBatchResult(items=results)
+
+
+def delete_tasks_batch(db: Session, *, current_user: User, batch_in: TaskBatchDelete) -> TaskBatchResult:
+    """Soft delete de varias tareas en una sola sentencia."""
+    tasks = access_repository.get_tasks(db, task_ids=batch_in.ids, owner_id=current_user.id)
+    board_ids = [task.board_id for task in tasks.values()]
+    task_repository.remove_many(db, list(tasks))
+    if tasks:
+        invalidate_tasks_cache_for_user(current_user.id, board_ids)
+    return TaskBatchResult(
+        items=[
+            TaskBatchItemResult(index=i, id=task_id, status="deleted" if task_id in tasks else "not_found")
+            for i, task_id in enumerate(batch_in.ids)
+        ]
+    )
+
+
 def get_tasks_by_column(
     db: Session,
     *,
@@ -100,9 +263,11 @@ def get_tasks_by_column(
     current_user: User,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    total_mode: TotalMode = TotalMode.EXACT,
     priority: TaskPriority | None = None,
     assignee_id: int | None = None,
-) -> tuple[list[Task], int]:
+) -> tuple[list[Task], int | None]:
     column = get_column(db, column_id=column_id, current_user=current_user)
     if column is None:
         return [], 0
@@ -111,27 +276,64 @@ def get_tasks_by_column(
         column_id=column_id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+        total_mode=total_mode,
         priority=priority,
         assignee_id=assignee_id,
     )
     return list(items), total
 
 
+def suggest_task_titles(db: Session, *, current_user: User, prefix: str, limit: int = 10) -> list[TaskSuggestion]:
+    if not prefix.strip():
+        return []
+    rows = task_repository.suggest_titles(db, owner_id=current_user.id, prefix=prefix, limit=limit)
+    return [TaskSuggestion(id=task_id, title=title) for task_id, title in rows]
+
+
 def search_tasks(
     db: Session,
     *,
     current_user: User,
     q: str,
+    prefix: bool = False,
+    fuzzy: bool = False,
+    similarity: float | None = None,
+    include_comments: bool = False,
+    priorities: list[TaskPriority] | None = None,
+    assignee_id: int | None = None,
+    board_id: int | None = None,
     skip: int = 0,
     limit: int = 100,
-) -> tuple[list[Task], int]:
+    cursor: str | None = None,
+    total_mode: TotalMode = TotalMode.EXACT,
+) -> tuple[list[Task], int | None]:
     if not q or q.strip() == "":
         return [], 0
     items, total = task_repository.search_tasks_by_owner(
         db,
         owner_id=current_user.id,
         query=q,
+        prefix=prefix,
+        fuzzy=fuzzy,
+        similarity=similarity,
+        include_comments=include_comments,
+        priorities=priorities,
+        assignee_id=assignee_id,
+        board_id=board_id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+        total_mode=total_mode,
     )
     return list(items), total
+
+
+def search_task_facets(db: Session, *, current_user: User, q: str, **search) -> TaskSearchFacets:
+    """Recuentos por faceta de una búsqueda; admite los mismos filtros que `search_tasks`."""
+    if not q or q.strip() == "":
+        return TaskSearchFacets()
+    facets = task_repository.search_facets_by_owner(db, owner_id=current_user.id, query=q, **search)
+    return TaskSearchFacets(
+        **{name: [FacetCount(value=value, count=count) for value, count in counts] for name, counts in facets.items()}
+    )
@@ -8,13 +8,14 @@ from app.schemas.user import UserCreate
 user_repository = UserRepository()
 
 
-def create_user(db: Session, *, user_in: UserCreate) -> User:
+def create_user(db: Session, *, user_in: UserCreate, password_hash: str | None = None) -> User:
+    """Registra un usuario. `password_hash` permite calcular el hash fuera (p. ej. en un hilo)."""
     existing = user_repository.get_by_email(db, email=user_in.email)
     if existing is not None:
         raise ValueError("Email ya registrado")
 
     user_data = {
         "email": user_in.email,
-        "password_hash": get_password_hash(user_in.password),
+        "password_hash": password_hash or get_password_hash(user_in.password),
     }
     return user_repository.create(db, user_data)
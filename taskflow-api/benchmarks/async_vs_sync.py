@@ -0,0 +1,102 @@
+"""Compara el acceso síncrono (threadpool) y asíncrono a PostgreSQL bajo concurrencia.
+
+Simula N clientes concurrentes cuya petición espera en la BD (`pg_sleep`):
+
+- sync: `Session` ejecutada en el threadpool de anyio, como los antiguos routers `def`.
+  La concurrencia queda limitada por los tokens del threadpool (40 por defecto).
+- async: `AsyncSession` en el event loop, como los routers `async def` actuales.
+
+Ambos motores usan un pool del tamaño de la concurrencia para aislar el efecto del
+threadpool. Requiere un PostgreSQL accesible con la configuración de `Settings`:
+
+    python -m benchmarks.async_vs_sync --requests 2000 --concurrency 500 --sleep 0.05
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import anyio
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+
+
+def _report(mode: str, latencies: list[float], elapsed: float) -> None:
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{mode:>5}: {len(latencies)} peticiones en {elapsed:.2f}s "
+        f"({len(latencies) / elapsed:.0f} req/s) p50={statistics.median(latencies) * 1000:.0f}ms "
+        f"p95={p95 * 1000:.0f}ms"
+    )
+
+
+async def _run(requests: int, concurrency: int, call) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+async def bench_sync(requests: int, concurrency: int, sleep: float) -> None:
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_size=concurrency, max_overflow=0)
+    session_factory = sessionmaker(bind=engine)
+    query = text("SELECT pg_sleep(:s)")
+
+    def handler() -> None:
+        with session_factory() as db:
+            db.execute(query, {"s": sleep})
+
+    async def call() -> None:
+        await anyio.to_thread.run_sync(handler)
+
+    try:
+        _report("sync", *await _run(requests, concurrency, call))
+    finally:
+        engine.dispose()
+
+
+async def bench_async(requests: int, concurrency: int, sleep: float) -> None:
+    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, pool_size=concurrency, max_overflow=0)
+    session_factory = async_sessionmaker(bind=engine)
+    query = text("SELECT pg_sleep(:s)")
+
+    async def call() -> None:
+        async with session_factory() as db:
+            await db.execute(query, {"s": sleep})
+
+    try:
+        _report("async", *await _run(requests, concurrency, call))
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--sleep", type=float, default=0.05, help="Segundos de espera en la BD por petición")
+    args = parser.parse_args()
+
+    async def run_all() -> None:
+        print(f"threadpool de anyio: {anyio.to_thread.current_default_thread_limiter().total_tokens:.0f} hilos")
+        await bench_sync(args.requests, args.concurrency, args.sleep)
+        await bench_async(args.requests, args.concurrency, args.sleep)
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
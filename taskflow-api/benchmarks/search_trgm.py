@@ -0,0 +1,175 @@
+"""Compara la búsqueda de tareas FTS (actual) con la difusa por trigramas sobre un millón de tareas.
+
+Crea (o reutiliza) un usuario `bench-search@taskflow.local` con un tablero y `--tasks` tareas
+generadas en SQL con títulos tipo "Revisar factura proveedor TF-123456" y lanza cada consulta
+en tres modos:
+
+- fts: `search_tasks_by_owner` tal cual (websearch_to_tsquery + GIN de search_vector).
+- fuzzy: el mismo método con `fuzzy=True` (FTS + GIN gin_trgm_ops en título y descripción).
+- ilike: `ILIKE '%q%'` con los índices desactivados, el escaneo completo al que equivale el
+  fallback por subcadena sin pg_trgm.
+
+Informa de p50/p95 y del número de resultados de cada modo (las erratas y subcadenas solo las
+encuentra fuzzy). Al final mide también las sugerencias de GET /tasks/suggest (`suggest_titles`,
+objetivo p99 < 10 ms) para prefijos cada vez más largos. Requiere PostgreSQL con las migraciones aplicadas:
+
+    python -m benchmarks.search_trgm --tasks 1000000 --repeat 20
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import create_engine, func, or_, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.pagination import TotalMode
+from app.models.task import Task
+from app.repositories.task_repository import TaskRepository
+
+_EMAIL = "bench-search@taskflow.local"
+_VERBS = ["Revisar", "Preparar", "Enviar", "Migrar", "Actualizar", "Diseñar", "Probar", "Documentar"]
+_NOUNS = ["factura", "dashboard", "contrato", "servidor", "informe", "campaña", "pedido", "backup"]
+_QUALIFIERS = ["proveedor", "cliente", "mensual", "urgente", "producción", "marketing", "legal", "interno"]
+
+# (consulta, qué ejercita)
+_QUERIES = [
+    ("dashboard", "palabra exacta"),
+    ("dashbord", "errata"),
+    ("factura proveedor", "dos palabras"),
+    ("facturra", "errata"),
+    ("TF-4242", "identificador parcial"),
+    ("produc", "subcadena"),
+]
+
+# Lo que se va tecleando en el buscador
+_PREFIXES = ["da", "das", "dashb", "factura prov", "revis"]
+
+_repository = TaskRepository()
+
+
+def _sql_array(words: list[str]) -> str:
+    return "ARRAY[" + ", ".join(f"'{w}'" for w in words) + "]"
+
+
+def _seed(db: Session, tasks: int) -> int:
+    """Devuelve el id del usuario de pruebas, creando sus tareas si aún no existen."""
+    owner_id = db.execute(text("SELECT id FROM users WHERE email = :e"), {"e": _EMAIL}).scalar()
+    if owner_id is None:
+        owner_id = db.execute(
+            text("INSERT INTO users (email, password_hash, role) VALUES (:e, 'x', 'USER') RETURNING id"), {"e": _EMAIL}
+        ).scalar_one()
+    existing = db.execute(select(func.count()).where(Task.owner_id == owner_id)).scalar_one()
+    if existing >= tasks:
+        return owner_id
+
+    board_id = db.execute(
+        text("INSERT INTO boards (name, owner_id) VALUES ('bench', :o) RETURNING id"), {"o": owner_id}
+    ).scalar_one()
+    column_id = db.execute(
+        text("INSERT INTO columns (name, position, rank, board_id) VALUES ('bench', 1, '0', :b) RETURNING id"),
+        {"b": board_id},
+    ).scalar_one()
+    db.commit()
+
+    chunk = 100_000
+    for start in range(existing, tasks, chunk):
+        stop = min(start + chunk, tasks)
+        db.execute(
+            text(
+                f"""
+                INSERT INTO tasks (title, description, priority, position, rank, column_id, board_id, owner_id,
+                                   created_at, updated_at)
+                SELECT {_sql_array(_VERBS)}[1 + g % {len(_VERBS)}] || ' '
+                       || {_sql_array(_NOUNS)}[1 + (g / 7) % {len(_NOUNS)}] || ' '
+                       || {_sql_array(_QUALIFIERS)}[1 + (g / 53) % {len(_QUALIFIERS)}] || ' TF-' || g,
+                       'Tarea generada ' || g || ' para el equipo ' || {_sql_array(_QUALIFIERS)}[1 + g % 5],
+                       'MEDIUM', g, lpad(to_hex(g), 12, '0'), :c, :b, :o, now(), now()
+                FROM generate_series(:start, :stop - 1) AS g
+                """
+            ),
+            {"c": column_id, "b": board_id, "o": owner_id, "start": start, "stop": stop},
+        )
+        db.commit()
+        print(f"  {stop}/{tasks} tareas")
+    db.execute(text("ANALYZE tasks"))
+    db.commit()
+    return owner_id
+
+
+def _ilike_full_scan(db: Session, owner_id: int, query: str) -> int:
+    db.execute(text("SET LOCAL enable_bitmapscan = off"))
+    db.execute(text("SET LOCAL enable_indexscan = off"))
+    pattern = f"%{query}%"
+    stmt = (
+        select(Task.id)
+        .where(
+            Task.owner_id == owner_id,
+            Task.deleted_at.is_(None),
+            or_(Task.title.ilike(pattern), Task.description.ilike(pattern)),
+        )
+        .order_by(Task.id.desc())
+        .limit(50)
+    )
+    return len(db.execute(stmt).all())
+
+
+def _search(db: Session, owner_id: int, query: str, *, fuzzy: bool) -> int:
+    items, _ = _repository.search_tasks_by_owner(
+        db, owner_id=owner_id, query=query, fuzzy=fuzzy, limit=50, total_mode=TotalMode.NONE
+    )
+    return len(items)
+
+
+def _measure(session_factory, repeat: int, call) -> tuple[float, float, int]:
+    latencies: list[float] = []
+    hits = 0
+    for _ in range(repeat):
+        with session_factory() as db:
+            start = time.perf_counter()
+            hits = call(db)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    return statistics.median(latencies) * 1000, p95 * 1000, hits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20, help="Ejecuciones de cada consulta y modo")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+    session_factory = sessionmaker(bind=engine)
+    try:
+        with session_factory() as db:
+            print(f"Preparando {args.tasks} tareas…")
+            owner_id = _seed(db, args.tasks)
+
+        modes = {
+            "fts": lambda q: lambda db: _search(db, owner_id, q, fuzzy=False),
+            "fuzzy": lambda q: lambda db: _search(db, owner_id, q, fuzzy=True),
+            "ilike": lambda q: lambda db: _ilike_full_scan(db, owner_id, q),
+        }
+        print(f"{'consulta':<20} {'tipo':<22} {'modo':>6} {'p50':>9} {'p95':>9} {'hits':>5}")
+        for query, kind in _QUERIES:
+            for mode, build in modes.items():
+                p50, p95, hits = _measure(session_factory, args.repeat, build(query))
+                print(f"{query:<20} {kind:<22} {mode:>6} {p50:>7.1f}ms {p95:>7.1f}ms {hits:>5}")
+
+        print(f"\n{'prefijo':<20} {'sugerencias':>11} {'p50':>9} {'p95':>9}")
+        for prefix in _PREFIXES:
+            p50, p95, hits = _measure(
+                session_factory,
+                args.repeat,
+                lambda db: len(_repository.suggest_titles(db, owner_id=owner_id, prefix=prefix, limit=10)),
+            )
+            print(f"{prefix:<20} {hits:>11} {p50:>7.1f}ms {p95:>7.1f}ms")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Fold live comments into the task search vector (weight D)
+
+Revision ID: a7d2e9f4c1b6
+Revises: f1c3a5e7b9d2
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d2e9f4c1b6"
+down_revision: Union[str, Sequence[str], None] = "f1c3a5e7b9d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: tasks.comments_vector kept by comment triggers and folded into search_vector."""
+    op.add_column("tasks", sa.Column("comments_vector", postgresql.TSVECTOR(), nullable=True))
+
+    # search_vector = título (A) || descripción (B) || comentarios vivos (D); las búsquedas sin
+    # comentarios restringen el tsquery a los pesos A y B y siguen usando el mismo índice GIN
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('pg_catalog.english', coalesce(NEW.title, '')), 'A')
+                || setweight(to_tsvector('pg_catalog.english', coalesce(NEW.description, '')), 'B')
+                || coalesce(NEW.comments_vector, ''::tsvector);
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS tsvectorupdate ON tasks;")
+    # Solo cambios de texto: mover una tarea ya no recalcula su vector
+    op.execute(
+        """
+        CREATE TRIGGER tsvectorupdate BEFORE INSERT OR UPDATE OF title, description, comments_vector
+        ON tasks FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update();
+        """
+    )
+
+    # Alta de comentario: se concatena su vector (coste independiente del número de comentarios).
+    # Edición, soft delete o borrado: se re-agregan solo los comentarios vivos de esa tarea.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION comments_vector_update() RETURNS trigger AS $$
+        DECLARE
+            affected integer[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                IF NEW.deleted_at IS NULL THEN
+                    UPDATE tasks
+                    SET comments_vector = coalesce(comments_vector, ''::tsvector)
+                        || setweight(to_tsvector('pg_catalog.english', NEW.text), 'D')
+                    WHERE id = NEW.task_id;
+                END IF;
+                RETURN NULL;
+            END IF;
+            IF TG_OP = 'UPDATE'
+                AND NEW.text IS NOT DISTINCT FROM OLD.text
+                AND NEW.deleted_at IS NOT DISTINCT FROM OLD.deleted_at
+                AND NEW.task_id = OLD.task_id THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP = 'DELETE' AND OLD.deleted_at IS NOT NULL THEN
+                RETURN NULL;
+            END IF;
+            affected := ARRAY[OLD.task_id];
+            IF TG_OP = 'UPDATE' AND NEW.task_id <> OLD.task_id THEN
+                affected := affected || NEW.task_id;
+            END IF;
+            UPDATE tasks AS t
+            SET comments_vector = (
+                SELECT setweight(to_tsvector('pg_catalog.english', string_agg(c.text, ' ')), 'D')
+                FROM comments AS c
+                WHERE c.task_id = t.id AND c.deleted_at IS NULL
+            )
+            WHERE t.id = ANY(affected);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER comments_vector_update AFTER INSERT OR DELETE OR UPDATE OF text, deleted_at, task_id
+        ON comments FOR EACH ROW EXECUTE FUNCTION comments_vector_update();
+        """
+    )
+
+    # Backfill de todas las filas (también las que no tienen comentarios): el trigger de tasks
+    # recalcula search_vector con los pesos, sin los que las búsquedas A/B no casarían
+    op.execute(
+        """
+        UPDATE tasks AS t
+        SET comments_vector = (
+            SELECT setweight(to_tsvector('pg_catalog.english', string_agg(c.text, ' ')), 'D')
+            FROM comments AS c
+            WHERE c.task_id = t.id AND c.deleted_at IS NULL
+        );
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema: back to tsvector_update_trigger over title and description."""
+    op.execute("DROP TRIGGER IF EXISTS comments_vector_update ON comments;")
+    op.execute("DROP FUNCTION IF EXISTS comments_vector_update();")
+    op.execute("DROP TRIGGER IF EXISTS tsvectorupdate ON tasks;")
+    op.execute("DROP FUNCTION IF EXISTS tasks_search_vector_update();")
+    op.drop_column("tasks", "comments_vector")
+    op.execute(
+        """
+        CREATE TRIGGER tsvectorupdate BEFORE INSERT OR UPDATE
+        ON tasks FOR EACH ROW EXECUTE PROCEDURE
+        tsvector_update_trigger(search_vector, 'pg_catalog.english', title, description);
+        """
+    )
+    op.execute(
+        """
+        UPDATE tasks
+        SET search_vector = to_tsvector('pg_catalog.english', coalesce(title, '') || ' ' || coalesce(description, ''));
+        """
+    )
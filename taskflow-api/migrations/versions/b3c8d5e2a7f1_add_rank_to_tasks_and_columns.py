@@ -0,0 +1,63 @@
+"""Add lexicographic rank to tasks and columns
+
+Revision ID: b3c8d5e2a7f1
+Revises: e6a3b1b1f4b1
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.core.ranking import spread_ranks
+
+# revision identifiers, used by Alembic.
+revision: str = "b3c8d5e2a7f1"
+down_revision: Union[str, Sequence[str], None] = "e6a3b1b1f4b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _backfill(table: str, scope: str) -> None:
+    # Ranks equiespaciados por contenedor respetando el orden actual (position, id)
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(f"SELECT id, {scope} FROM {table} ORDER BY {scope}, position, id")).all()
+    groups: dict[int, list[int]] = {}
+    for row_id, scope_id in rows:
+        groups.setdefault(scope_id, []).append(row_id)
+    params = [
+        {"id": row_id, "rank": rank} for ids in groups.values() for row_id, rank in zip(ids, spread_ranks(len(ids)))
+    ]
+    if params:
+        bind.execute(sa.text(f"UPDATE {table} SET rank = :rank WHERE id = :id"), params)
+
+
+def upgrade() -> None:
+    """Upgrade schema: rank columns, backfill and (scope, rank) indexes."""
+    rank_type = sa.String(length=64).with_variant(sa.String(length=64, collation="C"), "postgresql")
+    op.add_column("tasks", sa.Column("rank", rank_type, nullable=True))
+    op.add_column("columns", sa.Column("rank", rank_type, nullable=True))
+
+    _backfill("tasks", "column_id")
+    _backfill("columns", "board_id")
+
+    op.alter_column("tasks", "rank", nullable=False)
+    op.alter_column("columns", "rank", nullable=False)
+
+    # El índice compuesto sirve también las búsquedas por la primera columna
+    op.create_index("ix_tasks_column_id_rank", "tasks", ["column_id", "rank"], unique=False)
+    op.drop_index("ix_tasks_column_id", table_name="tasks")
+    op.create_index("ix_columns_board_id_rank", "columns", ["board_id", "rank"], unique=False)
+    op.drop_index("ix_columns_board_id", table_name="columns")
+
+
+def downgrade() -> None:
+    """Downgrade schema: drop rank columns and restore single-column indexes."""
+    op.create_index("ix_columns_board_id", "columns", ["board_id"], unique=False)
+    op.drop_index("ix_columns_board_id_rank", table_name="columns")
+    op.create_index("ix_tasks_column_id", "tasks", ["column_id"], unique=False)
+    op.drop_index("ix_tasks_column_id_rank", table_name="tasks")
+    op.drop_column("columns", "rank")
+    op.drop_column("tasks", "rank")
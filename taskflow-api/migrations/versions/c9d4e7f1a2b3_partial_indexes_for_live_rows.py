@@ -0,0 +1,106 @@
+"""Partial composite indexes for live (not soft-deleted) rows
+
+Revision ID: c9d4e7f1a2b3
+Revises: b3c8d5e2a7f1
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c9d4e7f1a2b3"
+down_revision: Union[str, Sequence[str], None] = "b3c8d5e2a7f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_LIVE = sa.text("deleted_at IS NULL")
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _search_vector_index_method() -> str | None:
+    """Método de acceso de ix_tasks_search_vector (None si no existe)."""
+    return (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT am.amname FROM pg_class c JOIN pg_am am ON am.oid = c.relam "
+                "WHERE c.relname = 'ix_tasks_search_vector' AND c.relkind = 'i'"
+            )
+        )
+        .scalar()
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema: partial (scope, order) indexes and GIN-only search_vector.
+
+    CREATE/DROP INDEX CONCURRENTLY no puede ir dentro de una transacción, por eso todo
+    se ejecuta en un bloque autocommit y sin bloquear escrituras sobre las tablas.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_live_column_id_rank",
+            "tasks",
+            ["column_id", "rank", "id"],
+            postgresql_where=_LIVE,
+            sqlite_where=_LIVE,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_boards_live_owner_id_id",
+            "boards",
+            ["owner_id", "id"],
+            postgresql_where=_LIVE,
+            sqlite_where=_LIVE,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_comments_live_task_id_created_at",
+            "comments",
+            ["task_id", "created_at"],
+            postgresql_where=_LIVE,
+            sqlite_where=_LIVE,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # La FK necesita un índice completo para ON DELETE CASCADE (incluye filas soft-deleted);
+        # column_id a secas es más pequeño que el antiguo (column_id, rank)
+        op.create_index("ix_tasks_column_id", "tasks", ["column_id"], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index("ix_tasks_column_id_rank", table_name="tasks", postgresql_concurrently=True, if_exists=True)
+
+        # Esquemas creados desde los modelos (index=True) tenían un btree sobre el tsvector:
+        # no sirve a @@ y falla al indexar documentos largos. Se sustituye por el GIN.
+        if _is_postgresql() and _search_vector_index_method() == "btree":
+            op.drop_index("ix_tasks_search_vector", table_name="tasks", postgresql_concurrently=True)
+        if _is_postgresql():
+            op.create_index(
+                "ix_tasks_search_vector",
+                "tasks",
+                ["search_vector"],
+                postgresql_using="gin",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema: restore the previous non-partial indexes."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_column_id_rank", "tasks", ["column_id", "rank"], postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index("ix_tasks_column_id", table_name="tasks", postgresql_concurrently=True, if_exists=True)
+        op.drop_index(
+            "ix_comments_live_task_id_created_at", table_name="comments", postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index("ix_boards_live_owner_id_id", table_name="boards", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_tasks_live_column_id_rank", table_name="tasks", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,93 @@
+"""Add archive tables for old soft-deleted rows
+
+Revision ID: d5a1f3c8e9b2
+Revises: c9d4e7f1a2b3
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a1f3c8e9b2"
+down_revision: Union[str, Sequence[str], None] = "c9d4e7f1a2b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _archived_at() -> sa.Column:
+    return sa.Column("archived_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema: *_archive tables (same columns as the source, no FKs)."""
+    rank_type = sa.String(length=64).with_variant(sa.String(length=64, collation="C"), "postgresql")
+    op.create_table(
+        "boards_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        _archived_at(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "columns_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("rank", rank_type, nullable=False),
+        sa.Column("board_id", sa.Integer(), nullable=False),
+        _archived_at(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_columns_archive_board_id", "columns_archive", ["board_id"], unique=False)
+    op.create_table(
+        "tasks_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column(
+            "priority",
+            postgresql.ENUM("LOW", "MEDIUM", "HIGH", "CRITICAL", name="taskpriority", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("rank", rank_type, nullable=False),
+        sa.Column("column_id", sa.Integer(), nullable=False),
+        sa.Column("assignee_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        _archived_at(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_tasks_archive_column_id", "tasks_archive", ["column_id"], unique=False)
+    op.create_table(
+        "comments_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("text", sa.String(length=1000), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        _archived_at(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_comments_archive_task_id", "comments_archive", ["task_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema: drop archive tables (archived rows are lost)."""
+    op.drop_index("ix_comments_archive_task_id", table_name="comments_archive")
+    op.drop_table("comments_archive")
+    op.drop_index("ix_tasks_archive_column_id", table_name="tasks_archive")
+    op.drop_table("tasks_archive")
+    op.drop_index("ix_columns_archive_board_id", table_name="columns_archive")
+    op.drop_table("columns_archive")
+    op.drop_table("boards_archive")
@@ -0,0 +1,86 @@
+"""Denormalize board_id/owner_id on tasks for single-table search
+
+Revision ID: e8b2c4d6f0a1
+Revises: d5a1f3c8e9b2
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b2c4d6f0a1"
+down_revision: Union[str, Sequence[str], None] = "d5a1f3c8e9b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: tasks.board_id/owner_id, backfill and GIN (owner_id, search_vector)."""
+    for table in ("tasks", "tasks_archive"):
+        op.add_column(table, sa.Column("board_id", sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column("owner_id", sa.Integer(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE tasks AS t
+        SET board_id = c.board_id, owner_id = b.owner_id
+        FROM columns AS c JOIN boards AS b ON b.id = c.board_id
+        WHERE c.id = t.column_id;
+        """
+    )
+    # Las tareas archivadas pueden colgar de columnas/tableros también archivados
+    op.execute(
+        """
+        UPDATE tasks_archive AS t
+        SET board_id = c.board_id, owner_id = b.owner_id
+        FROM (SELECT id, board_id FROM columns UNION ALL SELECT id, board_id FROM columns_archive) AS c
+        JOIN (SELECT id, owner_id FROM boards UNION ALL SELECT id, owner_id FROM boards_archive) AS b
+            ON b.id = c.board_id
+        WHERE c.id = t.column_id;
+        """
+    )
+    for table in ("tasks", "tasks_archive"):
+        op.alter_column(table, "board_id", nullable=False)
+        op.alter_column(table, "owner_id", nullable=False)
+    op.create_foreign_key("tasks_board_id_fkey", "tasks", "boards", ["board_id"], ["id"], ondelete="CASCADE")
+
+    with op.get_context().autocommit_block():
+        # btree_gin permite combinar owner_id (igualdad) con @@ en un único índice GIN
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+        op.create_index("ix_tasks_board_id", "tasks", ["board_id"], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(
+            "ix_tasks_live_owner_id_search_vector",
+            "tasks",
+            ["owner_id", "search_vector"],
+            postgresql_using="gin",
+            postgresql_where=sa.text("deleted_at IS NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Toda búsqueda filtra por dueño: el GIN compuesto sustituye al de search_vector
+        op.drop_index("ix_tasks_search_vector", table_name="tasks", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema: restore the plain GIN index and drop the denormalized columns."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_search_vector",
+            "tasks",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_tasks_live_owner_id_search_vector", table_name="tasks", postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index("ix_tasks_board_id", table_name="tasks", postgresql_concurrently=True, if_exists=True)
+    op.drop_constraint("tasks_board_id_fkey", "tasks", type_="foreignkey")
+    for table in ("tasks_archive", "tasks"):
+        op.drop_column(table, "owner_id")
+        op.drop_column(table, "board_id")
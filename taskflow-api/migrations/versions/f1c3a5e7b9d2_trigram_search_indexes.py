@@ -0,0 +1,47 @@
+"""Trigram (pg_trgm) GIN indexes on task title and description
+
+Revision ID: f1c3a5e7b9d2
+Revises: e8b2c4d6f0a1
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c3a5e7b9d2"
+down_revision: Union[str, Sequence[str], None] = "e8b2c4d6f0a1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = {
+    "ix_tasks_live_owner_id_title_trgm": "title",
+    "ix_tasks_live_owner_id_description_trgm": "description",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema: pg_trgm and partial GIN (owner_id, field gin_trgm_ops) indexes."""
+    with op.get_context().autocommit_block():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, column in _INDEXES.items():
+            op.create_index(
+                name,
+                "tasks",
+                ["owner_id", column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_where=sa.text("deleted_at IS NULL"),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema: drop the trigram indexes (the extension is left installed)."""
+    with op.get_context().autocommit_block():
+        for name in _INDEXES:
+            op.drop_index(name, table_name="tasks", postgresql_concurrently=True, if_exists=True)
@@ -1,5 +1,9 @@
+import os
+import tempfile
+
 import pytest
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -13,21 +17,26 @@ import app.models.user as _models_user  # noqa: F401
 from app.core.cache import init_cache
 from app.core.config import settings
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.main import app as fastapi_app
 
-# Configurar una BD SQLite en memoria compartida para pruebas
+# BD SQLite en un fichero temporal: la comparten el motor síncrono (servicios y
+# repositorios en tests) y el asíncrono (routers vía get_async_db)
+_test_db_path = os.path.join(tempfile.mkdtemp(prefix="taskflow-tests-"), "test.db")
 test_engine = create_engine(
-    "sqlite+pysqlite:///:memory:",
+    f"sqlite+pysqlite:///{_test_db_path}",
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
     future=True,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine, future=True)
+test_async_engine = create_async_engine(f"sqlite+aiosqlite:///{_test_db_path}", poolclass=StaticPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=test_async_engine, autoflush=False, expire_on_commit=False)
 
 
 # Habilitar claves foráneas y cascadas en SQLite
 @event.listens_for(test_engine, "connect")
+@event.listens_for(test_async_engine.sync_engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):  # noqa: D401
     # Activa el soporte de cascadas en SQLite
     cursor = dbapi_connection.cursor()
@@ -43,6 +52,11 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture(scope="session", autouse=True)
 def create_test_db():
     # Señalar entorno de pruebas para usar caché en memoria
@@ -52,10 +66,24 @@ def create_test_db():
     Base.metadata.create_all(bind=test_engine)
     # Override de la dependencia de BD
     fastapi_app.dependency_overrides[get_db] = override_get_db
+    fastapi_app.dependency_overrides[get_async_db] = override_get_async_db
     yield
     Base.metadata.drop_all(bind=test_engine)
 
 
+@pytest.fixture()
+def query_counter():
+    """Lista de sentencias SQL ejecutadas mientras el fixture está activo."""
+    statements: list[str] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", _before_cursor_execute)
+    yield statements
+    event.remove(test_engine, "before_cursor_execute", _before_cursor_execute)
+
+
 @pytest.fixture()
 def anyio_backend():
     return "asyncio"
@@ -59,3 +59,62 @@ async def test_login_wrong_password():
         resp_login = await ac.post("/api/v1/auth/login", data={"username": email, "password": "incorrect"})
     assert resp_login.status_code == 400
     assert "Credenciales inválidas" in resp_login.text
+
+
+@pytest.mark.anyio
+async def test_login_rehashes_password_with_current_bcrypt_cost(monkeypatch):
+    from sqlalchemy import select
+
+    from app.core.config import settings
+    from app.db.session import get_async_db
+    from app.models.user import User
+
+    transport = ASGITransport(app=fastapi_app)
+    payload = {"email": "rehash@example.com", "password": "secret123"}
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        assert (await ac.post("/api/v1/auth/register", json=payload)).status_code == 201
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+        resp = await ac.post("/api/v1/auth/login", data={"username": payload["email"], "password": "secret123"})
+    assert resp.status_code == 200, resp.text
+
+    gen = fastapi_app.dependency_overrides[get_async_db]()
+    db = await gen.__anext__()
+    try:
+        user = await db.scalar(select(User).where(User.email == payload["email"]))
+        assert user.password_hash.startswith("$2b$04$")
+    finally:
+        await gen.aclose()
+
+
+@pytest.mark.anyio
+async def test_password_hashing_queue_full_returns_503_and_exports_depth(monkeypatch):
+    import app.core.security as security
+    from app.core.config import settings
+
+    # Todos los procesos ocupados y la cola llena
+    monkeypatch.setattr(security, "_hash_pending", settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT)
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/auth/register", json={"email": "busy@example.com", "password": "secret123"})
+        metrics = (await ac.get("/metrics")).text
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert f"password_hash_queue_depth {float(settings.PASSWORD_HASH_QUEUE_LIMIT)}" in metrics
+
+
+@pytest.mark.anyio
+async def test_duplicate_registration_is_rejected_before_hashing(monkeypatch):
+    import app.core.security as security
+    from app.core.config import settings
+
+    transport = ASGITransport(app=fastapi_app)
+    payload = {"email": "dup-nohash@example.com", "password": "secret123"}
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        assert (await ac.post("/api/v1/auth/register", json=payload)).status_code == 201
+        # Con el pool saturado, un duplicado sigue siendo un 400: no llega a pedir un hash
+        monkeypatch.setattr(
+            security, "_hash_pending", settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT
+        )
+        resp = await ac.post("/api/v1/auth/register", json=payload)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Email ya registrado"
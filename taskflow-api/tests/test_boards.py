@@ -1,6 +1,7 @@
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from app.core.pagination import encode_cursor
 from app.main import app as fastapi_app
 
 
@@ -149,8 +150,15 @@ async def test_tasks_api_crud_and_permissions():
         # Búsqueda y caché
         resp_search = await ac.get("/api/v1/tasks/?q=T2", headers=headers_a)
         assert resp_search.status_code == 200
+        hits = {t["id"]: t for t in resp_search.json()["items"]}
+        assert "search_rank" in hits[task["id"]] and "search_snippet" in hits[task["id"]]
         resp_search_cached = await ac.get("/api/v1/tasks/?q=T2", headers=headers_a)
         assert resp_search_cached.status_code == 200
+        resp_facets = await ac.get("/api/v1/tasks/?q=T2&priority=HIGH&priority=LOW&facets=true", headers=headers_a)
+        assert resp_facets.status_code == 200
+        facets = resp_facets.json()["facets"]
+        assert {f["value"] for f in facets["priority"]} <= {"HIGH", "LOW"}
+        assert sum(f["count"] for f in facets["board_id"]) == resp_facets.json()["total"]
 
         # Usuario B no puede acceder
         token_b = await register_and_login(ac, "taskapib@example.com", "secret123")
@@ -163,3 +171,329 @@ async def test_tasks_api_crud_and_permissions():
 
         # Eliminar (A)
         assert (await ac.delete(f"/api/v1/tasks/{task['id']}", headers=headers_a)).status_code == 200
+
+
+@pytest.mark.anyio
+async def test_boards_list_cursor_pagination():
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        token = await register_and_login(ac, "cursoruser@example.com", "secret123")
+        headers = {"Authorization": f"Bearer {token}"}
+        ids = [
+            (await ac.post("/api/v1/boards/", json={"name": f"B{i}"}, headers=headers)).json()["id"] for i in range(3)
+        ]
+
+        first = (await ac.get("/api/v1/boards/?limit=2", headers=headers)).json()
+        assert [b["id"] for b in first["items"]] == ids[:2]
+        assert first["next_cursor"]
+
+        second = (await ac.get(f"/api/v1/boards/?limit=2&cursor={first['next_cursor']}", headers=headers)).json()
+        assert [b["id"] for b in second["items"]] == ids[2:]
+        assert second["next_cursor"] is None
+
+        # Cursor corrupto -> 400
+        resp_bad = await ac.get("/api/v1/boards/?cursor=no-es-un-cursor", headers=headers)
+        assert resp_bad.status_code == 400
+        # Bien formado pero con un id que no es entero -> 400, no un error de la base de datos
+        resp_bad = await ac.get(f"/api/v1/boards/?cursor={encode_cursor([{'id': 1}])}", headers=headers)
+        assert resp_bad.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_board_snapshot_returns_ordered_columns_and_tasks():
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        token = await register_and_login(ac, "snapshot@example.com", "secret123")
+        headers = {"Authorization": f"Bearer {token}"}
+        board = (await ac.post("/api/v1/boards/", json={"name": "Snap"}, headers=headers)).json()
+        col2 = (
+            await ac.post(
+                "/api/v1/columns/", json={"name": "C2", "position": 2, "board_id": board["id"]}, headers=headers
+            )
+        ).json()
+        col1 = (
+            await ac.post(
+                "/api/v1/columns/", json={"name": "C1", "position": 1, "board_id": board["id"]}, headers=headers
+            )
+        ).json()
+        for i in range(3):
+            await ac.post(
+                "/api/v1/tasks/",
+                json={"title": f"T{i}", "priority": "LOW", "column_id": col1["id"], "position": i},
+                headers=headers,
+            )
+        deleted = (
+            await ac.post(
+                "/api/v1/tasks/", json={"title": "X", "priority": "LOW", "column_id": col2["id"]}, headers=headers
+            )
+        ).json()
+        await ac.delete(f"/api/v1/tasks/{deleted['id']}", headers=headers)
+
+        resp = await ac.get(f"/api/v1/boards/{board['id']}/snapshot?tasks_per_column=2", headers=headers)
+        assert resp.status_code == 200, resp.text
+        snap = resp.json()
+        assert [c["id"] for c in snap["columns"]] == [col1["id"], col2["id"]]
+        assert [t["title"] for t in snap["columns"][0]["tasks"]] == ["T0", "T1"]
+        assert snap["columns"][0]["task_count"] == 3
+        assert snap["columns"][1]["tasks"] == [] and snap["columns"][1]["task_count"] == 0
+
+        # Otro usuario no ve el snapshot
+        token_b = await register_and_login(ac, "snapshotb@example.com", "secret123")
+        resp_b = await ac.get(f"/api/v1/boards/{board['id']}/snapshot", headers={"Authorization": f"Bearer {token_b}"})
+        assert resp_b.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_tasks_batch_create_update_delete():
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        token = await register_and_login(ac, "batch@example.com", "secret123")
+        headers = {"Authorization": f"Bearer {token}"}
+        board = (await ac.post("/api/v1/boards/", json={"name": "Batch"}, headers=headers)).json()
+        col = (
+            await ac.post(
+                "/api/v1/columns/", json={"name": "C", "position": 1, "board_id": board["id"]}, headers=headers
+            )
+        ).json()
+        other_token = await register_and_login(ac, "batchother@example.com", "secret123")
+        other_headers = {"Authorization": f"Bearer {other_token}"}
+        other_board = (await ac.post("/api/v1/boards/", json={"name": "O"}, headers=other_headers)).json()
+        other_col = (
+            await ac.post(
+                "/api/v1/columns/",
+                json={"name": "C", "position": 1, "board_id": other_board["id"]},
+                headers=other_headers,
+            )
+        ).json()
+
+        # Crear: el elemento sobre una columna ajena se rechaza sin afectar al resto
+        resp_create = await ac.post(
+            "/api/v1/tasks/batch",
+            json={
+                "items": [
+                    {"title": "A", "priority": "LOW", "column_id": col["id"]},
+                    {"title": "X", "priority": "LOW", "column_id": other_col["id"]},
+                    {"title": "B", "priority": "HIGH", "column_id": col["id"], "position": 5},
+                ]
+            },
+            headers=headers,
+        )
+        assert resp_create.status_code == 200, resp_create.text
+        created = resp_create.json()["items"]
+        assert [r["status"] for r in created] == ["created", "not_found", "created"]
+        assert [r["index"] for r in created] == [0, 1, 2]
+        assert created[0]["task"]["title"] == "A" and created[2]["task"]["priority"] == "HIGH"
+        task_ids = [created[0]["id"], created[2]["id"]]
+
+        # Actualizar
+        resp_update = await ac.patch(
+            "/api/v1/tasks/batch",
+            json={
+                "items": [
+                    {"id": task_ids[0], "title": "A2"},
+                    {"id": task_ids[1], "column_id": other_col["id"]},
+                    {"id": task_ids[1], "priority": "LOW"},
+                ]
+            },
+            headers=headers,
+        )
+        assert resp_update.status_code == 200, resp_update.text
+        updated = resp_update.json()["items"]
+        assert [r["status"] for r in updated] == ["updated", "not_found", "updated"]
+        assert updated[0]["task"]["title"] == "A2"
+        assert updated[2]["task"]["priority"] == "LOW" and updated[2]["task"]["column_id"] == col["id"]
+
+        # Otro usuario no puede borrar las tareas
+        resp_other = await ac.post("/api/v1/tasks/batch/delete", json={"ids": task_ids}, headers=other_headers)
+        assert [r["status"] for r in resp_other.json()["items"]] == ["not_found", "not_found"]
+
+        # Borrar
+        resp_delete = await ac.post("/api/v1/tasks/batch/delete", json={"ids": task_ids + [999999]}, headers=headers)
+        assert resp_delete.status_code == 200, resp_delete.text
+        assert [r["status"] for r in resp_delete.json()["items"]] == ["deleted", "deleted", "not_found"]
+        assert (await ac.get(f"/api/v1/tasks/{task_ids[0]}", headers=headers)).status_code == 404
+
+        # Lote vacío -> 422
+        assert (await ac.post("/api/v1/tasks/batch", json={"items": []}, headers=headers)).status_code == 422
+
+
+@pytest.mark.anyio
+async def test_move_task_between_neighbours():
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        token = await register_and_login(ac, "move@example.com", "secret123")
+        headers = {"Authorization": f"Bearer {token}"}
+        board = (await ac.post("/api/v1/boards/", json={"name": "Move"}, headers=headers)).json()
+        col1 = (
+            await ac.post(
+                "/api/v1/columns/", json={"name": "C1", "position": 1, "board_id": board["id"]}, headers=headers
+            )
+        ).json()
+        col2 = (
+            await ac.post(
+                "/api/v1/columns/", json={"name": "C2", "position": 2, "board_id": board["id"]}, headers=headers
+            )
+        ).json()
+        # Sin posición las tareas se añaden al final
+        tasks = [
+            (
+                await ac.post(
+                    "/api/v1/tasks/",
+                    json={"title": f"T{i}", "priority": "LOW", "column_id": col1["id"]},
+                    headers=headers,
+                )
+            ).json()
+            for i in range(3)
+        ]
+
+        async def titles(column_id):
+            resp = await ac.get(f"/api/v1/columns/{column_id}/tasks", headers=headers)
+            return [t["title"] for t in resp.json()["items"]]
+
+        assert await titles(col1["id"]) == ["T0", "T1", "T2"]
+
+        # T2 entre T0 y T1
+        resp = await ac.post(
+            f"/api/v1/tasks/{tasks[2]['id']}/move",
+            json={"after_id": tasks[0]["id"], "before_id": tasks[1]["id"]},
+            headers=headers,
+        )
+        assert resp.status_code == 200, resp.text
+        assert tasks[0]["rank"] < resp.json()["rank"] < tasks[1]["rank"]
+        assert await titles(col1["id"]) == ["T0", "T2", "T1"]
+
+        # T0 justo antes de T1 (el vecino superior se deduce)
+        await ac.post(f"/api/v1/tasks/{tasks[0]['id']}/move", json={"before_id": tasks[1]["id"]}, headers=headers)
+        assert await titles(col1["id"]) == ["T2", "T0", "T1"]
+
+        # A otra columna, al final
+        resp = await ac.post(f"/api/v1/tasks/{tasks[1]['id']}/move", json={"column_id": col2["id"]}, headers=headers)
+        assert resp.json()["column_id"] == col2["id"]
+        assert await titles(col2["id"]) == ["T1"]
+
+        # Vecino de otra columna -> 404
+        resp = await ac.post(
+            f"/api/v1/tasks/{tasks[0]['id']}/move", json={"after_id": tasks[1]["id"]}, headers=headers
+        )
+        assert resp.status_code == 404
+
+        # Columnas: C2 antes de C1
+        resp = await ac.post(f"/api/v1/columns/{col2['id']}/move", json={"before_id": col1["id"]}, headers=headers)
+        assert resp.status_code == 200, resp.text
+        cols = (await ac.get(f"/api/v1/boards/{board['id']}/columns", headers=headers)).json()["items"]
+        assert [c["id"] for c in cols] == [col2["id"], col1["id"]]
+
+
+@pytest.mark.anyio
+async def test_cached_lists_are_invalidated_by_async_writes():
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        token = await register_and_login(ac, "asyncinval@example.com", "secret123")
+        headers = {"Authorization": f"Bearer {token}"}
+        assert (await ac.get("/api/v1/boards/", headers=headers)).json()["items"] == []
+
+        # La invalidación se ejecuta dentro de AsyncSession.run_sync y debe esperar al borrado
+        board = (await ac.post("/api/v1/boards/", json={"name": "Nuevo"}, headers=headers)).json()
+        listed = (await ac.get("/api/v1/boards/", headers=headers)).json()["items"]
+        assert [b["id"] for b in listed] == [board["id"]]
+
+
+@pytest.mark.anyio
+async def test_cache_invalidation_is_scoped_to_user_and_board():
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        headers_a = {"Authorization": f"Bearer {await register_and_login(ac, 'scopea@example.com', 'secret123')}"}
+        headers_b = {"Authorization": f"Bearer {await register_and_login(ac, 'scopeb@example.com', 'secret123')}"}
+        board1, board2 = [
+            (await ac.post("/api/v1/boards/", json={"name": name}, headers=headers_a)).json() for name in ("B1", "B2")
+        ]
+        column2 = (
+            await ac.post(
+                "/api/v1/columns/", json={"name": "C", "position": 1, "board_id": board2["id"]}, headers=headers_a
+            )
+        ).json()
+
+        async def cache_status(url: str, headers: dict) -> str:
+            return (await ac.get(url, headers=headers)).headers["X-FastAPI-Cache"]
+
+        snapshot1, snapshot2 = (f"/api/v1/boards/{b['id']}/snapshot" for b in (board1, board2))
+        for url, headers in ((snapshot1, headers_a), (snapshot2, headers_a), ("/api/v1/boards/", headers_b)):
+            assert await cache_status(url, headers) == "MISS"
+            assert await cache_status(url, headers) == "HIT"
+
+        # Una tarea en B2 solo invalida el snapshot de B2; el listado de B no se toca
+        task = {"title": "T", "priority": "MEDIUM", "column_id": column2["id"]}
+        assert (await ac.post("/api/v1/tasks/", json=task, headers=headers_a)).status_code == 201
+        assert await cache_status(snapshot2, headers_a) == "MISS"
+        assert await cache_status(snapshot1, headers_a) == "HIT"
+        assert await cache_status("/api/v1/boards/", headers_b) == "HIT"
+
+        # Un tablero nuevo de A invalida su listado, no el de B
+        assert await cache_status("/api/v1/boards/", headers_a) == "MISS"
+        await ac.post("/api/v1/boards/", json={"name": "B3"}, headers=headers_a)
+        assert await cache_status("/api/v1/boards/", headers_a) == "MISS"
+        assert await cache_status("/api/v1/boards/", headers_b) == "HIT"
+
+
+@pytest.mark.anyio
+async def test_reads_go_to_replica_outside_read_your_writes_window(monkeypatch, tmp_path):
+    from fastapi_cache import FastAPICache
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    import app.db.routing as routing
+    from app.db.base import Base
+
+    # Réplica "retrasada": mismo esquema, sin datos replicados todavía
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(routing, "ReplicaSessionLocals", [async_sessionmaker(bind=replica_engine)])
+
+    try:
+        transport = ASGITransport(app=fastapi_app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            token = await register_and_login(ac, "replica@example.com", "secret123")
+            headers = {"Authorization": f"Bearer {token}"}
+            board = (await ac.post("/api/v1/boards/", json={"name": "Recién creado"}, headers=headers)).json()
+
+            # Dentro de la ventana read-your-writes la lectura va al primario
+            assert (await ac.get(f"/api/v1/boards/{board['id']}", headers=headers)).status_code == 200
+
+            # Al expirar la ventana se lee de la réplica, que aún no tiene el tablero
+            await FastAPICache.get_backend().clear(key=routing._pin_key(board["owner_id"]))
+            assert (await ac.get(f"/api/v1/boards/{board['id']}", headers=headers)).status_code == 404
+    finally:
+        await replica_engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_task_title_suggestions_per_user():
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        headers_a = {"Authorization": f"Bearer {await register_and_login(ac, 'suggesta@example.com', 'secret123')}"}
+        headers_b = {"Authorization": f"Bearer {await register_and_login(ac, 'suggestb@example.com', 'secret123')}"}
+        board = (await ac.post("/api/v1/boards/", json={"name": "Sugerencias"}, headers=headers_a)).json()
+        column = (
+            await ac.post(
+                "/api/v1/columns/", json={"name": "C", "position": 1, "board_id": board["id"]}, headers=headers_a
+            )
+        ).json()
+        for title in ("Planificar lanzamiento", "Plantilla de informe", "Revisar plan"):
+            resp = await ac.post(
+                "/api/v1/tasks/",
+                json={"title": title, "priority": "LOW", "column_id": column["id"], "description": "planta"},
+                headers=headers_a,
+            )
+            assert resp.status_code == 201, resp.text
+
+        # Prefijo de cualquier palabra del título, nunca de la descripción
+        resp = await ac.get("/api/v1/tasks/suggest?prefix=plan&limit=5", headers=headers_a)
+        assert resp.status_code == 200
+        assert {s["title"] for s in resp.json()} == {"Planificar lanzamiento", "Plantilla de informe", "Revisar plan"}
+        resp = await ac.get("/api/v1/tasks/suggest?prefix=lanz", headers=headers_a)
+        assert [s["title"] for s in resp.json()] == ["Planificar lanzamiento"]
+        resp = await ac.get("/api/v1/tasks/suggest?prefix=plan&limit=1", headers=headers_a)
+        assert len(resp.json()) == 1
+
+        # Otro usuario no ve las tareas (ni la caché) de A
+        assert (await ac.get("/api/v1/tasks/suggest?prefix=plan&limit=5", headers=headers_b)).json() == []
@@ -0,0 +1,366 @@
+import asyncio
+import math
+import time
+
+import pytest
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from httpx import ASGITransport, AsyncClient
+
+from app.core.cache import _RELEASE_LOCK, TieredBackend
+from app.core.config import settings
+from app.main import app as fastapi_app
+
+
+@pytest.fixture()
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeRedis:
+    """Lo justo de redis.asyncio para el backend: cadenas con caducidad, SET NX PX, pipelines
+    ttl+get y el EVAL de liberación del lock (compare-and-delete)."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, tuple[bytes, float | None]] = {}
+
+    def _entry(self, key: str):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entry(key)
+        return entry[0] if entry else None
+
+    async def ttl(self, key: str) -> int:
+        entry = self._entry(key)
+        if entry is None:
+            return -2
+        return -1 if entry[1] is None else math.ceil(entry[1] - time.monotonic())
+
+    async def set(
+        self, key: str, value, ex: int | None = None, px: int | None = None, nx: bool = False
+    ) -> bool | None:
+        if nx and self._entry(key) is not None:
+            return None
+        ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+        value = value.encode() if isinstance(value, str) else value
+        self.data[key] = (value, None if ttl is None else time.monotonic() + ttl)
+        return True
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        assert script == _RELEASE_LOCK
+        if await self.get(key) == token.encode():
+            del self.data[key]
+            return 1
+        return 0
+
+    async def publish(self, channel: str, message: str) -> int:
+        return 0
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.calls: list = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    def ttl(self, key: str) -> "FakePipeline":
+        self.calls.append(self.redis.ttl(key))
+        return self
+
+    def get(self, key: str) -> "FakePipeline":
+        self.calls.append(self.redis.get(key))
+        return self
+
+    async def execute(self) -> list:
+        return [await call for call in self.calls]
+
+
+def _lock_key(key: str) -> str:
+    return f"{FastAPICache.get_prefix()}lock:{key}"
+
+
+def _tiered(**kwargs) -> TieredBackend:
+    options = {"max_bytes": 1024, "max_ttl": 60, "channel": "test"} | kwargs
+    return TieredBackend(InMemoryBackend(), **options)
+
+
+@pytest.mark.anyio
+async def test_tiered_backend_serves_repeated_reads_from_l1():
+    backend = _tiered()
+    await backend.l2.set("l1:a", b"A", expire=30)
+
+    assert await backend.get_with_ttl("l1:a") == (30, b"A")
+    ttl, value = await backend.get_with_ttl("l1:a")
+    assert value == b"A" and 0 < ttl <= 30
+    assert await backend.get_many(["l1:a", "l1:missing"]) == [b"A", None]
+    assert backend.lookups == {"l1": 4, "l2": 2}
+    assert backend.hits == {"l1": 2, "l2": 1}
+    assert backend.hit_ratio("l1") == 0.5
+
+    # Sin pub/sub (L2 en memoria) las escrituras y borrados propios actualizan L1
+    await backend.set("l1:a", b"B", expire=30)
+    assert await backend.get("l1:a") == b"B"
+    await backend.clear(key="l1:a")
+    assert await backend.get("l1:a") is None
+
+
+@pytest.mark.anyio
+async def test_tiered_backend_l1_is_bounded_by_bytes_and_lru():
+    backend = _tiered(max_bytes=3 * (len("lru:0") + 10))
+    for i in range(3):
+        await backend.set(f"lru:{i}", b"x" * 10, expire=30)
+    await backend.get("lru:0")  # lru:1 pasa a ser la menos usada
+    await backend.set("lru:3", b"x" * 10, expire=30)
+    assert backend.l1.size <= backend.l1.max_bytes
+    assert backend.l1.get("lru:1") is None
+    assert all(backend.l1.get(f"lru:{i}") is not None for i in (0, 2, 3))
+
+
+@pytest.mark.anyio
+async def test_tiered_backend_applies_invalidations_from_other_workers():
+    backend, other = _tiered(), _tiered()
+    await backend.set("inv:gen", b"1", expire=30)
+    await backend.set("inv:ns/a", b"a", expire=30)
+
+    # Otro worker cambia la generación en L2 y publica el aviso
+    await other.set("inv:gen", b"2", expire=30)
+    assert await backend.get("inv:gen") == b"1"
+    backend.handle_message(f"{other._origin} k inv:gen".encode())
+    backend.handle_message(f"{other._origin} n inv:ns")
+    assert await backend.get("inv:gen") == b"2"
+    assert backend.l1.get("inv:ns/a") is None
+
+    # Los avisos propios se ignoran
+    backend.handle_message(f"{backend._origin} k inv:gen")
+    assert backend.l1.get("inv:gen") is not None
+
+
+@pytest.mark.anyio
+async def test_metrics_expose_cache_hit_ratio_per_tier():
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        body = (await ac.get("/metrics")).text
+    assert 'cache_hit_ratio{tier="l1"}' in body
+    assert 'cache_hit_ratio{tier="l2"}' in body
+    assert "cache_l1_bytes" in body
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_are_coalesced_into_one_computation():
+    backend = _tiered()
+    computations = []
+
+    async def cached_endpoint():
+        ttl, value = await backend.get_with_ttl("sf:key")
+        if value is None:
+            computations.append(1)
+            await asyncio.sleep(0.05)
+            value = b"computed"
+            await backend.set("sf:key", value, expire=30)
+        return value
+
+    results = await asyncio.gather(*(asyncio.ensure_future(cached_endpoint()) for _ in range(5)))
+    assert results == [b"computed"] * 5
+    assert len(computations) == 1
+    assert backend._flights == {}
+
+
+@pytest.mark.anyio
+async def test_single_flight_releases_waiters_when_the_computation_fails():
+    backend = _tiered()
+    attempts = []
+
+    async def cached_endpoint():
+        ttl, value = await backend.get_with_ttl("sf:fail")
+        if value is None:
+            attempts.append(1)
+            await asyncio.sleep(0.05)
+            if len(attempts) == 1:
+                raise RuntimeError("BD caída")
+            value = b"ok"
+            await backend.set("sf:fail", value, expire=30)
+        return value
+
+    results = await asyncio.gather(
+        *(asyncio.ensure_future(cached_endpoint()) for _ in range(4)), return_exceptions=True
+    )
+    # Falla solo el líder; de los que esperaban, uno recalcula y el resto recibe su valor
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == [b"ok"] * 3
+    assert len(attempts) == 2
+    assert backend._flights == {}
+
+
+async def _board_with_cached_snapshot(ac: AsyncClient, email: str) -> tuple[str, dict]:
+    await ac.post("/api/v1/auth/register", json={"email": email, "password": "secret123"})
+    login = await ac.post("/api/v1/auth/login", data={"username": email, "password": "secret123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    board = (await ac.post("/api/v1/boards/", json={"name": "Antes"}, headers=headers)).json()
+    url = f"/api/v1/boards/{board['id']}/snapshot"
+    assert (await ac.get(url, headers=headers)).headers["X-FastAPI-Cache"] == "MISS"
+    return url, headers
+
+
+async def _rename_board_without_invalidating(url: str) -> None:
+    from sqlalchemy import text
+
+    from app.db.session import get_async_db
+
+    gen = fastapi_app.dependency_overrides[get_async_db]()
+    db = await gen.__anext__()
+    try:
+        await db.execute(text("UPDATE boards SET name = 'Después' WHERE id = :id"), {"id": int(url.split("/")[-2])})
+        await db.commit()
+    finally:
+        await gen.aclose()
+
+
+@pytest.mark.anyio
+async def test_stale_entries_are_served_while_one_background_refresh_recomputes_them(monkeypatch):
+    import app.api.dependencies as dependencies
+    from app.db.routing import replica_sessionmaker
+
+    backend = FastAPICache.get_backend()
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        url, headers = await _board_with_cached_snapshot(ac, "swr@example.com")
+        await _rename_board_without_invalidating(url)
+
+        read_sessions = []
+
+        async def recording_replica_sessionmaker(user_id):
+            read_sessions.append(user_id)
+            return await replica_sessionmaker(user_id)
+
+        refreshes = []
+        refresh = backend._refresh
+
+        async def recording_refresh(key, *args):
+            refreshes.append(key)
+            await refresh(key, *args)
+
+        monkeypatch.setattr(dependencies, "replica_sessionmaker", recording_replica_sessionmaker)
+        monkeypatch.setattr(backend, "_refresh", recording_refresh)
+        # Una gracia mayor que lo que queda de vida a la entrada la deja caducada pero servible
+        monkeypatch.setitem(settings.CACHE_STALE_SECONDS, "boards:snapshot", 1000)
+        responses = await asyncio.gather(*(ac.get(url, headers=headers) for _ in range(3)))
+        assert all(r.headers["X-FastAPI-Cache"] == "HIT" for r in responses)
+        assert all(r.json()["name"] == "Antes" for r in responses)
+        assert responses[0].headers["Cache-Control"] == "max-age=0"
+        await asyncio.gather(*backend._refreshes.values())
+        assert len(refreshes) == 1
+        # El recálculo reutiliza las dependencias que resolvió la ruta al guardar la entrada: solo
+        # las tres peticiones pasan por el enrutado a réplicas
+        assert len(read_sessions) == 3
+
+        fresh = await ac.get(url, headers=headers)
+        assert fresh.headers["X-FastAPI-Cache"] == "HIT"
+        assert fresh.json()["name"] == "Después"
+        assert 0 < int(fresh.headers["Cache-Control"].removeprefix("max-age=")) <= 60
+        assert backend._refreshes == {}
+
+
+@pytest.mark.anyio
+async def test_hot_keys_are_refreshed_ahead_of_expiry(monkeypatch):
+    backend = FastAPICache.get_backend()
+    monkeypatch.setattr(settings, "CACHE_REFRESH_AHEAD_MIN_HITS", 3)
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        url, headers = await _board_with_cached_snapshot(ac, "ahead@example.com")
+        await _rename_board_without_invalidating(url)
+
+        # Todo el TTL cuenta como tramo final: se refresca al llegar al mínimo de aciertos
+        monkeypatch.setitem(settings.CACHE_REFRESH_AHEAD, "boards:snapshot", 1.0)
+        for _ in range(2):
+            assert (await ac.get(url, headers=headers)).json()["name"] == "Antes"
+            assert backend._refreshes == {}
+        assert (await ac.get(url, headers=headers)).json()["name"] == "Antes"
+        await asyncio.gather(*backend._refreshes.values())
+        assert (await ac.get(url, headers=headers)).json()["name"] == "Después"
+
+
+def _on_redis(redis: FakeRedis) -> TieredBackend:
+    return TieredBackend(RedisBackend(redis), max_bytes=1024, max_ttl=60, channel="test")
+
+
+@pytest.mark.anyio
+async def test_single_flight_leader_holds_the_redis_lock_until_it_stores_the_value():
+    redis = FakeRedis()
+    backend = _on_redis(redis)
+
+    async def leader():
+        assert await backend.get_with_ttl("sfr:lock") == (0, None)
+        token = backend._locks["sfr:lock"]
+        assert await redis.get(_lock_key("sfr:lock")) == token.encode()
+        assert 0 < await redis.ttl(_lock_key("sfr:lock")) <= settings.CACHE_LOCK_SECONDS
+        await backend.set("sfr:lock", b"v", expire=30)
+
+    await asyncio.ensure_future(leader())
+    await asyncio.sleep(0)
+    assert await redis.get(_lock_key("sfr:lock")) is None
+    assert backend._locks == {}
+
+    # El compare-and-delete no borra un lock que ya es de otro worker
+    await redis.set(_lock_key("sfr:other"), "ajeno", px=5000)
+    await backend._release_lock("sfr:other", "mio")
+    assert await redis.get(_lock_key("sfr:other")) == b"ajeno"
+
+
+@pytest.mark.anyio
+async def test_single_flight_waiter_in_another_worker_gets_the_leaders_value():
+    redis = FakeRedis()
+    worker_a, worker_b = _on_redis(redis), _on_redis(redis)
+    computations = []
+
+    async def cached_endpoint(backend):
+        ttl, value = await backend.get_with_ttl("sfr:shared")
+        if value is None:
+            computations.append(backend)
+            await asyncio.sleep(0.15)
+            value = b"computed"
+            await backend.set("sfr:shared", value, expire=30)
+        return value
+
+    leader = asyncio.ensure_future(cached_endpoint(worker_a))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.ensure_future(cached_endpoint(worker_b))
+    assert await asyncio.gather(leader, waiter) == [b"computed", b"computed"]
+    assert computations == [worker_a]
+    assert worker_b._locks == {} and worker_b._flights == {}
+
+
+@pytest.mark.anyio
+async def test_single_flight_waiter_takes_over_when_the_leaders_lock_expires(monkeypatch):
+    redis = FakeRedis()
+    backend = _on_redis(redis)
+    # Un worker tomó el lock y murió sin calcular el valor
+    await redis.set(_lock_key("sfr:orphan"), "muerto", px=200)
+
+    async def waiter():
+        start = time.monotonic()
+        result = await backend.get_with_ttl("sfr:orphan")
+        token = backend._locks.get("sfr:orphan")
+        return result, time.monotonic() - start, token, await redis.get(_lock_key("sfr:orphan"))
+
+    (ttl, value), waited, token, lock = await asyncio.ensure_future(waiter())
+    # Pasa a ser el líder al caducar el lock, sin agotar CACHE_LOCK_SECONDS
+    assert value is None and ttl == 0
+    assert 0.15 <= waited < settings.CACHE_LOCK_SECONDS
+    assert token is not None and lock == token.encode()
+    # Su petición terminó sin `set`: el lock se libera para el siguiente
+    await asyncio.sleep(0.01)
+    assert await redis.get(_lock_key("sfr:orphan")) is None
@@ -141,3 +141,56 @@ async def test_columns_crud_and_permissions():
         assert resp_cols.status_code == 200
         resp_cols_cached = await ac.get(f"/api/v1/boards/{board['id']}/columns", headers=headers_a)
         assert resp_cols_cached.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_positional_updates_keep_order_after_a_rebalance():
+    from app.db.session import get_db
+    from app.models.column import Column
+    from app.models.task import Task
+    from app.repositories.column_repository import ColumnRepository
+    from app.repositories.task_repository import TaskRepository
+
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        headers = {"Authorization": f"Bearer {await register_and_login(ac, 'rebalpos@example.com', 'secret123')}"}
+        board = (await ac.post("/api/v1/boards/", json={"name": "B"}, headers=headers)).json()
+        columns = [
+            (
+                await ac.post(
+                    "/api/v1/columns/", json={"name": name, "position": i, "board_id": board["id"]}, headers=headers
+                )
+            ).json()
+            for i, name in enumerate("ABC")
+        ]
+        tasks = [
+            (
+                await ac.post(
+                    "/api/v1/tasks/",
+                    json={"title": f"T{i}", "priority": "LOW", "column_id": columns[0]["id"], "position": i},
+                    headers=headers,
+                )
+            ).json()
+            for i in range(3)
+        ]
+
+        # Ranks equiespaciados, como tras la migración o un rebalanceo
+        gen = fastapi_app.dependency_overrides[get_db]()
+        db = next(gen)
+        try:
+            ColumnRepository().rebalance_ranks(db, scope=Column.board_id == board["id"])
+            TaskRepository().rebalance_ranks(db, scope=Task.column_id == columns[0]["id"])
+        finally:
+            gen.close()
+
+        # Como con ORDER BY position: C pasa delante de B, T2 delante de T1
+        await ac.patch(f"/api/v1/columns/{columns[2]['id']}", json={"position": 0}, headers=headers)
+        await ac.patch(f"/api/v1/tasks/{tasks[2]['id']}", json={"position": 0}, headers=headers)
+        # La interfaz crea columnas con position = número de columnas: van al final
+        await ac.post("/api/v1/columns/", json={"name": "D", "position": 3, "board_id": board["id"]}, headers=headers)
+        await ac.post("/api/v1/columns/", json={"name": "E", "board_id": board["id"]}, headers=headers)
+
+        listed = (await ac.get(f"/api/v1/boards/{board['id']}/columns", headers=headers)).json()
+        assert [c["name"] for c in listed["items"]] == ["A", "C", "B", "D", "E"]
+        listed = (await ac.get(f"/api/v1/columns/{columns[0]['id']}/tasks", headers=headers)).json()
+        assert [t["title"] for t in listed["items"]] == ["T0", "T2", "T1"]
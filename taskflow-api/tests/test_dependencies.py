@@ -4,9 +4,9 @@ import pytest
 from fastapi import HTTPException
 from httpx import ASGITransport, AsyncClient
 
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, get_current_user_async
 from app.core.security import create_access_token
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.main import app as fastapi_app
 
 
@@ -57,3 +57,86 @@ def test_get_current_user_expired_token_raises_401():
     finally:
         gen.close()
     assert exc.value.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_get_current_user_async_resolves_user_and_rejects_bad_token():
+    transport = ASGITransport(app=fastapi_app)
+    email = "asyncdepuser@example.com"
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post("/api/v1/auth/register", json={"email": email, "password": "secret123"})
+        assert resp.status_code == 201
+    token = create_access_token({"sub": email})
+    gen = fastapi_app.dependency_overrides[get_async_db]()
+    db = await gen.__anext__()
+    try:
+        user = await get_current_user_async(token=token, db=db)
+        assert user.email == email
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user_async(token="invalid.token.value", db=db)
+        assert exc.value.status_code == 401
+    finally:
+        await gen.aclose()
+
+
+@pytest.mark.anyio
+async def test_principal_cache_saves_the_users_query_and_is_invalidated_on_change(monkeypatch):
+    from sqlalchemy import event, select
+
+    from app.core.config import settings
+    from app.models.user import Role, User
+    from tests.conftest import test_async_engine
+
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    transport = ASGITransport(app=fastapi_app)
+    email = "principal@example.com"
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        assert (await ac.post("/api/v1/auth/register", json={"email": email, "password": "secret123"})).status_code
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+        board = (await ac.post("/api/v1/boards/", json={"name": "P"}, headers=headers)).json()
+
+        async def queries_per_request() -> list[str]:
+            statements.clear()
+            assert (await ac.get(f"/api/v1/boards/{board['id']}", headers=headers)).status_code == 200
+            return list(statements)
+
+        event.listen(test_async_engine.sync_engine, "before_cursor_execute", _count)
+        try:
+            warm = await queries_per_request()
+            monkeypatch.setattr(settings, "PRINCIPAL_CACHE_SECONDS", 0)
+            uncached = await queries_per_request()
+            monkeypatch.undo()
+        finally:
+            event.remove(test_async_engine.sync_engine, "before_cursor_execute", _count)
+        # La caché ahorra exactamente la consulta a users de cada petición autenticada
+        assert not any("FROM users" in s for s in warm)
+        assert len(uncached) - len(warm) == 1
+
+    # Un cambio del usuario confirmado descarta su principal cacheado
+    gen = fastapi_app.dependency_overrides[get_async_db]()
+    db = await gen.__anext__()
+    try:
+        user = await db.scalar(select(User).where(User.email == email))
+        user.role = Role.ADMIN
+        await db.commit()
+        assert (await get_current_user_async(token=headers["Authorization"][7:], db=db)).role == Role.ADMIN
+    finally:
+        await gen.aclose()
+
+
+@pytest.mark.anyio
+async def test_token_with_uid_and_role_resolves_user_without_io():
+    from unittest.mock import MagicMock
+
+    from app.models.user import Role
+
+    token = create_access_token({"sub": "claims@example.com", "uid": 42, "role": "ADMIN"})
+    # Ni consultas ni caché: la sesión no se toca
+    db = MagicMock()
+    user = await get_current_user_async(token=token, db=db)
+    assert (user.id, user.email, user.role) == (42, "claims@example.com", Role.ADMIN)
+    db.scalars.assert_not_called()
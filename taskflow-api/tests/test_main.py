@@ -1,6 +1,8 @@
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine
 
+from app.core.instrumentation import InstrumentedQueuePool, instrument_engine
 from app.main import app as fastapi_app
 
 
@@ -30,3 +32,30 @@ async def test_metrics_endpoint_exposes_prometheus_metrics():
     assert "# HELP" in body
     # Debe contener algún métrico HTTP instrumentado
     assert "http" in body
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_exposes_db_pool_metrics(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="pooltest",
+        pool_size=1,
+        max_overflow=1,
+    )
+    instrument_engine(engine, "pooltest")
+    first, second = engine.connect(), engine.connect()
+    try:
+        transport = ASGITransport(app=fastapi_app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            body = (await ac.get("/metrics")).text
+    finally:
+        first.close()
+        second.close()
+        engine.dispose()
+    assert 'db_pool_connections_in_use{engine="pooltest"} 2.0' in body
+    assert 'db_pool_overflow{engine="pooltest"} 1.0' in body
+    assert 'db_pool_size{engine="pooltest"} 1.0' in body
+    assert 'db_pool_checkout_wait_seconds_count{engine="pooltest"} 2.0' in body
+    # Los motores de la aplicación también publican sus gauges
+    assert 'db_pool_size{engine="async"}' in body
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from app.core.ranking import (
+    RANK_MAX_LENGTH,
+    needs_rebalance,
+    rank_between,
+    rank_for_position,
+    spread_ranks,
+)
+
+
+def test_rank_for_position_keeps_integer_order():
+    ranks = [rank_for_position(p) for p in (0, 1, 2, 10, 61, 62, 1000)]
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == len(ranks)
+
+
+def test_rank_between_random_inserts_stay_ordered_and_short():
+    rng = random.Random(42)
+    ranks = [rank_between(None, None)]
+    for _ in range(1000):
+        i = rng.randrange(len(ranks) + 1)
+        before = ranks[i - 1] if i > 0 else None
+        after = ranks[i] if i < len(ranks) else None
+        rank = rank_between(before, after)
+        assert (before is None or before < rank) and (after is None or rank < after)
+        assert not rank.endswith("0")
+        ranks.insert(i, rank)
+    assert max(len(r) for r in ranks) <= RANK_MAX_LENGTH
+
+
+def test_rank_between_same_gap_grows_until_rebalance():
+    low, high = rank_for_position(1), rank_for_position(2)
+    rank = high
+    for _ in range(100):
+        rank = rank_between(low, rank)
+    assert low < rank < high
+    assert needs_rebalance(rank)
+    assert not any(needs_rebalance(r) for r in spread_ranks(100))
+    assert spread_ranks(100) == sorted(spread_ranks(100))
+
+
+def test_rank_between_rejects_unordered_bounds():
+    with pytest.raises(ValueError):
+        rank_between(rank_for_position(2), rank_for_position(1))
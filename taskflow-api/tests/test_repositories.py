@@ -1,9 +1,15 @@
+import pytest
+from sqlalchemy import event
+
+from app.core.pagination import InvalidCursorError, TotalMode, decode_cursor, encode_cursor, next_cursor
 from app.db.session import get_db
 from app.main import app as fastapi_app
-from app.models.task import TaskPriority
+from app.models.task import Task, TaskPriority
 from app.models.user import Role
+from app.repositories.base_repository import BaseRepository
 from app.repositories.board_repository import BoardRepository
 from app.repositories.column_repository import ColumnRepository
+from app.repositories.comment_repository import CommentRepository
 from app.repositories.task_repository import TaskRepository
 from app.repositories.user_repository import UserRepository
 
@@ -155,3 +161,230 @@ def test_task_repository_get_multi_by_column_filters():
         assert total == 1 and [t.id for t in tasks_high_assignee] == [t1.id]
     finally:
         gen.close()
+
+
+def test_task_repository_get_multi_by_column_keyset_cursor():
+    user_repo = UserRepository()
+    board_repo = BoardRepository()
+    column_repo = ColumnRepository()
+    task_repo = TaskRepository()
+
+    db, gen = _get_db_session_for_test()
+    try:
+        u = user_repo.create(db, {"email": "keyset@example.com", "password_hash": "h"})
+        b = board_repo.create(db, {"name": "B", "owner_id": u.id})
+        c = column_repo.create(db, {"name": "C", "position": 1, "board_id": b.id})
+        # Posiciones repetidas: el id desempata y el orden sigue siendo estable
+        created = [
+            task_repo.create(
+                db,
+                {
+                    "title": f"T{i}",
+                    "description": None,
+                    "priority": TaskPriority.LOW,
+                    "position": i // 2,
+                    "column_id": c.id,
+                },
+            )
+            for i in range(5)
+        ]
+
+        seen: list[int] = []
+        cursor = None
+        while True:
+            page, total = task_repo.get_multi_by_column(db, column_id=c.id, limit=2, cursor=cursor)
+            assert total == 5
+            seen.extend(t.id for t in page)
+            cursor = next_cursor(page, 2, TaskRepository.column_keyset)
+            if cursor is None:
+                break
+        assert seen == [t.id for t in created]
+    finally:
+        gen.close()
+
+
+@pytest.mark.parametrize(
+    ("keyset", "values"),
+    [
+        (TaskRepository.column_keyset, ["a0", "1"]),
+        (TaskRepository.column_keyset, [{"rank": "a0"}, 1]),
+        (TaskRepository.column_keyset, [1, 2]),
+        (BoardRepository.keyset, [True]),
+        (BoardRepository.keyset, [None]),
+        (BoardRepository.keyset, [[1]]),
+    ],
+)
+def test_decode_cursor_rejects_values_of_the_wrong_type(keyset, values):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(values), keyset)
+
+
+def test_decode_cursor_accepts_the_keyset_types():
+    assert decode_cursor(encode_cursor(["a0", 7]), TaskRepository.column_keyset) == ["a0", 7]
+    assert decode_cursor(encode_cursor([3]), BoardRepository.keyset) == [3]
+
+
+def test_decode_cursor_checks_the_search_score_type():
+    db, gen = _get_db_session_for_test()
+    try:
+        ranked, _ = TaskRepository()._search_ranked(db, owner_id=1, query="informe")
+        keyset = (ranked.c.search_rank, Task.id)
+        # La relevancia es un número: un texto en su lugar fallaría al compararse en la base de datos
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(encode_cursor(["abc", 5]), keyset)
+        assert decode_cursor(encode_cursor([0.25, 5]), keyset) == [0.25, 5]
+        assert decode_cursor(encode_cursor([1, 5]), keyset) == [1, 5]
+    finally:
+        gen.close()
+
+
+def test_paginate_total_modes_single_statement(query_counter):
+    user_repo = UserRepository()
+    board_repo = BoardRepository()
+    column_repo = ColumnRepository()
+    task_repo = TaskRepository()
+
+    db, gen = _get_db_session_for_test()
+    try:
+        u = user_repo.create(db, {"email": "totals@example.com", "password_hash": "h"})
+        b = board_repo.create(db, {"name": "B", "owner_id": u.id})
+        c = column_repo.create(db, {"name": "C", "position": 1, "board_id": b.id})
+        for i in range(3):
+            task_repo.create(
+                db,
+                {
+                    "title": f"T{i}",
+                    "description": None,
+                    "priority": TaskPriority.LOW,
+                    "position": i,
+                    "column_id": c.id,
+                },
+            )
+        column_id = c.id
+
+        # Total exacto en la misma sentencia que la página
+        query_counter.clear()
+        page, total = task_repo.get_multi_by_column(db, column_id=column_id, limit=2)
+        assert total == 3 and len(page) == 2
+        assert len(query_counter) == 1
+
+        # En modo cursor el total sigue siendo el del conjunto completo
+        cursor = next_cursor(page, 2, TaskRepository.column_keyset)
+        query_counter.clear()
+        rest, total = task_repo.get_multi_by_column(db, column_id=column_id, limit=2, cursor=cursor)
+        assert total == 3 and len(rest) == 1
+        assert len(query_counter) == 1
+
+        # Sin total no se cuenta nada
+        _, total = task_repo.get_multi_by_column(db, column_id=column_id, limit=2, total_mode=TotalMode.NONE)
+        assert total is None
+
+        # En SQLite la estimación recurre al conteo exacto
+        _, total = task_repo.get_multi_by_column(db, column_id=column_id, limit=2, total_mode=TotalMode.ESTIMATE)
+        assert total == 3
+
+        # Página vacía más allá del final
+        empty, total = task_repo.get_multi_by_column(db, column_id=column_id, skip=10, limit=2)
+        assert empty == [] and total == 3
+    finally:
+        gen.close()
+
+
+def _query_plan(db, table: str, run) -> str:
+    """EXPLAIN QUERY PLAN de la última SELECT sobre `table` que ejecuta `run()` (SQLite)."""
+    captured: list[tuple] = []
+    bind = db.get_bind()
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and f"FROM {table}" in statement:
+            captured.append((statement, parameters))
+
+    event.listen(bind, "before_cursor_execute", _capture)
+    try:
+        run()
+    finally:
+        event.remove(bind, "before_cursor_execute", _capture)
+    statement, parameters = captured[-1]
+    rows = db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def _assert_index_scan(plan: str, *indexes: str) -> None:
+    # El índice resuelve filtro y orden: sin ordenación en memoria
+    assert any(f"USING INDEX {index}" in plan for index in indexes), plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_repository_queries_use_partial_composite_indexes():
+    user_repo = UserRepository()
+    board_repo = BoardRepository()
+    column_repo = ColumnRepository()
+    task_repo = TaskRepository()
+    comment_repo = CommentRepository()
+
+    # Se comprueba la forma de la página (total_mode=NONE): con total exacto la función
+    # ventana obliga a recorrer todo el conjunto antes de ordenar y limitar
+    db, gen = _get_db_session_for_test()
+    try:
+        u = user_repo.create(db, {"email": "plans@example.com", "password_hash": "h"})
+        b = board_repo.create(db, {"name": "B", "owner_id": u.id})
+        c = column_repo.create(db, {"name": "C", "position": 1, "board_id": b.id})
+        t = task_repo.create(db, {"title": "T", "priority": TaskPriority.LOW, "position": 0, "column_id": c.id})
+
+        plan = _query_plan(
+            db, "boards", lambda: board_repo.get_multi_by_owner(db, owner_id=u.id, total_mode=TotalMode.NONE)
+        )
+        # En SQLite todo índice termina en el rowid (= id), así que el de la FK empata con el
+        # parcial para `owner_id = ? ORDER BY id`; en PostgreSQL solo sirve el compuesto
+        _assert_index_scan(plan, "ix_boards_live_owner_id_id", "ix_boards_owner_id")
+
+        plan = _query_plan(
+            db, "columns", lambda: column_repo.get_multi_by_board(db, board_id=b.id, total_mode=TotalMode.NONE)
+        )
+        _assert_index_scan(plan, "ix_columns_board_id_rank")
+
+        plan = _query_plan(
+            db, "tasks", lambda: task_repo.get_multi_by_column(db, column_id=c.id, total_mode=TotalMode.NONE)
+        )
+        _assert_index_scan(plan, "ix_tasks_live_column_id_rank")
+        cursor = next_cursor([t], 1, TaskRepository.column_keyset)
+        plan = _query_plan(
+            db,
+            "tasks",
+            lambda: task_repo.get_multi_by_column(db, column_id=c.id, cursor=cursor, total_mode=TotalMode.NONE),
+        )
+        _assert_index_scan(plan, "ix_tasks_live_column_id_rank")
+
+        plan = _query_plan(db, "comments", lambda: comment_repo.get_multi_by_task(db, task_id=t.id))
+        _assert_index_scan(plan, "ix_comments_live_task_id_created_at")
+    finally:
+        gen.close()
+
+
+def test_estimate_total_explains_the_statement_with_bound_parameters():
+    from types import SimpleNamespace
+
+    from sqlalchemy import cast
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.orm import Query
+
+    from app.models.task import Task
+
+    class PostgresSession:
+        bind = SimpleNamespace(dialect=postgresql.psycopg2.dialect())
+
+        def execute(self, statement):
+            self.compiled = statement.compile(dialect=self.bind.dialect)
+            return SimpleNamespace(scalar=lambda: [{"Plan": {"Plan Rows": 42}}])
+
+    db = PostgresSession()
+    # Literales con ':', '%' y '\\' y un cast a TSQUERY, que literal_binds no sabe representar
+    query = Query(Task, session=db).filter(
+        Task.title == "a:b 100% \\ c",
+        Task.search_vector.op("@@")(cast("plan:*", postgresql.TSQUERY)),
+    )
+    assert BaseRepository.estimate_total(query) == 42
+    sql = str(db.compiled)
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "a:b" not in sql and "plan:*" not in sql
+    assert set(db.compiled.params.values()) == {"a:b 100% \\ c", "plan:*"}
@@ -1,12 +1,14 @@
 import time
 from datetime import timedelta
 
-from jose import jwt
+import pytest
+from jose import ExpiredSignatureError, JWTError, jwt
 
 from app.core.config import settings
 from app.core.security import (
     ALGORITHM,
     create_access_token,
+    decode_access_token,
     get_password_hash,
     verify_password,
 )
@@ -37,3 +39,48 @@ def test_create_access_token_custom_expiry_short_window():
     now = int(time.time())
     exp = int(decoded["exp"])
     assert 0 < exp - now <= 5 + 2
+
+
+def test_access_token_carries_kid_and_rotated_keys_still_verify(monkeypatch):
+    token = create_access_token({"sub": "kid@example.com", "uid": 7, "role": "USER"})
+    assert jwt.get_unverified_header(token)["kid"] == settings.JWT_KEY_ID
+    assert decode_access_token(token)["uid"] == 7
+
+    # Rotación: la clave anterior sigue verificando sus tokens; un kid desconocido no
+    monkeypatch.setattr(settings, "JWT_PREVIOUS_KEYS", {settings.JWT_KEY_ID: settings.SECRET_KEY})
+    monkeypatch.setattr(settings, "JWT_KEY_ID", "k2")
+    monkeypatch.setattr(settings, "SECRET_KEY", "new-secret")
+    assert decode_access_token(create_access_token({"sub": "new@example.com"}))["sub"] == "new@example.com"
+    assert decode_access_token(token)["sub"] == "kid@example.com"
+    forged = jwt.encode({"sub": "x", "exp": time.time() + 60}, "other", algorithm=ALGORITHM, headers={"kid": "k9"})
+    with pytest.raises(JWTError):
+        decode_access_token(forged)
+
+
+def test_verified_tokens_are_remembered_until_exp(monkeypatch):
+    import app.core.security as security
+
+    calls = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *a, **kw: calls.append(1) or real_decode(*a, **kw))
+
+    token = create_access_token({"sub": "lru@example.com"}, expires_delta=timedelta(seconds=30))
+    assert decode_access_token(token) is decode_access_token(token)
+    assert len(calls) == 1
+
+    # Pasado `exp` no se sirve de la caché: se vuelve a verificar (jose decide si ha expirado)
+    later = time.time() + 60
+    monkeypatch.setattr(security.time, "time", lambda: later)
+    decode_access_token(token)
+    assert len(calls) == 2
+    monkeypatch.undo()
+
+    expired = create_access_token({"sub": "lru@example.com"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(ExpiredSignatureError):
+        decode_access_token(expired)
+
+    monkeypatch.setattr(settings, "VERIFIED_TOKEN_CACHE_SIZE", 1)
+    decode_access_token(token)
+    other = create_access_token({"sub": "other@example.com"})
+    decode_access_token(other)
+    assert len(security._verified_tokens) == 1
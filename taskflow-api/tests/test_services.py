@@ -1,18 +1,38 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
 import pytest
+from sqlalchemy import event
 
+import app.core.cache as cache_module
+import app.db.maintenance as maintenance
 from app.db.session import get_db
 from app.main import app as fastapi_app
-from app.models.task import TaskPriority
+from app.models.archive import boards_archive, comments_archive, tasks_archive
+from app.models.board import Board
+from app.models.column import Column
+from app.models.comment import Comment
+from app.models.task import Task, TaskPriority
 from app.models.user import User
 from app.schemas.board import BoardCreate, BoardUpdate
 from app.schemas.column import ColumnCreate, ColumnUpdate
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.comment import CommentCreate, CommentUpdate
+from app.schemas.maintenance import ArchiveMode
+from app.schemas.task import (
+    TaskBatchCreate,
+    TaskBatchDelete,
+    TaskBatchUpdate,
+    TaskCreate,
+    TaskMove,
+    TaskUpdate,
+)
 from app.schemas.user import UserCreate
 from app.services.board_service import (
     create_board,
     delete_board,
     get_all_boards_by_user,
     get_board,
+    get_board_snapshot,
     update_board,
 )
 from app.services.column_service import (
@@ -22,12 +42,20 @@ from app.services.column_service import (
     get_columns_by_board,
     update_column,
 )
+from app.services.comment_service import create_comment, delete_comment, get_comment, update_comment
+from app.services.maintenance_service import archive_soft_deleted, restore_board, restore_task
 from app.services.task_service import (
     create_task,
+    create_tasks_batch,
     delete_task,
+    delete_tasks_batch,
     get_task,
     get_tasks_by_column,
+    move_task,
+    search_task_facets,
+    search_tasks,
     update_task,
+    update_tasks_batch,
 )
 from app.services.user_service import create_user
 
@@ -213,3 +241,521 @@ def test_task_service_crud_permissions_and_list_by_column():
         assert removed and removed.id == t.id
     finally:
         gen.close()
+
+
+def test_access_chain_resolves_in_single_query(query_counter):
+    owner = _make_user("accessowner@svc.com")
+    other = _make_user("accessother@svc.com")
+
+    db, gen = _get_db_session_for_test()
+    try:
+        board = create_board(db, current_user=owner, board_in=BoardCreate(name="B"))
+        column = create_column(
+            db,
+            current_user=owner,
+            column_in=ColumnCreate(name="C1", position=1, board_id=board.id),
+        )
+        task = create_task(
+            db,
+            current_user=owner,
+            column_id=column.id,
+            task_in=TaskCreate(title="T", description=None, priority="LOW", column_id=column.id),
+        )
+        comment = create_comment(
+            db,
+            current_user=owner,
+            comment_in=CommentCreate(text="hola", task_id=task.id, author_id=owner.id),
+        )
+        ids = {"column": column.id, "task": task.id, "comment": comment.id}
+        db.expunge_all()
+
+        for resolve in (
+            lambda user: get_column(db, column_id=ids["column"], current_user=user),
+            lambda user: get_task(db, task_id=ids["task"], current_user=user),
+            lambda user: get_comment(db, comment_id=ids["comment"], current_user=user),
+        ):
+            query_counter.clear()
+            assert resolve(owner) is not None
+            assert len(query_counter) == 1
+            query_counter.clear()
+            assert resolve(other) is None
+            assert len(query_counter) == 1
+
+        # Una tarea soft-deleted deja de resolverse
+        assert delete_task(db, task_id=ids["task"], current_user=owner) is not None
+        assert get_task(db, task_id=ids["task"], current_user=owner) is None
+    finally:
+        gen.close()
+
+
+def test_board_snapshot_uses_fixed_number_of_queries(query_counter):
+    owner = _make_user("snapowner@svc.com")
+
+    db, gen = _get_db_session_for_test()
+    try:
+        board = create_board(db, current_user=owner, board_in=BoardCreate(name="B"))
+        for pos in range(4):
+            column = create_column(
+                db, current_user=owner, column_in=ColumnCreate(name=f"C{pos}", position=pos, board_id=board.id)
+            )
+            for i in range(3):
+                create_task(
+                    db,
+                    current_user=owner,
+                    column_id=column.id,
+                    task_in=TaskCreate(title=f"T{i}", priority="LOW", column_id=column.id),
+                )
+        board_id = board.id
+        db.expunge_all()
+
+        query_counter.clear()
+        snapshot = get_board_snapshot(db, board_id=board_id, current_user=owner, tasks_per_column=2)
+        assert snapshot is not None and len(snapshot.columns) == 4
+        assert all(len(c.tasks) == 2 and c.task_count == 3 for c in snapshot.columns)
+        # Tablero + columnas (selectinload) + tareas (ventana por columna)
+        assert len(query_counter) == 3
+    finally:
+        gen.close()
+
+
+def test_task_batch_uses_fixed_number_of_statements(query_counter):
+    owner = _make_user("batchowner@svc.com")
+
+    db, gen = _get_db_session_for_test()
+    try:
+        board = create_board(db, current_user=owner, board_in=BoardCreate(name="B"))
+        columns = [
+            create_column(db, current_user=owner, column_in=ColumnCreate(name=f"C{i}", position=i, board_id=board.id))
+            for i in range(2)
+        ]
+        column_ids = [c.id for c in columns]
+        items = [TaskCreate(title=f"T{i}", priority="LOW", column_id=column_ids[i % 2]) for i in range(20)]
+
+        # Acceso (1) + último rank por columna (1) + relectura (1) sin importar el tamaño del lote.
+        # SQLite no tiene centinela implícito para RETURNING ordenado y emite un INSERT por fila;
+        # PostgreSQL lo agrupa.
+        query_counter.clear()
+        result = create_tasks_batch(db, current_user=owner, batch_in=TaskBatchCreate(items=items))
+        assert [r.status for r in result.items] == ["created"] * 20
+        assert [r.task.title for r in result.items] == [f"T{i}" for i in range(20)]
+        assert len([s for s in query_counter if not s.lstrip().upper().startswith("INSERT")]) == 3
+        ids = [r.id for r in result.items]
+
+        query_counter.clear()
+        result = update_tasks_batch(
+            db,
+            current_user=owner,
+            batch_in=TaskBatchUpdate(items=[{"id": task_id, "priority": "HIGH"} for task_id in ids]),
+        )
+        assert all(r.status == "updated" and r.task.priority == TaskPriority.HIGH for r in result.items)
+        # Acceso a tareas (1) + UPDATE por lotes + relectura; columnas destino no se consultan
+        assert len(query_counter) <= 3
+
+        query_counter.clear()
+        result = delete_tasks_batch(db, current_user=owner, batch_in=TaskBatchDelete(ids=ids))
+        assert all(r.status == "deleted" for r in result.items)
+        assert len(query_counter) == 2
+        assert get_task(db, task_id=ids[0], current_user=owner) is None
+    finally:
+        gen.close()
+
+
+def test_task_batch_places_items_at_the_same_position_in_batch_order():
+    owner = _make_user("batchpos@svc.com")
+
+    db, gen = _get_db_session_for_test()
+    try:
+        board = create_board(db, current_user=owner, board_in=BoardCreate(name="B"))
+        column = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=board.id))
+        column_id = column.id
+        for i in range(3):
+            create_task(
+                db,
+                current_user=owner,
+                column_id=column_id,
+                task_in=TaskCreate(title=f"T{i}", priority="LOW", column_id=column_id, position=i),
+            )
+        commits = []
+        event.listen(db, "after_commit", commits.append)
+
+        def titles() -> list[str]:
+            tasks, _ = get_tasks_by_column(db, column_id=column_id, current_user=owner)
+            return [t.title for t in tasks]
+
+        items = [
+            TaskCreate(title="A", priority="LOW", column_id=column_id, position=1),
+            TaskCreate(title="B", priority="LOW", column_id=column_id, position=1),
+            TaskCreate(title="C", priority="LOW", column_id=column_id),
+        ]
+        created = create_tasks_batch(db, current_user=owner, batch_in=TaskBatchCreate(items=items))
+        assert len({r.task.rank for r in created.items}) == 3
+        assert titles() == ["T0", "T1", "A", "B", "T2", "C"]
+        # Todo el lote en una sola transacción
+        assert len(commits) == 1
+
+        ids = {t.title: t.id for t in get_tasks_by_column(db, column_id=column_id, current_user=owner)[0]}
+        update_tasks_batch(
+            db,
+            current_user=owner,
+            batch_in=TaskBatchUpdate(items=[{"id": ids["T2"], "position": 0}, {"id": ids["C"], "position": 0}]),
+        )
+        assert titles() == ["T0", "T2", "C", "T1", "A", "B"]
+        assert len(commits) == 2
+    finally:
+        gen.close()
+
+
+def test_move_task_writes_single_row_and_rebalances_ties(query_counter):
+    owner = _make_user("moveowner@svc.com")
+
+    db, gen = _get_db_session_for_test()
+    try:
+        board = create_board(db, current_user=owner, board_in=BoardCreate(name="B"))
+        column = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=board.id))
+        column_id = column.id
+        # Posiciones heredadas repetidas: mismo rank, el id desempata
+        ids = [
+            create_task(
+                db,
+                current_user=owner,
+                column_id=column_id,
+                task_in=TaskCreate(title=f"T{i}", priority="LOW", column_id=column_id, position=1),
+            ).id
+            for i in range(3)
+        ]
+
+        def order():
+            items, _ = get_tasks_by_column(db, column_id=column_id, current_user=owner)
+            return [t.id for t in items]
+
+        # Entre dos tareas empatadas hay que rebalancear antes de mover
+        moved = move_task(db, task_id=ids[2], move_in=TaskMove(after_id=ids[0], before_id=ids[1]), current_user=owner)
+        assert moved is not None
+        assert order() == [ids[0], ids[2], ids[1]]
+
+        # Sin empates solo se escribe la fila movida
+        query_counter.clear()
+        move_task(db, task_id=ids[0], move_in=TaskMove(after_id=ids[1]), current_user=owner)
+        updates = [s for s in query_counter if s.lstrip().upper().startswith("UPDATE")]
+        assert len(updates) == 1
+        assert order() == [ids[2], ids[1], ids[0]]
+    finally:
+        gen.close()
+
+
+def test_archive_soft_deleted_in_batches_and_restore():
+    owner = _make_user("archiver@svc.com")
+    long_ago = datetime.now(timezone.utc) - timedelta(days=90)
+
+    db, gen = _get_db_session_for_test()
+    try:
+        # Tablero vivo con una tarea borrada hace tiempo (y su comentario) y otra recién borrada
+        board = create_board(db, current_user=owner, board_in=BoardCreate(name="Vivo"))
+        column = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=board.id))
+        column_id = column.id
+        old_task, recent_task = (
+            create_task(
+                db,
+                current_user=owner,
+                column_id=column_id,
+                task_in=TaskCreate(title=title, priority="LOW", column_id=column_id),
+            )
+            for title in ("Vieja", "Reciente")
+        )
+        old_task_id, recent_task_id = old_task.id, recent_task.id
+        create_comment(
+            db, current_user=owner, comment_in=CommentCreate(text="c", task_id=old_task_id, author_id=owner.id)
+        )
+        delete_task(db, task_id=recent_task_id, current_user=owner)
+        db.query(Task).filter(Task.id == old_task_id).update({"deleted_at": long_ago})
+
+        # Tablero borrado hace tiempo: arrastra sus columnas y tareas vivas
+        gone = create_board(db, current_user=owner, board_in=BoardCreate(name="Borrado"))
+        gone_id = gone.id
+        gone_column = create_column(
+            db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=gone_id)
+        )
+        for i in range(3):
+            create_task(
+                db,
+                current_user=owner,
+                column_id=gone_column.id,
+                task_in=TaskCreate(title=f"T{i}", priority="LOW", column_id=gone_column.id),
+            )
+        db.query(Board).filter(Board.id == gone_id).update({"deleted_at": long_ago})
+        db.commit()
+
+        report = archive_soft_deleted(db, older_than_days=30, batch_size=2)
+        rows = {t.table: (t.rows, t.batches) for t in report.tables}
+        assert rows == {"comments": (1, 1), "tasks": (4, 2), "columns": (1, 1), "boards": (1, 1)}
+        assert report.rows == 7 and report.rows_per_second > 0
+
+        assert db.get(Task, old_task_id) is None and db.get(Board, gone_id) is None
+        assert db.get(Task, recent_task_id) is not None
+        assert db.query(tasks_archive).count() == 4 and db.query(comments_archive).count() == 1
+
+        # Restaurar devuelve el árbol completo y deja visible la raíz
+        assert restore_board(db, board_id=gone_id) == {"boards": 1, "columns": 1, "tasks": 3, "comments": 0}
+        assert get_board(db, board_id=gone_id, current_user=owner) is not None
+        items, _ = get_tasks_by_column(db, column_id=gone_column.id, current_user=owner)
+        assert len(items) == 3
+        assert restore_task(db, task_id=old_task_id) == {"tasks": 1, "comments": 1}
+        assert get_task(db, task_id=old_task_id, current_user=owner) is not None
+        assert db.query(boards_archive).count() == 0
+        with pytest.raises(ValueError):
+            restore_task(db, task_id=old_task_id)
+
+        # Purga: borrado físico sin pasar por el archivo
+        db.query(Comment).filter(Comment.task_id == old_task_id).update({"deleted_at": long_ago})
+        db.commit()
+        report = archive_soft_deleted(db, older_than_days=30, mode=ArchiveMode.PURGE)
+        assert report.rows == 1
+        assert db.query(comments_archive).count() == 0
+    finally:
+        gen.close()
+
+
+def test_restore_command_invalidates_in_the_loop_that_owns_the_cache(monkeypatch, capsys):
+    owner = _make_user("restorecli@svc.com")
+    long_ago = datetime.now(timezone.utc) - timedelta(days=90)
+
+    db, gen = _get_db_session_for_test()
+    try:
+        board = create_board(db, current_user=owner, board_in=BoardCreate(name="B"))
+        column = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=board.id))
+        task = create_task(
+            db,
+            current_user=owner,
+            column_id=column.id,
+            task_in=TaskCreate(title="T", priority="LOW", column_id=column.id),
+        )
+        task_id = task.id
+        db.query(Task).filter(Task.id == task_id).update({"deleted_at": long_ago})
+        db.commit()
+        archive_soft_deleted(db, older_than_days=30)
+    finally:
+        gen.close()
+
+    # El cliente de Redis queda ligado al loop en el que se crea: las invalidaciones de la
+    # restauración deben ejecutarse en ese mismo loop y no en uno nuevo por llamada
+    loops = {"init": [], "bump": []}
+    init_cache = maintenance.init_cache
+
+    def recording_init_cache():
+        loops["init"].append(asyncio.get_running_loop())
+        init_cache()
+
+    async def recording_bump(tags):
+        loops["bump"].append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(maintenance, "init_cache", recording_init_cache)
+    monkeypatch.setattr(cache_module, "_bump_generations", recording_bump)
+    monkeypatch.setattr(maintenance, "SessionLocal", lambda: next(fastapi_app.dependency_overrides[get_db]()))
+
+    maintenance.main(["restore", "task", str(task_id)])
+    assert "tasks: 1" in capsys.readouterr().out
+    assert len(loops["init"]) == 1 and loops["bump"] == loops["init"]
+
+
+def test_task_board_and_owner_follow_moves_and_ownership(query_counter):
+    owner = _make_user("placement@svc.com")
+    other = _make_user("placement2@svc.com")
+
+    db, gen = _get_db_session_for_test()
+    try:
+        b1 = create_board(db, current_user=owner, board_in=BoardCreate(name="B1"))
+        b2 = create_board(db, current_user=owner, board_in=BoardCreate(name="B2"))
+        c1 = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=b1.id))
+        c2 = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=b2.id))
+        task = create_task(
+            db, current_user=owner, column_id=c1.id, task_in=TaskCreate(title="Mover", priority="LOW", column_id=c1.id)
+        )
+        assert (task.board_id, task.owner_id) == (b1.id, owner.id)
+
+        # Mover a una columna de otro tablero arrastra board_id (también por lotes)
+        move_task(db, task_id=task.id, move_in=TaskMove(column_id=c2.id), current_user=owner)
+        assert db.get(Task, task.id).board_id == b2.id
+        update_tasks_batch(
+            db, current_user=owner, batch_in=TaskBatchUpdate(items=[{"id": task.id, "column_id": c1.id}])
+        )
+        db.expire_all()
+        assert db.get(Task, task.id).board_id == b1.id
+
+        # Cambios hechos por el ORM fuera de los servicios también se propagan
+        db.get(Column, c1.id).board_id = b2.id
+        db.commit()
+        assert db.get(Task, task.id).board_id == b2.id
+        db.get(Board, b2.id).owner_id = other.id
+        db.commit()
+        assert db.get(Task, task.id).owner_id == other.id
+
+        # La búsqueda filtra por el dueño copiado, sin JOIN hasta boards
+        query_counter.clear()
+        items, total = search_tasks(db, current_user=other, q="Mover")
+        assert [t.id for t in items] == [task.id] and total == 1
+        assert "boards" not in query_counter[0] and "columns" not in query_counter[0]
+        assert search_tasks(db, current_user=owner, q="Mover") == ([], 0)
+    finally:
+        gen.close()
+
+
+def test_search_escapes_like_wildcards_and_ignores_fuzzy_on_sqlite():
+    owner = _make_user("search@svc.com")
+
+    db, gen = _get_db_session_for_test()
+    try:
+        board = create_board(db, current_user=owner, board_in=BoardCreate(name="B"))
+        column = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=board.id))
+        for title in ("Descuento 50% enero", "Lote 500 piezas"):
+            create_task(
+                db,
+                current_user=owner,
+                column_id=column.id,
+                task_in=TaskCreate(title=title, priority="LOW", column_id=column.id),
+            )
+
+        # '%' del término es literal, no comodín
+        items, total = search_tasks(db, current_user=owner, q="50%")
+        assert [t.title for t in items] == ["Descuento 50% enero"] and total == 1
+
+        # En SQLite no hay pg_trgm: fuzzy degrada a la búsqueda por subcadena
+        items, _ = search_tasks(db, current_user=owner, q="piezas", fuzzy=True, similarity=0.3)
+        assert [t.title for t in items] == ["Lote 500 piezas"]
+    finally:
+        gen.close()
+
+
+def test_sqlite_search_uses_fts5_with_bm25_and_stays_in_sync(query_counter):
+    owner = _make_user("fts@svc.com")
+
+    db, gen = _get_db_session_for_test()
+    try:
+        board = create_board(db, current_user=owner, board_in=BoardCreate(name="B"))
+        column = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=board.id))
+
+        def add(title: str, description: str | None = None) -> Task:
+            return create_task(
+                db,
+                current_user=owner,
+                column_id=column.id,
+                task_in=TaskCreate(title=title, description=description, priority="LOW", column_id=column.id),
+            )
+
+        in_title = add("Factura del proveedor", "Revisar importes")
+        in_description = add("Pagos de marzo", "Adjuntar la factura escaneada")
+        other = add("Diseño del logotipo", "Versión en alta resolución")
+
+        # bm25: el título pesa más que la descripción; relevancia y fragmento en cada resultado
+        query_counter.clear()
+        items, total = search_tasks(db, current_user=owner, q="factura")
+        assert [t.id for t in items] == [in_title.id, in_description.id] and total == 2
+        assert items[0].search_rank > items[1].search_rank > 0
+        assert "«factura»" in items[1].search_snippet.lower()
+        assert "tasks_fts MATCH" in query_counter[0]
+
+        # Sintaxis de buscador, prefijos y acentos
+        assert [t.id for t in search_tasks(db, current_user=owner, q="factura -marzo")[0]] == [in_title.id]
+        assert [t.id for t in search_tasks(db, current_user=owner, q='"factura escaneada"')[0]] == [in_description.id]
+        assert {t.id for t in search_tasks(db, current_user=owner, q="logotipo or pagos")[0]} == {
+            in_description.id,
+            other.id,
+        }
+        assert search_tasks(db, current_user=owner, q="logo")[0] == []
+        assert [t.id for t in search_tasks(db, current_user=owner, q="logo", prefix=True)[0]] == [other.id]
+        assert [t.id for t in search_tasks(db, current_user=owner, q="diseno")[0]] == [other.id]
+        assert search_tasks(db, current_user=owner, q='-factura "')[0] == []
+
+        # Los triggers siguen los cambios de texto y los borrados
+        update_task(db, task_id=other.id, task_in=TaskUpdate(title="Factura de diseño"), current_user=owner)
+        assert other.id in {t.id for t in search_tasks(db, current_user=owner, q="factura")[0]}
+        delete_task(db, task_id=in_title.id, current_user=owner)
+        assert in_title.id not in {t.id for t in search_tasks(db, current_user=owner, q="factura")[0]}
+        db.query(Task).filter(Task.id == in_description.id).delete()
+        db.commit()
+        assert [t.id for t in search_tasks(db, current_user=owner, q="factura")[0]] == [other.id]
+    finally:
+        gen.close()
+
+
+def test_search_includes_comments_kept_up_to_date_incrementally():
+    owner = _make_user("comments-search@svc.com")
+
+    db, gen = _get_db_session_for_test()
+    try:
+        board = create_board(db, current_user=owner, board_in=BoardCreate(name="B"))
+        column = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=board.id))
+        task = create_task(
+            db,
+            current_user=owner,
+            column_id=column.id,
+            task_in=TaskCreate(title="Cerrar sprint", priority="LOW", column_id=column.id),
+        )
+
+        def found(q: str, *, include_comments: bool = True) -> list[int]:
+            items, _ = search_tasks(db, current_user=owner, q=q, include_comments=include_comments)
+            return [t.id for t in items]
+
+        first = create_comment(
+            db,
+            current_user=owner,
+            comment_in=CommentCreate(text="Falta el informe de velocidad", task_id=task.id, author_id=owner.id),
+        )
+        create_comment(
+            db,
+            current_user=owner,
+            comment_in=CommentCreate(text="Retro el viernes", task_id=task.id, author_id=owner.id),
+        )
+        assert found("velocidad") == [task.id] and found("viernes") == [task.id]
+        # Sin la opción, los comentarios no cuentan
+        assert found("velocidad", include_comments=False) == []
+
+        update_comment(db, comment_id=first.id, comment_in=CommentUpdate(text="Informe listo"), current_user=owner)
+        assert found("velocidad") == [] and found("listo") == [task.id]
+
+        delete_comment(db, comment_id=first.id, current_user=owner)
+        assert found("listo") == [] and found("viernes") == [task.id]
+    finally:
+        gen.close()
+
+
+def test_search_facets_and_filters():
+    owner = _make_user("facets@svc.com")
+    helper = _make_user("facets2@svc.com")
+
+    db, gen = _get_db_session_for_test()
+    try:
+        b1 = create_board(db, current_user=owner, board_in=BoardCreate(name="B1"))
+        b2 = create_board(db, current_user=owner, board_in=BoardCreate(name="B2"))
+        c1 = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=b1.id))
+        c2 = create_column(db, current_user=owner, column_in=ColumnCreate(name="C", position=1, board_id=b2.id))
+        for column, priority, assignee in (
+            (c1, "HIGH", helper.id),
+            (c1, "LOW", None),
+            (c2, "HIGH", None),
+        ):
+            create_task(
+                db,
+                current_user=owner,
+                column_id=column.id,
+                task_in=TaskCreate(title="Auditoría", priority=priority, column_id=column.id, assignee_id=assignee),
+            )
+        create_task(
+            db, current_user=owner, column_id=c1.id, task_in=TaskCreate(title="Otra", priority="LOW", column_id=c1.id)
+        )
+
+        facets = search_task_facets(db, current_user=owner, q="auditoría")
+        assert [(f.value, f.count) for f in facets.board_id] == [(b1.id, 2), (b2.id, 1)]
+        assert [(f.value, f.count) for f in facets.column_id] == [(c1.id, 2), (c2.id, 1)]
+        assert [(f.value, f.count) for f in facets.priority] == [(TaskPriority.HIGH, 2), (TaskPriority.LOW, 1)]
+        assert {(f.value, f.count) for f in facets.assignee_id} == {(None, 2), (helper.id, 1)}
+
+        # Los filtros se combinan con la búsqueda y también acotan las facetas
+        items, total = search_tasks(db, current_user=owner, q="auditoría", priorities=[TaskPriority.HIGH])
+        assert total == 2 and {t.board_id for t in items} == {b1.id, b2.id}
+        items, total = search_tasks(db, current_user=owner, q="auditoría", board_id=b1.id, assignee_id=helper.id)
+        assert total == 1 and items[0].assignee_id == helper.id
+        facets = search_task_facets(db, current_user=owner, q="auditoría", board_id=b2.id)
+        assert [(f.value, f.count) for f in facets.priority] == [(TaskPriority.HIGH, 1)]
+        assert search_task_facets(db, current_user=helper, q="auditoría").board_id == []
+    finally:
+        gen.close()
@@ -48,6 +48,13 @@ export async function getTasksByColumn(columnId, token, { apiBase } = {}) {
   return request(`/columns/${encodeURIComponent(columnId)}/tasks`, token, {}, apiBase);
 }
 
+// Obtiene el tablero completo (columnas ordenadas y sus tareas) en una sola petición
+export async function getBoardSnapshot(boardId, token, { apiBase, tasksPerColumn } = {}) {
+  if (boardId == null) throw new Error("boardId es requerido");
+  const qs = tasksPerColumn != null ? `?tasks_per_column=${encodeURIComponent(tasksPerColumn)}` : "";
+  return request(`/boards/${encodeURIComponent(boardId)}/snapshot${qs}`, token, {}, apiBase);
+}
+
 // Crear tablero
 export async function createBoard(name, token, { apiBase } = {}) {
   if (!name) throw new Error("name es requerido");
@@ -91,6 +98,15 @@ export async function updateTask(taskId, data, token, { apiBase } = {}) {
   }, apiBase);
 }
 
+// Mover tarea entre dos tareas (afterId encima, beforeId debajo) de la columna destino
+export async function moveTask(taskId, { columnId, afterId, beforeId } = {}, token, { apiBase } = {}) {
+  if (taskId == null) throw new Error("taskId es requerido");
+  return request(`/tasks/${encodeURIComponent(taskId)}/move`, token, {
+    method: "POST",
+    body: JSON.stringify({ column_id: columnId ?? null, after_id: afterId ?? null, before_id: beforeId ?? null }),
+  }, apiBase);
+}
+
 // Eliminar tarea
 export async function deleteTask(taskId, token, { apiBase } = {}) {
   if (taskId == null) throw new Error("taskId es requerido");
@@ -115,10 +131,12 @@ export function createApiClient({ apiBase = DEFAULT_API_BASE } = {}) {
     getBoards: (token) => getBoards(token, { apiBase }),
     getBoardColumns: (boardId, token) => getBoardColumns(boardId, token, { apiBase }),
     getTasksByColumn: (columnId, token) => getTasksByColumn(columnId, token, { apiBase }),
+    getBoardSnapshot: (boardId, token, opts = {}) => getBoardSnapshot(boardId, token, { apiBase, ...opts }),
     createBoard: (name, token) => createBoard(name, token, { apiBase }),
     createColumn: (boardId, name, position, token) => createColumn(boardId, name, position, token, { apiBase }),
     createTask: (columnId, title, description, priority, token) => createTask(columnId, title, description, priority, token, { apiBase }),
     updateTask: (taskId, data, token) => updateTask(taskId, data, token, { apiBase }),
+    moveTask: (taskId, target, token) => moveTask(taskId, target, token, { apiBase }),
     deleteTask: (taskId, token) => deleteTask(taskId, token, { apiBase }),
     register: (email, password) => register(email, password, { apiBase }),
   };
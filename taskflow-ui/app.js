@@ -1,4 +1,4 @@
-import { getBoards, getBoardColumns, getTasksByColumn, createBoard, createColumn, createTask, updateTask, deleteTask, register } from './apiClient.js';
+import { getBoards, getBoardSnapshot, createBoard, createColumn, createTask, updateTask, moveTask, deleteTask, register } from './apiClient.js';
 
 // Utilidades simples de token; en un caso real vendría de login y storage
 function getToken() {
@@ -195,22 +195,12 @@ export async function loadBoard(boardId) {
   renderKanbanSkeleton(3, 3);
 
   try {
-    const columnsPage = await getBoardColumns(boardId, token, { apiBase: getApiBase() });
-    const columns = Array.isArray(columnsPage?.items) ? columnsPage.items : [];
-
-    const columnsWithTasks = await Promise.all(
-      columns.map(async (col) => {
-        const tasksPage = await getTasksByColumn(col.id, token, { apiBase: getApiBase() });
-        const tasks = Array.isArray(tasksPage?.items) ? tasksPage.items : [];
-        return { ...col, tasks };
-      })
-    );
-
-    // Ordenar columnas por position y tareas por position
-    columnsWithTasks.sort((a, b) => (a.position ?? 0) - (b.position ?? 0));
-    for (const col of columnsWithTasks) {
-      col.tasks.sort((a, b) => (a.position ?? 0) - (b.position ?? 0));
-    }
+    // Una sola petición: el snapshot ya trae columnas y tareas ordenadas
+    const snapshot = await getBoardSnapshot(boardId, token, { apiBase: getApiBase() });
+    const columnsWithTasks = (Array.isArray(snapshot?.columns) ? snapshot.columns : []).map((col) => ({
+      ...col,
+      tasks: Array.isArray(col.tasks) ? col.tasks : [],
+    }));
 
     // Guardar estado actual
     currentBoardId = boardId;
@@ -273,7 +263,10 @@ export function renderKanbanBoard(columns) {
       const token = getToken();
       if (!token) return;
       try {
-        await updateTask(Number(taskId), { column_id: Number(toColumnId) }, token, { apiBase: getApiBase() });
+        // Se coloca al final de la columna destino: solo se reescribe la fila de la tarea
+        const lastCard = [...list.querySelectorAll('.task-card')].pop();
+        const afterId = lastCard ? Number(lastCard.dataset.taskId) : null;
+        await moveTask(Number(taskId), { columnId: Number(toColumnId), afterId }, token, { apiBase: getApiBase() });
         // Mover DOM de forma optimista
         const fromList = draggedTask.parentElement;
         list.appendChild(draggedTask);